@@ -0,0 +1,268 @@
+"""API assíncrona de verificação de links (dono e cadastro na competição)
+
+Uso como servidor HTTP local:
+    python api_links.py --porta 8765
+
+    GET  /verificar?url=<link>          -> resultado de um link
+    POST /verificar  {"urls": [...]}    -> resultados em lote
+    GET  /saude                         -> versão e tamanho do snapshot carregado
+
+Uso importável (ex.: bot do Discord):
+    from api_links import verificar_links
+    resultados = await verificar_links(["https://www.tiktok.com/@user/video/123"])
+
+Os DataFrames e o índice de URLs ficam carregados em memória; o snapshot só
+é recarregado em segundo plano quando a versão dos dados muda.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+import dashboard
+
+# Intervalo entre verificações de dados novos no banco
+INTERVALO_RECARGA = dashboard.CACHE_TTL
+TAMANHO_CACHE_RESULTADOS = 10000
+MAXIMO_LINKS_POR_LOTE = 1000
+MAXIMO_CORPO_BYTES = 1024 * 1024
+# Links analisados entre cada devolução de controle ao event loop
+LINKS_POR_FATIA = 50
+
+
+class VerificadorLinks:
+    """Snapshot em memória (vídeos, usuários, índice de URLs) com consultas assíncronas"""
+
+    def __init__(self):
+        self.df_videos = None
+        self.df_usuarios = None
+        self.indice_urls = None
+        self.indice_donos = None
+        self.versao = None
+        self.carregado_em = None
+        self._resultados = OrderedDict()
+        self._trava_recarga = None
+
+    def _carregar_snapshot(self):
+        dashboard.carregar_videos_completo.clear()
+        dashboard.carregar_dados_usuarios_completo.clear()
+        df_videos = dashboard.carregar_videos_completo()
+        df_usuarios = dashboard.carregar_dados_usuarios_completo()
+        versao = f"{dashboard.versao_snapshot(df_videos)}:{dashboard.versao_snapshot(df_usuarios)}"
+        if versao == self.versao:
+            return False
+
+        indice_urls = dashboard.IndiceUrls(df_videos)
+        indice_donos = dashboard.IndiceDonos(df_usuarios)
+        # Troca de referências em bloco: consultas em andamento seguem no snapshot anterior
+        self.df_videos, self.df_usuarios = df_videos, df_usuarios
+        self.indice_urls, self.indice_donos = indice_urls, indice_donos
+        self.versao = versao
+        self.carregado_em = time.time()
+        self._resultados.clear()
+        return True
+
+    async def carregar(self):
+        """Carrega (ou recarrega, se os dados mudaram) o snapshot sem bloquear o event loop"""
+        if self._trava_recarga is None:
+            # Criada dentro do event loop em uso
+            self._trava_recarga = asyncio.Lock()
+        async with self._trava_recarga:
+            return await asyncio.to_thread(self._carregar_snapshot)
+
+    async def manter_atualizado(self, intervalo=INTERVALO_RECARGA):
+        """Tarefa de fundo que recarrega o snapshot periodicamente"""
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                await self.carregar()
+            except Exception as e:
+                print(f"⚠️ Falha ao recarregar snapshot: {e}")
+
+    def verificar_sincrono(self, url):
+        """Resultado de um link, com cache por snapshot"""
+        resultado = self._resultados.get(url)
+        if resultado is not None:
+            self._resultados.move_to_end(url)
+            return resultado
+
+        resultado = dashboard.resumir_analise_link(url, self.df_videos, self.df_usuarios,
+                                                   self.indice_urls, self.indice_donos)
+        self._resultados[url] = resultado
+        if len(self._resultados) > TAMANHO_CACHE_RESULTADOS:
+            self._resultados.popitem(last=False)
+        return resultado
+
+    async def verificar_lote(self, urls):
+        """Resultados de vários links, cedendo o event loop a cada fatia"""
+        if self.indice_urls is None:
+            await self.carregar()
+
+        resultados = []
+        for i in range(0, len(urls), LINKS_POR_FATIA):
+            resultados.extend(self.verificar_sincrono(url) for url in urls[i:i + LINKS_POR_FATIA])
+            await asyncio.sleep(0)
+        return resultados
+
+    def saude(self):
+        return {
+            'versao': self.versao,
+            'carregado_em': self.carregado_em,
+            'videos': 0 if self.df_videos is None else len(self.df_videos),
+            'usuarios': 0 if self.df_usuarios is None else len(self.df_usuarios),
+            'resultados_em_cache': len(self._resultados)
+        }
+
+
+_verificador_padrao = None
+
+
+def obter_verificador():
+    """Verificador compartilhado do processo"""
+    global _verificador_padrao
+    if _verificador_padrao is None:
+        _verificador_padrao = VerificadorLinks()
+    return _verificador_padrao
+
+
+async def verificar_links(urls):
+    """Verifica uma lista de links usando o snapshot compartilhado em memória"""
+    return await obter_verificador().verificar_lote([str(url).strip() for url in urls])
+
+
+async def verificar_link(url):
+    """Verifica um único link"""
+    return (await verificar_links([url]))[0]
+
+
+# ========== SERVIDOR HTTP ==========
+_STATUS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large'}
+
+
+def _resposta_http(status, corpo, manter_conexao=True):
+    dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+    cabecalho = (
+        f"HTTP/1.1 {status} {_STATUS_HTTP.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(dados)}\r\n"
+        f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n"
+    )
+    return cabecalho.encode('latin-1') + dados
+
+
+async def _processar_requisicao(verificador, metodo, alvo, corpo):
+    partes = urlsplit(alvo)
+
+    if partes.path == '/saude':
+        return 200, verificador.saude()
+
+    if partes.path != '/verificar':
+        return 404, {'erro': 'rota não encontrada'}
+
+    if metodo == 'GET':
+        urls = parse_qs(partes.query).get('url', [])
+    elif metodo == 'POST':
+        try:
+            dados = json.loads(corpo or b'{}')
+        except ValueError:
+            return 400, {'erro': 'JSON inválido'}
+        if not isinstance(dados, dict):
+            return 400, {'erro': "envie um objeto JSON com 'url' ou 'urls'"}
+        urls = dados.get('urls') or ([dados['url']] if dados.get('url') else [])
+    else:
+        return 405, {'erro': 'use GET ou POST'}
+
+    if not urls or not isinstance(urls, list):
+        return 400, {'erro': "informe 'url' ou 'urls'"}
+    if len(urls) > MAXIMO_LINKS_POR_LOTE:
+        return 413, {'erro': f'máximo de {MAXIMO_LINKS_POR_LOTE} links por requisição'}
+
+    resultados = await verificador.verificar_lote([str(url).strip() for url in urls])
+    return 200, {'versao': verificador.versao, 'resultados': resultados}
+
+
+async def _atender_conexao(verificador, leitor, escritor):
+    try:
+        while True:
+            try:
+                cabecalho = await leitor.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+
+            linhas = cabecalho.decode('latin-1').split('\r\n')
+            try:
+                metodo, alvo, _ = linhas[0].split(' ', 2)
+            except ValueError:
+                escritor.write(_resposta_http(400, {'erro': 'requisição inválida'}, False))
+                break
+
+            cabecalhos = {}
+            for linha in linhas[1:]:
+                if ':' in linha:
+                    nome, valor = linha.split(':', 1)
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+            try:
+                tamanho = int(cabecalhos.get('content-length', 0) or 0)
+            except ValueError:
+                tamanho = -1
+            if tamanho < 0:
+                escritor.write(_resposta_http(400, {'erro': 'Content-Length inválido'}, False))
+                break
+            if tamanho > MAXIMO_CORPO_BYTES:
+                escritor.write(_resposta_http(413, {'erro': 'corpo muito grande'}, False))
+                break
+            corpo = await leitor.readexactly(tamanho) if tamanho else b''
+
+            manter_conexao = cabecalhos.get('connection', '').lower() != 'close'
+            status, resposta = await _processar_requisicao(verificador, metodo.upper(), alvo, corpo)
+            escritor.write(_resposta_http(status, resposta, manter_conexao))
+            await escritor.drain()
+
+            if not manter_conexao:
+                break
+    finally:
+        escritor.close()
+
+
+async def iniciar_servidor(host='127.0.0.1', porta=8765, verificador=None):
+    """Carrega o snapshot e inicia o servidor HTTP; devolve (servidor, verificador)"""
+    verificador = verificador or obter_verificador()
+    await verificador.carregar()
+    servidor = await asyncio.start_server(
+        lambda leitor, escritor: _atender_conexao(verificador, leitor, escritor),
+        host, porta
+    )
+    return servidor, verificador
+
+
+async def _servir(host, porta):
+    servidor, verificador = await iniciar_servidor(host, porta)
+    saude = verificador.saude()
+    print(f"🔗 API de links em http://{host}:{porta} | {saude['videos']:,} vídeos, {saude['usuarios']:,} usuários")
+    tarefa_recarga = asyncio.create_task(verificador.manter_atualizado())
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        tarefa_recarga.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API local de verificação de links da competição")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--banco', default=dashboard.DB_PATH, help="Caminho do trendx_bot.db")
+    args = parser.parse_args()
+
+    dashboard.DB_PATH = args.banco
+    try:
+        asyncio.run(_servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Ponto de entrada alternativo: streamlit run app.py
+
+O dashboard é importado uma vez por processo (sem recompilar o código a
+cada rerun) e main() desenha a página.
+"""
+from dashboard import main
+
+main()
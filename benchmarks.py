@@ -0,0 +1,646 @@
+"""Benchmarks locais do TrendX Analytics
+
+    python benchmarks.py api --conexoes 50 --requisicoes 5000 --lote 10
+    python benchmarks.py importacao --orcamento-ms 400
+    python benchmarks.py sessoes --sessoes 8 --rodadas 3 [--banco trendx_bot.db]
+
+api:        sobe a API de links (api_links.py) num subprocesso e dispara carga com
+            várias conexões keep-alive simultâneas, reportando vazão e latências.
+importacao: mede `import dashboard` com python -X importtime e falha se passar do
+            orçamento, se algum módulo proibido (ex.: plotly.express) for importado
+            ou se o import escrever na saída.
+sessoes:    sobe o dashboard (iniciar.py) num subprocesso e abre várias sessões
+            simultâneas pelo websocket do Streamlit, como abas do navegador
+            (navegação entre páginas, paginação de vídeos, análise de links e
+            busca de usuários); reporta latência dos reruns (p50/p95/p99), RSS e
+            CPU do servidor. Widget do roteiro que a página não desenhou conta
+            como erro de script, separado dos reruns que não terminaram.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def _percentis_ms(latencias):
+    valores = np.array(latencias) * 1000
+    return {p: float(np.percentile(valores, p)) for p in (50, 95, 99)}
+
+
+# ========== CARGA NA API DE LINKS ==========
+def _amostrar_links(caminho_banco, quantidade):
+    """Links reais do banco misturados com variações e links desconhecidos"""
+    conn = sqlite3.connect(caminho_banco)
+    try:
+        urls = [linha[0] for linha in conn.execute(
+            "SELECT url FROM valid_videos WHERE url IS NOT NULL AND url != '' ORDER BY RANDOM() LIMIT ?",
+            (quantidade,)
+        )]
+    finally:
+        conn.close()
+
+    amostra = []
+    for i, url in enumerate(urls):
+        if i % 5 == 0:
+            url = url + ('&' if '?' in url else '?') + 'utm_source=discord'
+        amostra.append(url)
+    amostra.extend(f"https://www.tiktok.com/@desconhecido{i}/video/{9 * 10**18 + i}" for i in range(max(1, quantidade // 10)))
+    return amostra
+
+
+async def _requisicao(leitor, escritor, host, corpo):
+    escritor.write(
+        (f"POST /verificar HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+         f"Content-Length: {len(corpo)}\r\n\r\n").encode('latin-1') + corpo
+    )
+    await escritor.drain()
+    cabecalho = await leitor.readuntil(b'\r\n\r\n')
+    tamanho = 0
+    for linha in cabecalho.decode('latin-1').split('\r\n'):
+        if linha.lower().startswith('content-length:'):
+            tamanho = int(linha.split(':', 1)[1])
+    await leitor.readexactly(tamanho)
+    return cabecalho.split(b' ', 2)[1] == b'200'
+
+
+async def _cliente(host, porta, links, lote, restantes, latencias, falhas):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    try:
+        while restantes[0] > 0:
+            restantes[0] -= 1
+            corpo = json.dumps({'urls': random.sample(links, min(lote, len(links)))}).encode('utf-8')
+            inicio = time.perf_counter()
+            ok = await _requisicao(leitor, escritor, host, corpo)
+            latencias.append(time.perf_counter() - inicio)
+            if not ok:
+                falhas[0] += 1
+    finally:
+        escritor.close()
+
+
+async def _aguardar_servidor(host, porta, limite_s=120):
+    fim = time.time() + limite_s
+    while time.time() < fim:
+        try:
+            leitor, escritor = await asyncio.open_connection(host, porta)
+            escritor.write(f"GET /saude HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+            await escritor.drain()
+            await leitor.read()
+            escritor.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def _disparar_carga(host, porta, links, conexoes, requisicoes, lote):
+    restantes = [requisicoes]
+    latencias = []
+    falhas = [0]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _cliente(host, porta, links, lote, restantes, latencias, falhas) for _ in range(conexoes)
+    ))
+    return time.perf_counter() - inicio, latencias, falhas[0]
+
+
+def benchmark_api(args):
+    links = _amostrar_links(args.banco, args.links)
+    if not links:
+        print("❌ Nenhum link encontrado em valid_videos")
+        return 1
+
+    servidor = None
+    if not args.servidor_existente:
+        servidor = subprocess.Popen(
+            [sys.executable, os.path.join(DIRETORIO, 'api_links.py'),
+             '--host', args.host, '--porta', str(args.porta), '--banco', args.banco],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    try:
+        if not asyncio.run(_aguardar_servidor(args.host, args.porta)):
+            print("❌ API não respondeu a tempo")
+            return 1
+
+        # Aquecimento: primeira passada popula o cache de resultados do servidor
+        asyncio.run(_disparar_carga(args.host, args.porta, links, min(args.conexoes, 4), min(args.requisicoes, 100), args.lote))
+
+        duracao, latencias, falhas = asyncio.run(
+            _disparar_carga(args.host, args.porta, links, args.conexoes, args.requisicoes, args.lote)
+        )
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    percentis = _percentis_ms(latencias)
+    print(f"🔗 API de links: {len(latencias):,} requisições × {args.lote} links, {args.conexoes} conexões")
+    print(f"   Vazão: {len(latencias) / duracao:,.0f} req/s ({len(latencias) * args.lote / duracao:,.0f} links/s)")
+    print(f"   Latência: p50 {percentis[50]:.2f} ms | p95 {percentis[95]:.2f} ms | p99 {percentis[99]:.2f} ms")
+    print(f"   Falhas: {falhas}")
+    return 1 if falhas else 0
+
+
+# ========== ORÇAMENTO DE IMPORTAÇÃO ==========
+# Bibliotecas que o Streamlit já carrega sozinho: o orçamento mede o que o dashboard acrescenta
+MODULOS_BASE = ('streamlit', 'pandas', 'numpy')
+# Módulos que só devem ser importados quando uma página desenha um gráfico
+MODULOS_SOB_DEMANDA = ('plotly.express',)
+
+_LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _medir_importacao(modulo):
+    """Roda `import <modulo>` com -X importtime num interpretador novo.
+
+    Devolve (total em ms, [(submódulo direto, acumulado em ms)], módulos importados, saída padrão).
+    """
+    base = '; '.join(f'import {nome}' for nome in MODULOS_BASE)
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'{base}; import {modulo}'],
+        cwd=DIRETORIO, capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else 'falha no import')
+
+    # importtime lista os filhos antes do pai; a indentação do nome dá a profundidade
+    total_ms, filhos, importados, pendentes = None, [], set(), []
+    for linha in processo.stderr.splitlines():
+        casamento = _LINHA_IMPORTTIME.match(linha)
+        if not casamento:
+            continue
+        acumulado_ms = int(casamento.group(2)) / 1000
+        profundidade = (len(casamento.group(3)) - 1) // 2
+        nome = casamento.group(4)
+        importados.add(nome)
+        if profundidade > 0:
+            pendentes.append((profundidade, nome, acumulado_ms))
+            continue
+        if nome == modulo:
+            total_ms = acumulado_ms
+            filhos = [(filho, tempo) for nivel, filho, tempo in pendentes if nivel == 1]
+        pendentes = []
+    if total_ms is None:
+        raise RuntimeError(f"{modulo} não apareceu na saída do -X importtime (já importado por {', '.join(MODULOS_BASE)}?)")
+    return total_ms, filhos, importados, processo.stdout
+
+
+def benchmark_importacao(args):
+    medicoes = sorted((_medir_importacao(args.modulo) for _ in range(args.repeticoes)), key=lambda medicao: medicao[0])
+    # Mediana das repetições: a primeira costuma pagar cache frio de disco
+    total_ms, filhos, importados, saida = medicoes[len(medicoes) // 2]
+
+    print(f"📦 import {args.modulo}: {total_ms:.1f} ms (mediana de {args.repeticoes}; "
+          f"{', '.join(MODULOS_BASE)} já importados) | orçamento {args.orcamento_ms:.0f} ms")
+    # Maiores imports feitos pelo próprio módulo (acumulado inclui os submódulos)
+    for nome, acumulado_ms in sorted(filhos, key=lambda filho: filho[1], reverse=True)[:args.top]:
+        print(f"   {acumulado_ms:8.1f} ms  {nome}")
+
+    falhas = []
+    if total_ms > args.orcamento_ms:
+        falhas.append(f"import levou {total_ms:.1f} ms (orçamento {args.orcamento_ms:.0f} ms)")
+    proibidos = [nome for nome in MODULOS_SOB_DEMANDA if nome in importados]
+    if proibidos:
+        falhas.append(f"módulos que deveriam ser sob demanda: {', '.join(proibidos)}")
+    if saida.strip():
+        falhas.append(f"o import escreveu na saída: {saida.strip().splitlines()[0]}")
+
+    for falha in falhas:
+        print(f"   ❌ {falha}")
+    if not falhas:
+        print("   ✅ Dentro do orçamento, sem efeitos colaterais")
+    return 1 if falhas else 0
+
+
+# ========== SESSÕES SIMULTÂNEAS DO DASHBOARD ==========
+PLATAFORMAS_SINTETICAS = ('tiktok', 'youtube', 'instagram')
+NICHOS_SINTETICOS = ('gamer', 'chef', 'danca', 'tech', 'moda', 'humor')
+PALAVRAS_TITULOS = "tutorial review gameplay como fazer receita dança tech unboxing vlog desafio".split()
+
+
+def _totais_zerados():
+    return dict.fromkeys(['videos', 'views', 'likes', 'comments', 'shares'] +
+                         [f'{p}_{m}' for p in PLATAFORMAS_SINTETICAS for m in ('views', 'videos')], 0)
+
+
+def _gerar_banco_sintetico(caminho, usuarios, videos, semente=42):
+    """Banco com cached_stats e valid_videos no formato do bot (views com cauda longa)"""
+    aleatorio = random.Random(semente)
+    conn = sqlite3.connect(caminho)
+    try:
+        conn.executescript("""
+        DROP TABLE IF EXISTS cached_stats;
+        DROP TABLE IF EXISTS valid_videos;
+        CREATE TABLE cached_stats (
+            user_id TEXT PRIMARY KEY, discord_username TEXT, total_videos INTEGER, total_views INTEGER,
+            total_likes INTEGER, total_comments INTEGER, total_shares INTEGER,
+            tiktok_views INTEGER, tiktok_videos INTEGER, youtube_views INTEGER, youtube_videos INTEGER,
+            instagram_views INTEGER, instagram_videos INTEGER, updated_at TEXT
+        );
+        CREATE TABLE valid_videos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, url TEXT, title TEXT, platform TEXT,
+            views INTEGER, likes INTEGER, comments INTEGER, shares INTEGER, created_at TEXT
+        );
+        """)
+        contas = [(str(10**17 + i), f"{aleatorio.choice(NICHOS_SINTETICOS)}{i}") for i in range(usuarios)]
+        totais = {user_id: _totais_zerados() for user_id, _ in contas}
+        # 20% dos usuários sem vídeos, como os inscritos que ainda não postaram
+        com_videos = contas[:max(1, int(usuarios * 0.8))]
+
+        linhas_videos = []
+        for i in range(videos):
+            user_id, nome = aleatorio.choice(com_videos)
+            plataforma = aleatorio.choice(PLATAFORMAS_SINTETICAS)
+            if plataforma == 'tiktok':
+                url = f"https://www.tiktok.com/@{nome}/video/{7 * 10**18 + i}"
+            elif plataforma == 'youtube':
+                url = f"https://youtube.com/shorts/{i:011d}"
+            else:
+                url = f"https://www.instagram.com/reel/C{i:09d}/"
+            views = int(aleatorio.paretovariate(1.2) * 500)
+            likes = int(views * aleatorio.random() * 0.1)
+            comentarios, compartilhamentos = likes // 10, likes // 20
+            titulo = " ".join(aleatorio.sample(PALAVRAS_TITULOS, 3)) + f" #{i}"
+            linhas_videos.append((user_id, url, titulo, plataforma, views, likes, comentarios, compartilhamentos, "2025-01-01"))
+
+            total = totais[user_id]
+            total['videos'] += 1
+            total['views'] += views
+            total['likes'] += likes
+            total['comments'] += comentarios
+            total['shares'] += compartilhamentos
+            total[f'{plataforma}_views'] += views
+            total[f'{plataforma}_videos'] += 1
+
+        conn.executemany(
+            "INSERT INTO valid_videos (user_id, url, title, platform, views, likes, comments, shares, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas_videos
+        )
+        conn.executemany(
+            "INSERT INTO cached_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(user_id, nome, t['videos'], t['views'], t['likes'], t['comments'], t['shares'],
+              t['tiktok_views'], t['tiktok_videos'], t['youtube_views'], t['youtube_videos'],
+              t['instagram_views'], t['instagram_videos'], "2025-01-01")
+             for (user_id, nome), t in ((conta, totais[conta[0]]) for conta in contas)]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _rss_cpu_arvore(pid):
+    """RSS (MB) e CPU (s) do processo somados aos dos filhos vivos (ex.: pool da análise em lote)"""
+    processos = {}
+    try:
+        nomes = os.listdir('/proc')
+    except OSError:
+        return 0.0, 0.0
+    for nome in nomes:
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f'/proc/{nome}/stat') as f:
+                # Os campos vêm depois do nome do executável, que pode conter espaços
+                campos = f.read().rsplit(')', 1)[1].split()
+            processos[int(nome)] = (int(campos[1]), int(campos[11]) + int(campos[12]))
+        except (OSError, ValueError, IndexError):
+            continue
+
+    arvore, pendentes = [], [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        arvore.append(atual)
+        pendentes.extend(filho for filho, (pai, _) in processos.items() if pai == atual)
+
+    rss_mb, ticks = 0.0, 0
+    for atual in arvore:
+        ticks += processos.get(atual, (0, 0))[1]
+        try:
+            with open(f'/proc/{atual}/statm') as f:
+                rss_mb += int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+        except (OSError, ValueError, IndexError):
+            continue
+    return rss_mb, ticks / os.sysconf('SC_CLK_TCK')
+
+
+class WidgetAusente(LookupError):
+    """O roteiro pediu um widget que a página não desenhou: erro do roteiro/script, não do rerun"""
+
+
+def _achar_widget(elementos, tipo, rotulo):
+    """(proto, fragment_id) do widget pelo rótulo no último desenho da página"""
+    for tipo_elemento, elemento, fragmento in elementos:
+        if tipo_elemento == tipo and elemento.label == rotulo:
+            return elemento, fragmento
+    raise WidgetAusente(f"{tipo} '{rotulo}' não foi desenhado")
+
+
+class SessaoNavegador:
+    """Uma aba do dashboard falando com o servidor pelo websocket /_stcore/stream.
+
+    Faz o que o frontend faz: reenvia a cada rerun os valores já preenchidos,
+    manda o gatilho do botão só no rerun do clique e, para widgets dentro de
+    um fragmento, pede o rerun só daquele fragmento.
+    """
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.elementos = []
+        self.estados = {}
+
+    async def rerun(self, gatilho=None, fragmento=''):
+        """Devolve (latência até o script_finished, exceções desenhadas na página)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensagem = BackMsg()
+        estado_cliente = mensagem.rerun_script
+        estado_cliente.query_string = ''
+        estado_cliente.page_script_hash = ''
+        estado_cliente.widget_states.widgets.extend(self.estados.values())
+        if gatilho is not None:
+            estado_cliente.widget_states.widgets.append(gatilho)
+        if fragmento:
+            estado_cliente.fragment_id = fragmento
+
+        inicio = time.perf_counter()
+        await self.conexao.send(mensagem.SerializeToString())
+        desenhados, excecoes = [], []
+        while True:
+            recebida = ForwardMsg()
+            recebida.ParseFromString(await self.conexao.recv())
+            tipo = recebida.WhichOneof('type')
+            if tipo == 'delta' and recebida.delta.WhichOneof('type') == 'new_element':
+                elemento = recebida.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                if tipo_elemento == 'exception':
+                    excecoes.append(f"{elemento.exception.type}: {elemento.exception.message}")
+                desenhados.append((tipo_elemento, getattr(elemento, tipo_elemento), recebida.delta.fragment_id))
+            elif tipo == 'script_finished':
+                if recebida.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+                # st.rerun(): o que foi desenhado até aqui é descartado pelo frontend
+                desenhados, excecoes = [], []
+        latencia = time.perf_counter() - inicio
+
+        if fragmento:
+            self.elementos = [item for item in self.elementos if item[2] != fragmento] + desenhados
+        else:
+            self.elementos = desenhados
+        return latencia, excecoes
+
+    async def interagir(self, tipo, rotulo, valor=None):
+        """Clica no botão ou preenche o widget e espera o rerun; WidgetAusente se não estiver na página"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        elemento, fragmento = _achar_widget(self.elementos, tipo, rotulo)
+        estado = WidgetState()
+        estado.id = elemento.id
+        if tipo == 'button':
+            estado.trigger_value = True
+            return await self.rerun(estado, fragmento)
+        estado.string_value = valor
+        self.estados[elemento.id] = estado
+        return await self.rerun(fragmento=fragmento)
+
+
+def _roteiro_sessao(aleatorio, links, nomes):
+    """Passos de uma visita típica: [(etapa, tipo do widget, rótulo, valor)]; cada passo termina num rerun"""
+    def ir_para(pagina):
+        return ('radio', "Escolha a análise:", pagina)
+
+    return [
+        ("rankings", *ir_para("🏆 Rankings Completos")),
+        ("videos", *ir_para("🎬 Vídeos Completos")),
+        ("videos.proxima_pagina", 'button', "Próxima Página ➡️", None),
+        ("videos.proxima_pagina", 'button', "Próxima Página ➡️", None),
+        ("contas", *ir_para("🔗 Gestão de Contas")),
+        ("contas.link", 'text_input', "🔗 Cole o link do vídeo aqui:", aleatorio.choice(links)),
+        ("contas.analisar", 'button', "🔍 Analisar Link", None),
+        ("individual", *ir_para("👤 Análise Individual")),
+        ("individual.busca", 'text_input', "🔎 Buscar usuário:", aleatorio.choice(nomes)[:4]),
+        ("executivo", *ir_para("📊 Dashboard Executivo")),
+    ]
+
+
+async def _simular_sessao(indice, args, url, links, nomes, medicoes, erros_script, falhas_rerun):
+    import websockets
+
+    aleatorio = random.Random(indice)
+    passos = []
+    for _ in range(args.rodadas):
+        passos.extend(_roteiro_sessao(aleatorio, links, nomes))
+
+    try:
+        async with websockets.connect(url, subprotocols=['streamlit'], max_size=None) as conexao:
+            sessao = SessaoNavegador(conexao)
+            latencia, excecoes = await asyncio.wait_for(sessao.rerun(), args.timeout)
+            medicoes.append(("inicial", latencia))
+            erros_script.extend(f"sessão {indice} inicial: {excecao}" for excecao in excecoes)
+
+            for etapa, tipo, rotulo, valor in passos:
+                if args.pausa_s > 0:
+                    # Tempo de leitura do visitante entre um clique e outro
+                    await asyncio.sleep(aleatorio.expovariate(1 / args.pausa_s))
+                try:
+                    latencia, excecoes = await asyncio.wait_for(sessao.interagir(tipo, rotulo, valor), args.timeout)
+                except WidgetAusente as e:
+                    erros_script.append(f"sessão {indice} {etapa}: {e}")
+                    continue
+                medicoes.append((etapa, latencia))
+                erros_script.extend(f"sessão {indice} {etapa}: {excecao}" for excecao in excecoes)
+    except (asyncio.TimeoutError, OSError, websockets.exceptions.WebSocketException) as e:
+        # Rerun que não terminou (limite estourado ou conexão caída): a sessão para aqui
+        falhas_rerun.append(f"sessão {indice}: {type(e).__name__}: {e}")
+
+
+async def _disparar_sessoes(args, url, links, nomes, pid):
+    medicoes, erros_script, falhas_rerun = [], [], []
+    rss_inicio, cpu_inicio = _rss_cpu_arvore(pid)
+    rss_pico = [rss_inicio]
+    fim_amostragem = asyncio.Event()
+
+    async def amostrar_rss():
+        while not fim_amostragem.is_set():
+            rss_pico[0] = max(rss_pico[0], _rss_cpu_arvore(pid)[0])
+            await asyncio.sleep(0.2)
+
+    amostrador = asyncio.ensure_future(amostrar_rss())
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _simular_sessao(indice, args, url, links, nomes, medicoes, erros_script, falhas_rerun)
+        for indice in range(args.sessoes)
+    ))
+    duracao = time.perf_counter() - inicio
+    fim_amostragem.set()
+    await amostrador
+    cpu_s = _rss_cpu_arvore(pid)[1] - cpu_inicio
+    return duracao, medicoes, erros_script, falhas_rerun, (rss_inicio, rss_pico[0], cpu_s)
+
+
+def _aguardar_pronto(servidor, urls, limite_s):
+    """Espera cada URL responder 200, na ordem: /pronto (caches aquecidos) e o health do Streamlit"""
+    from urllib.error import URLError
+    from urllib.request import urlopen
+
+    fim = time.time() + limite_s
+    pendentes = list(urls)
+    while pendentes and time.time() < fim and servidor.poll() is None:
+        try:
+            with urlopen(pendentes[0], timeout=2) as resposta:
+                if resposta.status == 200:
+                    pendentes.pop(0)
+                    continue
+        except (URLError, OSError):
+            pass
+        time.sleep(0.5)
+    return not pendentes
+
+
+def benchmark_sessoes(args):
+    try:
+        import websockets  # noqa: F401 (dependência do servidor do Streamlit)
+    except ImportError:
+        print("❌ O pacote websockets é necessário para as sessões (pip install websockets)")
+        return 1
+
+    diretorio_temporario = tempfile.TemporaryDirectory(prefix='trendx_carga_')
+    banco = args.banco
+    if not banco:
+        banco = os.path.join(diretorio_temporario.name, 'trendx_bot.db')
+        inicio = time.perf_counter()
+        _gerar_banco_sintetico(banco, args.usuarios, args.videos)
+        print(f"🧪 Banco sintético: {args.usuarios:,} usuários, {args.videos:,} vídeos "
+              f"({time.perf_counter() - inicio:.1f}s)")
+    banco = os.path.abspath(banco)
+
+    servidor = None
+    try:
+        conn = sqlite3.connect(banco)
+        try:
+            links = [linha[0] for linha in conn.execute(
+                "SELECT url FROM valid_videos WHERE url IS NOT NULL AND url != '' ORDER BY RANDOM() LIMIT 500")]
+            nomes = [linha[0] for linha in conn.execute(
+                "SELECT discord_username FROM cached_stats WHERE discord_username IS NOT NULL "
+                "AND discord_username != '' ORDER BY RANDOM() LIMIT 500")]
+        finally:
+            conn.close()
+        if not links or not nomes:
+            print("❌ Banco sem vídeos ou usuários para o roteiro")
+            return 1
+
+        # O dashboard de verdade (iniciar.py), com o histórico num arquivo descartável
+        ambiente = dict(os.environ, TRENDX_SAUDE_PORTA=str(args.porta_saude),
+                        TRENDX_HISTORICO_DB=os.path.join(diretorio_temporario.name, 'trendx_historico.db'),
+                        STREAMLIT_BROWSER_GATHER_USAGE_STATS='false')
+        comando = [sys.executable, os.path.join(DIRETORIO, 'iniciar.py'), '--porta', str(args.porta),
+                   '--endereco', '127.0.0.1', '--banco', banco]
+        if args.sem_aquecimento:
+            comando.append('--sem-aquecimento')
+        inicio = time.perf_counter()
+        servidor = subprocess.Popen(comando, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # /pronto fica verde antes de o Streamlit abrir a porta (o aquecimento vem antes do bootstrap)
+        prontidao = [f"http://127.0.0.1:{args.porta_saude}/pronto", f"http://127.0.0.1:{args.porta}/_stcore/health"]
+        if not _aguardar_pronto(servidor, prontidao, args.timeout):
+            print("❌ Dashboard não ficou pronto a tempo")
+            return 1
+        print(f"🚀 Dashboard pronto em {time.perf_counter() - inicio:.1f}s (porta {args.porta})")
+
+        duracao, medicoes, erros_script, falhas_rerun, (rss_inicio, rss_pico, cpu_s) = asyncio.run(
+            _disparar_sessoes(args, f"ws://127.0.0.1:{args.porta}/_stcore/stream", links, nomes, servidor.pid)
+        )
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+        diretorio_temporario.cleanup()
+
+    if not medicoes:
+        print("❌ Nenhum rerun concluído")
+        for falha in falhas_rerun[:10]:
+            print(f"   ❌ {falha}")
+        return 1
+
+    percentis = _percentis_ms([latencia for _, latencia in medicoes])
+    print(f"👥 {args.sessoes} sessões simultâneas × {args.rodadas} rodadas (pausa média {args.pausa_s:g}s): "
+          f"{len(medicoes):,} reruns em {duracao:.1f}s")
+    print(f"   Rerun: p50 {percentis[50]:,.0f} ms | p95 {percentis[95]:,.0f} ms | p99 {percentis[99]:,.0f} ms")
+    print(f"   Servidor: RSS {rss_inicio:,.0f} → pico {rss_pico:,.0f} MB | "
+          f"CPU {cpu_s:.1f}s ({cpu_s / duracao * 100:.0f}% de um núcleo)")
+
+    por_etapa = {}
+    for etapa, latencia in medicoes:
+        por_etapa.setdefault(etapa, []).append(latencia)
+    for etapa, latencias in por_etapa.items():
+        percentis_etapa = _percentis_ms(latencias)
+        print(f"   {etapa:<24} {len(latencias):5d}×  p50 {percentis_etapa[50]:8,.0f} ms  p95 {percentis_etapa[95]:8,.0f} ms")
+
+    for titulo, problemas in (("Erros de script", erros_script), ("Reruns que não terminaram", falhas_rerun)):
+        if not problemas:
+            continue
+        print(f"   {titulo}: {len(problemas)}")
+        for problema in problemas[:10]:
+            print(f"   ❌ {problema}")
+        if len(problemas) > 10:
+            print(f"   ... e mais {len(problemas) - 10}")
+
+    acima_do_orcamento = args.orcamento_p95_ms and percentis[95] > args.orcamento_p95_ms
+    if acima_do_orcamento:
+        print(f"   ❌ p95 acima do orçamento de {args.orcamento_p95_ms:,.0f} ms")
+    return 1 if erros_script or falhas_rerun or acima_do_orcamento else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks locais do TrendX Analytics")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_api = subparsers.add_parser('api', help="Carga na API assíncrona de links")
+    parser_api.add_argument('--banco', default='trendx_bot.db')
+    parser_api.add_argument('--host', default='127.0.0.1')
+    parser_api.add_argument('--porta', type=int, default=8765)
+    parser_api.add_argument('--conexoes', type=int, default=50)
+    parser_api.add_argument('--requisicoes', type=int, default=5000)
+    parser_api.add_argument('--lote', type=int, default=10, help="Links por requisição")
+    parser_api.add_argument('--links', type=int, default=2000, help="Tamanho da amostra de links do banco")
+    parser_api.add_argument('--servidor-existente', action='store_true', help="Não subir a API; usar uma já em execução")
+    parser_api.set_defaults(funcao=benchmark_api)
+
+    parser_importacao = subparsers.add_parser('importacao', help="Orçamento de tempo do import do dashboard")
+    parser_importacao.add_argument('--modulo', default='dashboard')
+    parser_importacao.add_argument('--orcamento-ms', type=float, default=400)
+    parser_importacao.add_argument('--repeticoes', type=int, default=5)
+    parser_importacao.add_argument('--top', type=int, default=8, help="Maiores módulos a listar")
+    parser_importacao.set_defaults(funcao=benchmark_importacao)
+
+    parser_sessoes = subparsers.add_parser('sessoes', help="Sessões simultâneas no dashboard rodando (websocket)")
+    parser_sessoes.add_argument('--banco', help="Banco existente; sem ele, gera um sintético temporário")
+    parser_sessoes.add_argument('--porta', type=int, default=8611, help="Porta do Streamlit do benchmark")
+    parser_sessoes.add_argument('--porta-saude', type=int, default=8612, help="Porta do /pronto do benchmark")
+    parser_sessoes.add_argument('--usuarios', type=int, default=2000, help="Usuários do banco sintético")
+    parser_sessoes.add_argument('--videos', type=int, default=20000, help="Vídeos do banco sintético")
+    parser_sessoes.add_argument('--sessoes', type=int, default=8, help="Sessões simultâneas")
+    parser_sessoes.add_argument('--rodadas', type=int, default=3, help="Repetições do roteiro por sessão")
+    parser_sessoes.add_argument('--pausa-s', type=float, default=2.0, help="Pausa média entre cliques (0 = sem pausa)")
+    parser_sessoes.add_argument('--timeout', type=float, default=300, help="Limite de um rerun (e da subida do servidor), em segundos")
+    parser_sessoes.add_argument('--orcamento-p95-ms', type=float, default=0, help="Falhar se o p95 passar disso (0 = sem limite)")
+    parser_sessoes.add_argument('--sem-aquecimento', action='store_true', help="Subir o dashboard sem aquecer os caches")
+    parser_sessoes.set_defaults(funcao=benchmark_sessoes)
+
+    args = parser.parse_args()
+    sys.exit(args.funcao(args))
+
+
+if __name__ == "__main__":
+    main()
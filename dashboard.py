@@ -1,20 +1,54 @@
 import streamlit as st
 import sqlite3
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import importlib
 import os
 from datetime import datetime, timedelta
 import numpy as np
 import json
+import re
+import html
+import time
+import threading
+import functools
+import atexit
+import logging
+import pickle
+from collections import defaultdict, OrderedDict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    add_script_run_ctx = get_script_run_ctx = None
+
+logger = logging.getLogger("trendx.dashboard")
+
+# ========== IMPORTS SOB DEMANDA ==========
+class _ModuloSobDemanda:
+    """Importa o módulo no primeiro acesso a um atributo (ex.: px.bar ao desenhar um gráfico)"""
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return getattr(self._modulo, atributo)
+
+# Plotly só é carregado quando alguma página desenha um gráfico
+px = _ModuloSobDemanda('plotly.express')
+go = _ModuloSobDemanda('plotly.graph_objects')
+pio = _ModuloSobDemanda('plotly.io')
 
 # ========== CONFIGURAÇÃO PARA PRODUÇÃO ==========
-def setup_for_production():
-    """Configurações específicas para deploy em produção"""
-    
-    # Detectar se está em ambiente de deploy
-    is_production = (
+def detectar_producao():
+    """Se alguma variável de plataforma de deploy está definida (não altera o ambiente)"""
+    return bool(
         os.getenv('STREAMLIT_SERVER_PORT') or 
         os.getenv('PORT') or 
         os.getenv('RAILWAY_ENVIRONMENT') or
@@ -24,8 +58,10 @@ def setup_for_production():
         os.getenv('VERCEL') or
         os.getenv('DOCKER_CONTAINER')
     )
-    
-    if is_production:
+
+def setup_for_production():
+    """Configurações específicas para deploy em produção"""
+    if detectar_producao():
         # Configurações para deploy
         port = os.getenv('PORT', '8501')
         os.environ['STREAMLIT_SERVER_PORT'] = port
@@ -42,24 +78,11 @@ def setup_for_production():
         print("🏠 Rodando em ambiente local")
         return False
 
-# Executar setup imediatamente
-IS_PRODUCTION = setup_for_production()
-
-# ========== CONFIGURAÇÃO DA PÁGINA ==========
-st.set_page_config(
-    page_title="TrendX Analytics - Versão Completa",
-    page_icon="📈",
-    layout="wide",
-    initial_sidebar_state="expanded",
-    menu_items={
-        'Get Help': None,
-        'Report a bug': None,
-        'About': "TrendX Analytics - Dashboard com Métricas Reais das Redes Sociais"
-    }
-)
+# Só detecção no import; setup_for_production() roda em configurar_pagina()
+IS_PRODUCTION = detectar_producao()
 
 # ========== CSS AVANÇADO ==========
-st.markdown("""
+CSS_DASHBOARD = """
 <style>
     .main-header {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -226,7 +249,24 @@ st.markdown("""
         }
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# ========== CONFIGURAÇÃO DA PÁGINA ==========
+def configurar_pagina():
+    """Setup de produção, configuração da página e CSS; primeiro passo de main()"""
+    setup_for_production()
+    st.set_page_config(
+        page_title="TrendX Analytics - Versão Completa",
+        page_icon="📈",
+        layout="wide",
+        initial_sidebar_state="expanded",
+        menu_items={
+            'Get Help': None,
+            'Report a bug': None,
+            'About': "TrendX Analytics - Dashboard com Métricas Reais das Redes Sociais"
+        }
+    )
+    st.markdown(CSS_DASHBOARD, unsafe_allow_html=True)
 
 # ========== CONFIGURAÇÕES ==========
 DB_PATH = "trendx_bot.db"
@@ -234,6 +274,193 @@ DB_PATH = "trendx_bot.db"
 # TTL otimizado baseado no ambiente
 CACHE_TTL = 300 if not IS_PRODUCTION else 600  # 5 min local, 10 min produção
 
+# TRENDX_SNAPSHOT=memoria (ou um diretório, ex.: /dev/shm) faz os loaders lerem uma cópia
+# do banco feita pela API de backup do SQLite, renovada a cada CACHE_TTL
+SNAPSHOT_MODO = os.getenv('TRENDX_SNAPSHOT', '').strip()
+SNAPSHOT_PAGINAS_POR_PASSO = 256
+SNAPSHOT_PAUSA_S = 0.005
+# Escritas na origem reiniciam a cópia em passos; depois disso a renovação é adiada
+# (a cópia atual continua valendo) em vez de travar o bot numa cópia de um passo só
+SNAPSHOT_REINICIOS_MAX = 3
+SNAPSHOT_ADIAMENTO_S = 30
+
+# TRENDX_COMPETICOES="Temporada 1=/dados/t1.db;Temporada 2=/dados/t2.db" registra outras
+# competições para o ranking entre competições; a do DB_PATH entra sempre como 'principal'
+COMPETICAO_PRINCIPAL = 'principal'
+COMPETICOES_MAX_THREADS = 4
+
+# TRENDX_SNAPSHOT_COMPARTILHADO=/dev/shm/trendx: as réplicas leem os DataFrames publicados
+# por publicador_snapshot.py (Arrow IPC mapeado em memória) em vez de carregar do banco
+SNAPSHOT_COMPARTILHADO_DIR = os.getenv('TRENDX_SNAPSHOT_COMPARTILHADO', '').strip()
+MANIFESTO_SNAPSHOT = 'manifesto.json'
+
+# Histórico de métricas por usuário (arquivo separado do banco do bot); vazio = trendx_historico.db
+# no mesmo diretório do DB_PATH
+HISTORICO_DB_PATH = os.getenv('TRENDX_HISTORICO_DB', '').strip()
+
+# Servidor lateral de saúde/prontidão (JSON); TRENDX_SAUDE_PORTA=0 desliga
+SAUDE_HOST = os.getenv('TRENDX_SAUDE_HOST', '0.0.0.0').strip()
+SAUDE_PORTA = int(os.getenv('TRENDX_SAUDE_PORTA', '8502').strip() or 0)
+# Conjuntos que precisam estar carregados para o processo receber tráfego
+CONJUNTOS_PRONTIDAO = ('usuarios', 'videos')
+# Dados mais velhos que isso aparecem como atrasados (a renovação deveria ter ocorrido)
+SAUDE_ATRASO_MAX_S = 2 * CACHE_TTL
+
+# Regiões independentes reexecutam sozinhas (st.fragment, Streamlit >= 1.37);
+# em versões anteriores rodam junto com a página inteira (ver fragmento())
+_FRAGMENTO_STREAMLIT = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+# ========== INSTRUMENTAÇÃO DE PERFORMANCE ==========
+# TRENDX_PERF=0 desliga a instrumentação: os decoradores devolvem a própria função
+PERF_ATIVO = os.getenv('TRENDX_PERF', '1').strip().lower() not in ('0', 'false', 'off', 'nao', 'não')
+
+# Registros por thread: o Streamlit executa cada sessão em sua própria thread
+_PERF_LOCAL = threading.local()
+
+try:
+    _TAMANHO_PAGINA = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _TAMANHO_PAGINA = 4096
+
+def _memoria_atual_mb():
+    """Memória residente atual do processo em MB (0 se indisponível)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _TAMANHO_PAGINA / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+def _contar_linhas(valor):
+    """Número de linhas de um resultado (DataFrame, Series, lista, dict)"""
+    if isinstance(valor, (pd.DataFrame, pd.Series, list, dict, tuple, set)):
+        return len(valor)
+    return None
+
+def reiniciar_registros_desempenho():
+    """Limpa os registros de tempo no início de cada execução do script"""
+    _PERF_LOCAL.registros = []
+    _PERF_LOCAL.nivel = 0
+    _PERF_LOCAL.inicio_execucao = time.perf_counter()
+
+def fragmento(func):
+    """st.fragment que zera os registros de desempenho quando só o fragmento reexecuta.
+
+    Nessas reexecuções main() não roda, então sem isso os registros de cada
+    rerun do fragmento se acumulariam nos da última execução completa.
+    """
+    if _FRAGMENTO_STREAMLIT is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        contexto = get_script_run_ctx() if get_script_run_ctx else None
+        if contexto is not None and getattr(contexto, 'fragment_ids_this_run', None):
+            reiniciar_registros_desempenho()
+        return func(*args, **kwargs)
+    return _FRAGMENTO_STREAMLIT(wrapper)
+
+def obter_registros_desempenho():
+    """Registros da execução atual, na ordem em que as etapas começaram"""
+    return sorted(getattr(_PERF_LOCAL, 'registros', []), key=lambda r: r['inicio'])
+
+def anexar_registros_desempenho(registros):
+    """Junta à execução atual os registros medidos em outra thread (ex.: pool de loaders)"""
+    if not PERF_ATIVO:
+        return
+    if not hasattr(_PERF_LOCAL, 'registros'):
+        reiniciar_registros_desempenho()
+    for registro in registros:
+        _PERF_LOCAL.registros.append(dict(registro, nivel=registro['nivel'] + _PERF_LOCAL.nivel))
+
+@contextmanager
+def _medir_bloco_ativo(nome, linhas=None):
+    if not hasattr(_PERF_LOCAL, 'registros'):
+        reiniciar_registros_desempenho()
+    registro = {'etapa': nome, 'linhas': linhas, 'nivel': _PERF_LOCAL.nivel}
+    rss_inicio = _memoria_atual_mb()
+    inicio = time.perf_counter()
+    _PERF_LOCAL.nivel += 1
+    try:
+        yield registro
+    finally:
+        _PERF_LOCAL.nivel -= 1
+        registro['inicio'] = inicio
+        registro['tempo_ms'] = (time.perf_counter() - inicio) * 1000
+        # RSS do processo inteiro: inclui o que outras sessões alocaram no mesmo intervalo
+        registro['rss_processo_mb'] = _memoria_atual_mb() - rss_inicio
+        _PERF_LOCAL.registros.append(registro)
+
+def medir_bloco(nome, linhas=None):
+    """Context manager que mede tempo, linhas e variação de RSS do processo num trecho de código.
+
+    O dicionário devolvido no `with` aceita `registro['linhas'] = n` quando a
+    quantidade só é conhecida no fim do trecho.
+    """
+    if not PERF_ATIVO:
+        # Dicionário novo por chamada: sessões simultâneas não escrevem no mesmo objeto
+        return nullcontext({})
+    return _medir_bloco_ativo(nome, linhas)
+
+def medir_desempenho(nome=None):
+    """Decorador de medição; com TRENDX_PERF=0 devolve a função sem alterações"""
+    def decorador(func):
+        if not PERF_ATIVO:
+            return func
+        rotulo = nome or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _medir_bloco_ativo(rotulo) as registro:
+                resultado = func(*args, **kwargs)
+                linhas = _contar_linhas(resultado)
+                if linhas is None:
+                    # Páginas não retornam nada: usar o tamanho do primeiro DataFrame recebido
+                    linhas = next((len(a) for a in args if isinstance(a, pd.DataFrame)), None)
+                registro['linhas'] = linhas
+                return resultado
+        
+        # Manter o .clear() das funções com st.cache_data
+        if hasattr(func, 'clear'):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorador
+
+def exibir_painel_desempenho():
+    """Expander "⏱️ Performance" na sidebar com os tempos da execução atual"""
+    if not PERF_ATIVO:
+        return
+    
+    registros = obter_registros_desempenho()
+    total_ms = (time.perf_counter() - getattr(_PERF_LOCAL, 'inicio_execucao', time.perf_counter())) * 1000
+    
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        st.metric("⏱️ Execução atual", f"{total_ms:,.0f} ms")
+        if not registros:
+            st.caption("Nenhuma etapa medida nesta execução")
+            return
+        
+        df_perf = pd.DataFrame({
+            'etapa': ["\u2003" * r['nivel'] + r['etapa'] for r in registros],
+            'tempo_ms': [r['tempo_ms'] for r in registros],
+            'linhas': [r['linhas'] for r in registros],
+            'rss_processo_mb': [r['rss_processo_mb'] for r in registros]
+        })
+        st.dataframe(
+            df_perf,
+            column_config={
+                "etapa": "🔧 Etapa",
+                "tempo_ms": st.column_config.NumberColumn("⏱️ ms", format="%.1f"),
+                "linhas": st.column_config.NumberColumn("📊 Linhas", format="%d"),
+                "rss_processo_mb": st.column_config.NumberColumn(
+                    "💾 Δ RSS processo (MB)", format="%.2f",
+                    help="Variação da memória do processo inteiro; inclui outras sessões ativas"
+                )
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption("💡 Defina TRENDX_PERF=0 para desligar a instrumentação")
+
 # ========== FUNÇÕES UTILITÁRIAS AVANÇADAS ==========
 def converter_para_numerico_seguro(series, valor_padrao=0):
     """Converte uma série para numérico de forma segura"""
@@ -242,6 +469,11 @@ def converter_para_numerico_seguro(series, valor_padrao=0):
     except:
         return pd.Series([valor_padrao] * len(series), index=series.index)
 
+def _rotulo_decimos(num, divisor, sufixo):
+    """Uma casa decimal arredondada metade-para-par sobre num / divisor * 10 (mesma conta de formatar_numeros)"""
+    decimos = int(np.round(num / divisor * 10))
+    return f"{decimos // 10}.{decimos % 10}{sufixo}"
+
 def formatar_numero(num):
     """Formatar números para exibição"""
     try:
@@ -256,16 +488,47 @@ def formatar_numero(num):
                 return "0"
         
         if num >= 1000000000:
-            return f"{num/1000000000:.1f}B"
+            return _rotulo_decimos(num, 1000000000, 'B')
         elif num >= 1000000:
-            return f"{num/1000000:.1f}M"
+            return _rotulo_decimos(num, 1000000, 'M')
         elif num >= 1000:
-            return f"{num/1000:.1f}K"
+            return _rotulo_decimos(num, 1000, 'K')
         else:
             return f"{int(num):,}"
     except:
         return "0"
 
+# Textos pré-montados usados por formatar_numeros
+_MENOR_INTEIRO_TABELA, _MAIOR_INTEIRO_TABELA = -999, 9999
+_TEXTOS_INTEIROS = np.array([str(i) for i in range(_MENOR_INTEIRO_TABELA, _MAIOR_INTEIRO_TABELA + 1)])
+_TEXTOS_DIGITOS = np.array(list('0123456789'))
+
+def formatar_numeros(valores):
+    """Versão vetorizada de formatar_numero: rótulos K/M/B de uma coluna inteira de uma vez"""
+    serie = pd.Series(valores)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype(object)
+    num = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float)
+    num = np.where(np.isfinite(num), num, 0.0)
+    
+    faixas = [num >= 1e9, num >= 1e6, num >= 1e3]
+    divisor = np.select(faixas, [1e9, 1e6, 1e3], default=1.0)
+    sufixo = np.select(faixas, ['B', 'M', 'K'], default='')
+    
+    # Uma casa decimal montada a partir dos décimos inteiros: só indexação em tabelas de texto
+    decimos = np.round(num / divisor * 10).astype(np.int64)
+    inteiros = np.where(divisor > 1, decimos // 10, np.trunc(num).astype(np.int64))
+    textos = _TEXTOS_INTEIROS[np.clip(inteiros, _MENOR_INTEIRO_TABELA, _MAIOR_INTEIRO_TABELA) - _MENOR_INTEIRO_TABELA]
+    grandes = np.char.add(np.char.add(np.char.add(textos, '.'), _TEXTOS_DIGITOS[decimos % 10]), sufixo)
+    rotulos = np.where(divisor > 1, grandes, textos).astype(object)
+    
+    # Fora da tabela (negativos com milhar, trilhões) é raro: fica com a versão escalar
+    fora = (inteiros < _MENOR_INTEIRO_TABELA) | (inteiros > _MAIOR_INTEIRO_TABELA)
+    if fora.any():
+        rotulos[fora] = [formatar_numero(valor) for valor in num[fora]]
+    
+    return pd.Series(rotulos, index=serie.index)
+
 def calcular_engajamento_por_plataforma(views, likes, comments, shares, platform):
     """Calcula engajamento usando as fórmulas oficiais de cada rede social"""
     if views == 0:
@@ -347,10 +610,184 @@ def obter_categoria_performance(score):
     else:
         return "😴 Inativo", "#6c757d"
 
-def conectar_banco():
-    """Conecta com o banco de dados"""
-    if not os.path.exists(DB_PATH):
-        st.error(f"⚠️ Banco de dados não encontrado: {DB_PATH}")
+# ========== SNAPSHOT DO BANCO ==========
+class SnapshotBanco:
+    """Cópia consistente de um banco feita com Connection.backup em passos curtos.
+
+    O bot só fica sem escrever durante cada passo de SNAPSHOT_PAGINAS_POR_PASSO
+    páginas; entre passos a cópia dorme SNAPSHOT_PAUSA_S. Todas as consultas até a
+    próxima renovação leem a mesma versão dos dados.
+
+    A renovação grava num arquivo (ou banco em memória) novo sem segurar
+    self._trava, que só protege a troca do caminho de leitura; enquanto uma
+    sessão renova, as outras continuam lendo a cópia atual.
+    """
+
+    class _MuitosReinicios(sqlite3.OperationalError):
+        pass
+
+    def __init__(self, origem, destino=SNAPSHOT_MODO, ttl=CACHE_TTL):
+        self.origem = origem
+        self.em_memoria = destino.lower() in ('1', 'memoria', 'memória', 'memory', ':memory:')
+        self.diretorio = None if self.em_memoria else destino
+        self.ttl = ttl
+        self.uri_leitura = None
+        self.criado_em = 0.0
+        self.duracao_copia = 0.0
+        self.copias = 0
+        self._conexao_mantida = None
+        self._caminho = None
+        # Cópia anterior: ainda pode estar aberta por quem pegou a URI antes da troca
+        self._aposentada = (None, None)
+        self._adiado_ate = 0.0
+        self._trava = threading.Lock()
+        self._trava_copia = threading.Lock()
+
+    def _novo_destino(self):
+        """(uri de escrita, uri de leitura, caminho do arquivo ou None) da próxima cópia"""
+        self.copias += 1
+        nome = f"trendx_snapshot_{os.getpid()}_{id(self):x}_{self.copias}"
+        if self.em_memoria:
+            # Banco em memória compartilhado: vive enquanto houver uma conexão aberta nele
+            uri = f"file:{nome}?mode=memory&cache=shared"
+            return uri, uri, None
+        caminho = os.path.join(self.diretorio, f"{nome}.db")
+        return f"file:{caminho}", f"file:{caminho}?mode=ro", caminho
+
+    @staticmethod
+    def _liberar(conexao, caminho):
+        if conexao is not None:
+            conexao.close()
+        if caminho and os.path.exists(caminho):
+            os.remove(caminho)
+
+    def _copiar(self):
+        """Faz a cópia nova fora de self._trava e troca o caminho de leitura sob ela"""
+        with self._trava:
+            uri, uri_leitura, caminho = self._novo_destino()
+        inicio = time.perf_counter()
+        origem = sqlite3.connect(self.origem, timeout=30)
+        destino = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            origem.backup(destino, pages=SNAPSHOT_PAGINAS_POR_PASSO, progress=self._progresso_copia())
+        except Exception:
+            self._liberar(destino, caminho)
+            raise
+        finally:
+            origem.close()
+        if not self.em_memoria:
+            destino.close()
+
+        with self._trava:
+            aposentada = self._aposentada
+            self._aposentada = (self._conexao_mantida, self._caminho)
+            self.uri_leitura, self._caminho = uri_leitura, caminho
+            self._conexao_mantida = destino if self.em_memoria else None
+            self.criado_em = time.time()
+            self.duracao_copia = time.perf_counter() - inicio
+        # A cópia de duas renovações atrás já não tem leitores
+        self._liberar(*aposentada)
+
+    def _progresso_copia(self):
+        estado = {'restantes': None, 'reinicios': 0}
+
+        def progresso(status, restantes, total):
+            # Páginas restantes não diminuíram: a origem mudou e o SQLite recomeçou a cópia
+            if estado['restantes'] is not None and restantes >= estado['restantes']:
+                estado['reinicios'] += 1
+                if estado['reinicios'] > SNAPSHOT_REINICIOS_MAX:
+                    raise self._MuitosReinicios()
+            estado['restantes'] = restantes
+            # Pausa entre passos para o escritor pegar a trava
+            time.sleep(SNAPSHOT_PAUSA_S)
+        return progresso
+
+    def _precisa_renovar(self):
+        with self._trava:
+            agora = time.time()
+            if agora < self._adiado_ate:
+                return False
+            return self.uri_leitura is None or agora - self.criado_em >= self.ttl
+
+    def _renovar(self):
+        try:
+            with medir_bloco("sql.snapshot_backup"):
+                self._copiar()
+        except self._MuitosReinicios:
+            # Bot escrevendo sem parar: segue com a cópia atual e tenta de novo mais tarde
+            with self._trava:
+                self._adiado_ate = time.time() + SNAPSHOT_ADIAMENTO_S
+                sem_copia = self.uri_leitura is None
+            logger.warning("Cópia de %s reiniciada mais de %d vezes; renovação adiada por %ds",
+                           self.origem, SNAPSHOT_REINICIOS_MAX, SNAPSHOT_ADIAMENTO_S)
+            if sem_copia:
+                raise
+
+    def conectar(self):
+        """Conexão somente leitura com a cópia, renovando-a se passou do TTL"""
+        if self._precisa_renovar():
+            # Uma renovação por vez; quem já tem uma cópia para ler não espera por ela
+            if self._trava_copia.acquire(blocking=self.uri_leitura is None):
+                try:
+                    if self._precisa_renovar():
+                        self._renovar()
+                finally:
+                    self._trava_copia.release()
+        with self._trava:
+            uri_leitura = self.uri_leitura
+        if uri_leitura is None:
+            raise self._MuitosReinicios(f"Sem cópia de {self.origem}: renovação adiada")
+        conn = sqlite3.connect(uri_leitura, uri=True)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def descartar(self):
+        """Fecha a cópia em memória ou apaga o arquivo da cópia (e da anterior)"""
+        with self._trava:
+            atual, aposentada = (self._conexao_mantida, self._caminho), self._aposentada
+            self._conexao_mantida = self._caminho = self.uri_leitura = None
+            self._aposentada = (None, None)
+        self._liberar(*atual)
+        self._liberar(*aposentada)
+
+    def expirar(self):
+        """Força a renovação na próxima conexão (ex.: "Recarregar Dados"), sem esperar o TTL"""
+        with self._trava:
+            self.criado_em = 0.0
+            self._adiado_ate = 0.0
+
+    def idade_s(self):
+        return time.time() - self.criado_em if self.uri_leitura else None
+
+
+_SNAPSHOTS_BANCO = {}
+_TRAVA_SNAPSHOTS = threading.Lock()
+
+def obter_snapshot_banco(caminho=None):
+    """Snapshot compartilhado do processo para o banco em `caminho` (padrão DB_PATH)"""
+    caminho = os.path.abspath(caminho or DB_PATH)
+    with _TRAVA_SNAPSHOTS:
+        snapshot = _SNAPSHOTS_BANCO.get(caminho)
+        if snapshot is None:
+            snapshot = _SNAPSHOTS_BANCO[caminho] = SnapshotBanco(caminho)
+    return snapshot
+
+def expirar_snapshots_banco():
+    """Faz todas as cópias do processo serem renovadas na próxima consulta"""
+    for snapshot in list(_SNAPSHOTS_BANCO.values()):
+        snapshot.expirar()
+
+@atexit.register
+def _descartar_snapshots_banco():
+    # Cópias em tmpfs sobreviveriam ao processo
+    for snapshot in list(_SNAPSHOTS_BANCO.values()):
+        snapshot.descartar()
+
+def conectar_banco(db_path=None):
+    """Conecta com o banco de dados (padrão DB_PATH)"""
+    caminho = db_path or DB_PATH
+    if not os.path.exists(caminho):
+        st.error(f"⚠️ Banco de dados não encontrado: {caminho}")
         if IS_PRODUCTION:
             st.error("🚨 **ERRO DE DEPLOY:** Banco de dados não está no servidor!")
             st.info("🔧 **Para corrigir:**")
@@ -359,39 +796,51 @@ def conectar_banco():
             st.info("3. O arquivo deve estar na raiz do projeto")
             st.info("4. Faça um novo deploy incluindo o banco")
         return None
-    return sqlite3.connect(DB_PATH)
+    if SNAPSHOT_MODO:
+        try:
+            return obter_snapshot_banco(caminho).conectar()
+        except (sqlite3.Error, OSError) as e:
+            # Sem snapshot (ex.: diretório inexistente) o dashboard segue lendo o banco direto
+            logger.warning("Snapshot do banco indisponível, lendo %s direto: %s", caminho, e)
+    return sqlite3.connect(caminho)
 
+# Consultas dos loaders; migracoes.py indices usa as mesmas para o EXPLAIN QUERY PLAN
+SQL_USUARIOS_COMPLETO = """
+    SELECT 
+        user_id,
+        discord_username,
+        COALESCE(total_videos, 0) as total_videos,
+        COALESCE(total_views, 0) as total_views,
+        COALESCE(total_likes, 0) as total_likes,
+        COALESCE(total_comments, 0) as total_comments,
+        COALESCE(total_shares, 0) as total_shares,
+        COALESCE(tiktok_views, 0) as tiktok_views,
+        COALESCE(tiktok_videos, 0) as tiktok_videos,
+        COALESCE(youtube_views, 0) as youtube_views,
+        COALESCE(youtube_videos, 0) as youtube_videos,
+        COALESCE(instagram_views, 0) as instagram_views,
+        COALESCE(instagram_videos, 0) as instagram_videos,
+        updated_at
+    FROM cached_stats 
+    WHERE discord_username IS NOT NULL 
+    AND discord_username != ''
+    ORDER BY total_views DESC
+"""
+
+@medir_desempenho()
 @st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_usuarios_completo():
-    """Carrega TODOS os usuários (incluindo com zeros)"""
-    conn = conectar_banco()
+def carregar_dados_usuarios_completo(db_path=None):
+    """Carrega TODOS os usuários (incluindo com zeros); db_path escolhe a competição"""
+    conn = conectar_banco(db_path)
     if not conn:
         return pd.DataFrame()
     
     try:
-        query = """
-        SELECT 
-            user_id,
-            discord_username,
-            COALESCE(total_videos, 0) as total_videos,
-            COALESCE(total_views, 0) as total_views,
-            COALESCE(total_likes, 0) as total_likes,
-            COALESCE(total_comments, 0) as total_comments,
-            COALESCE(total_shares, 0) as total_shares,
-            COALESCE(tiktok_views, 0) as tiktok_views,
-            COALESCE(tiktok_videos, 0) as tiktok_videos,
-            COALESCE(youtube_views, 0) as youtube_views,
-            COALESCE(youtube_videos, 0) as youtube_videos,
-            COALESCE(instagram_views, 0) as instagram_views,
-            COALESCE(instagram_videos, 0) as instagram_videos,
-            updated_at
-        FROM cached_stats 
-        WHERE discord_username IS NOT NULL 
-        AND discord_username != ''
-        ORDER BY total_views DESC
-        """
+        query = SQL_USUARIOS_COMPLETO
         
-        df = pd.read_sql_query(query, conn)
+        with medir_bloco("sql.cached_stats") as registro:
+            df = pd.read_sql_query(query, conn)
+            registro['linhas'] = len(df)
         conn.close()
         
         if df.empty:
@@ -414,28 +863,29 @@ def carregar_dados_usuarios_completo():
         df['total_videos'] = pd.to_numeric(df['total_videos'], errors='coerce').fillna(0)
         df['total_interactions'] = pd.to_numeric(df['total_interactions'], errors='coerce').fillna(0)
         
-        # Calcular taxa de engajamento por plataforma (usando fórmulas reais)
-        df['plataforma_principal'] = df.apply(
-            lambda x: determinar_plataforma_principal(
-                x['tiktok_views'], x['youtube_views'], x['instagram_views']
-            ), axis=1
-        )
+        with medir_bloco("score_usuarios", linhas=len(df)):
+            # Calcular taxa de engajamento por plataforma (usando fórmulas reais)
+            df['plataforma_principal'] = df.apply(
+                lambda x: determinar_plataforma_principal(
+                    x['tiktok_views'], x['youtube_views'], x['instagram_views']
+                ), axis=1
+            )
         
-        # Taxa de engajamento usando fórmulas reais das redes sociais
-        df['taxa_engajamento'] = df.apply(
-            lambda x: calcular_engajamento_por_plataforma(
-                x['total_views'], x['total_likes'], x['total_comments'], 
-                x['total_shares'], x['plataforma_principal'] or 'geral'
-            ), axis=1
-        )
+            # Taxa de engajamento usando fórmulas reais das redes sociais
+            df['taxa_engajamento'] = df.apply(
+                lambda x: calcular_engajamento_por_plataforma(
+                    x['total_views'], x['total_likes'], x['total_comments'], 
+                    x['total_shares'], x['plataforma_principal'] or 'geral'
+                ), axis=1
+            )
         
-        # Score de performance usando métricas reais
-        df['score_performance'] = df.apply(
-            lambda x: calcular_score_performance_real(
-                x['total_views'], x['total_likes'], x['total_comments'], 
-                x['total_shares'], x['total_videos'], x['plataforma_principal']
-            ), axis=1
-        ).round(1)
+            # Score de performance usando métricas reais
+            df['score_performance'] = df.apply(
+                lambda x: calcular_score_performance_real(
+                    x['total_views'], x['total_likes'], x['total_comments'], 
+                    x['total_shares'], x['total_videos'], x['plataforma_principal']
+                ), axis=1
+            ).round(1)
         
         # Métricas complementares
         df['media_views_por_video'] = (df['total_views'] / df['total_videos'].replace(0, 1)).round(0)
@@ -492,6 +942,7 @@ def carregar_dados_usuarios_completo():
             )
         )
         
+        marcar_versao_snapshot(df)
         return df
         
     except Exception as e:
@@ -500,10 +951,21 @@ def carregar_dados_usuarios_completo():
             conn.close()
         return pd.DataFrame()
 
+SQL_VIDEOS_COMPLETO = """
+    SELECT 
+        v.*,
+        cs.discord_username
+    FROM valid_videos v
+    LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
+    WHERE cs.discord_username IS NOT NULL
+    ORDER BY v.id DESC
+"""
+
+@medir_desempenho()
 @st.cache_data(ttl=CACHE_TTL)
-def carregar_videos_completo():
-    """Carrega TODOS os vídeos do banco (sem limite)"""
-    conn = conectar_banco()
+def carregar_videos_completo(db_path=None):
+    """Carrega TODOS os vídeos do banco (sem limite); db_path escolhe a competição"""
+    conn = conectar_banco(db_path)
     if not conn:
         return pd.DataFrame()
     
@@ -519,17 +981,11 @@ def carregar_videos_completo():
         total_videos = cursor.fetchone()[0]
         
         # Query sem LIMIT para carregar todos
-        query = """
-        SELECT 
-            v.*,
-            cs.discord_username
-        FROM valid_videos v
-        LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
-        WHERE cs.discord_username IS NOT NULL
-        ORDER BY v.id DESC
-        """
+        query = SQL_VIDEOS_COMPLETO
         
-        df = pd.read_sql_query(query, conn)
+        with medir_bloco("sql.valid_videos") as registro:
+            df = pd.read_sql_query(query, conn)
+            registro['linhas'] = len(df)
         conn.close()
         
         if not df.empty:
@@ -543,19 +999,20 @@ def carregar_videos_completo():
             if 'views' in df.columns and 'likes' in df.columns:
                 df['interactions'] = df['likes'] + df['comments'] + df['shares']
                 
-                # Taxa de engajamento usando fórmula da plataforma específica
-                df['engagement_rate'] = df.apply(
-                    lambda x: calcular_engajamento_por_plataforma(
-                        x['views'], x['likes'], x['comments'], 
-                        x['shares'], x.get('platform', 'geral')
-                    ), axis=1
-                )
+                with medir_bloco("score_videos", linhas=len(df)):
+                    # Taxa de engajamento usando fórmula da plataforma específica
+                    df['engagement_rate'] = df.apply(
+                        lambda x: calcular_engajamento_por_plataforma(
+                            x['views'], x['likes'], x['comments'], 
+                            x['shares'], x.get('platform', 'geral')
+                        ), axis=1
+                    )
                 
-                # Score do vídeo simplificado
-                df['video_score'] = (
-                    df['engagement_rate'] * 0.6 +  # 60% engajamento
-                    np.log1p(df['views']) * 0.4     # 40% alcance
-                ).round(2)
+                    # Score do vídeo simplificado
+                    df['video_score'] = (
+                        df['engagement_rate'] * 0.6 +  # 60% engajamento
+                        np.log1p(df['views']) * 0.4     # 40% alcance
+                    ).round(2)
                 
                 # Categoria do vídeo (convertida para string)
                 try:
@@ -573,8 +1030,10 @@ def carregar_videos_completo():
                 df['tem_link'] = df['url'].notna() & (df['url'] != '') & (df['url'].str.len() > 10)
             
             # Adicionar informação sobre o total
-            st.session_state['total_videos_banco'] = total_videos
-            st.session_state['videos_carregados'] = len(df)
+            if db_path is None:
+                st.session_state['total_videos_banco'] = total_videos
+                st.session_state['videos_carregados'] = len(df)
+            marcar_versao_snapshot(df)
         
         return df
         
@@ -584,6 +1043,555 @@ def carregar_videos_completo():
             conn.close()
         return pd.DataFrame()
 
+@medir_desempenho()
+@st.cache_data(ttl=CACHE_TTL)
+def carregar_resumo_dados():
+    """Contagens para a sidebar direto do SQL, sem carregar os DataFrames completos"""
+    resumo = {
+        'total_usuarios': 0, 'usuarios_ativos': 0,
+        'total_videos_banco': 0, 'total_videos': 0, 'videos_com_link': 0, 'views_videos': 0
+    }
+    conn = conectar_banco()
+    if not conn:
+        return resumo
+    
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tabelas = {t[0] for t in cursor.fetchall()}
+        
+        if 'cached_stats' in tabelas:
+            # Mesmos critérios de carregar_dados_usuarios_completo
+            cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(CAST(COALESCE(total_views, 0) AS REAL) > 0), 0)
+            FROM cached_stats
+            WHERE discord_username IS NOT NULL AND discord_username != ''
+            """)
+            resumo['total_usuarios'], resumo['usuarios_ativos'] = cursor.fetchone()
+        
+        if 'rollup_usuario_plataforma' in tabelas:
+            # Agregados mantidos pelos triggers de migracoes.py: uma linha por usuário × plataforma
+            cursor.execute("SELECT COALESCE(SUM(videos), 0) FROM rollup_usuario_plataforma")
+            resumo['total_videos_banco'] = cursor.fetchone()[0]
+            
+            if 'cached_stats' in tabelas:
+                cursor.execute("""
+                SELECT
+                    COALESCE(SUM(r.videos), 0),
+                    COALESCE(SUM(r.videos_com_link), 0),
+                    COALESCE(SUM(CAST(r.views AS REAL)), 0)
+                FROM rollup_usuario_plataforma r
+                JOIN cached_stats cs ON r.user_id = cs.user_id
+                WHERE cs.discord_username IS NOT NULL
+                """)
+                resumo['total_videos'], resumo['videos_com_link'], resumo['views_videos'] = cursor.fetchone()
+        
+        elif 'valid_videos' in tabelas:
+            cursor.execute("SELECT COUNT(*) FROM valid_videos")
+            resumo['total_videos_banco'] = cursor.fetchone()[0]
+            
+            if 'cached_stats' in tabelas:
+                # Mesmos critérios de carregar_videos_completo (vídeos com usuário associado)
+                cursor.execute("""
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(v.url IS NOT NULL AND v.url != '' AND LENGTH(v.url) > 10), 0),
+                    COALESCE(SUM(CAST(COALESCE(v.views, 0) AS REAL)), 0)
+                FROM valid_videos v
+                LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
+                WHERE cs.discord_username IS NOT NULL
+                """)
+                resumo['total_videos'], resumo['videos_com_link'], resumo['views_videos'] = cursor.fetchone()
+        
+        conn.close()
+        return resumo
+        
+    except Exception as e:
+        st.error(f"Erro ao carregar resumo dos dados: {str(e)}")
+        if conn:
+            conn.close()
+        return resumo
+
+# ========== COMPETIÇÕES ==========
+def ler_competicoes(valor=None):
+    """{id da competição: caminho do banco}, com a principal (DB_PATH) primeiro.
+
+    Aceita "nome=caminho" ou só o caminho (o nome vira o nome do arquivo),
+    separados por ';' ou quebra de linha.
+    """
+    valor = os.getenv('TRENDX_COMPETICOES', '') if valor is None else valor
+    competicoes = {COMPETICAO_PRINCIPAL: DB_PATH}
+    principal = os.path.abspath(DB_PATH)
+    for item in re.split(r'[;\n]+', valor):
+        nome, separador, caminho = item.strip().partition('=')
+        if not separador:
+            nome, caminho = os.path.splitext(os.path.basename(nome))[0], nome
+        nome, caminho = nome.strip(), caminho.strip()
+        if not caminho or os.path.abspath(caminho) == principal:
+            continue
+        competicoes[nome or caminho] = caminho
+    return competicoes
+
+def carregar_conjunto_competicoes(carregar, competicoes=None):
+    """Roda o loader (com cache próprio por db_path) de cada competição em paralelo.
+
+    Devolve {id: DataFrame}; as threads herdam o contexto da sessão do
+    Streamlit para que o cache e as mensagens funcionem nelas.
+    """
+    competicoes = competicoes or ler_competicoes()
+    contexto = get_script_run_ctx() if get_script_run_ctx else None
+    
+    def carregar_competicao(competicao, caminho):
+        if contexto is not None:
+            add_script_run_ctx(threading.current_thread(), contexto)
+        reiniciar_registros_desempenho()
+        with medir_bloco(f"competicoes.{competicao}") as registro:
+            # A principal usa a mesma entrada de cache das outras páginas
+            df = carregar(None if competicao == COMPETICAO_PRINCIPAL else caminho)
+            registro['linhas'] = len(df)
+        return df, obter_registros_desempenho()
+    
+    resultados = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(COMPETICOES_MAX_THREADS, len(competicoes)))) as pool:
+        futuros = {
+            competicao: pool.submit(carregar_competicao, competicao, caminho)
+            for competicao, caminho in competicoes.items()
+        }
+        for competicao, futuro in futuros.items():
+            resultados[competicao], registros = futuro.result()
+            anexar_registros_desempenho(registros)
+    return resultados
+
+@medir_desempenho()
+def carregar_usuarios_competicoes():
+    """Usuários de todas as competições num DataFrame só, com a coluna 'competicao'"""
+    resultados = carregar_conjunto_competicoes(carregar_dados_usuarios_completo)
+    partes = [df.assign(competicao=competicao) for competicao, df in resultados.items() if not df.empty]
+    if not partes:
+        return pd.DataFrame()
+    
+    df = pd.concat(partes, ignore_index=True)
+    marcar_versao_snapshot(df)
+    return df
+
+# ========== SNAPSHOT COMPARTILHADO ENTRE RÉPLICAS ==========
+def ler_manifesto_snapshot(diretorio):
+    """{conjunto: {'arquivo', 'versao', 'linhas', 'publicado_em'}} publicado no diretório"""
+    with open(os.path.join(diretorio, MANIFESTO_SNAPSHOT), encoding='utf-8') as f:
+        return json.load(f)
+
+class SnapshotCompartilhado:
+    """DataFrames publicados em arquivos Arrow IPC, mapeados em memória sem cópia.
+
+    Todas as réplicas do host mapeiam os mesmos arquivos (páginas compartilhadas
+    pelo kernel). O manifesto é trocado de uma vez pelo publicador; quando a
+    versão de um conjunto muda, a réplica mapeia o arquivo novo na próxima leitura.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self._mtime_manifesto = None
+        self._manifesto = {}
+        self._dataframes = {}
+        self._ultimo_erro = None
+        self._trava = threading.Lock()
+
+    def _atualizar_manifesto(self):
+        mtime = os.stat(os.path.join(self.diretorio, MANIFESTO_SNAPSHOT)).st_mtime_ns
+        if mtime != self._mtime_manifesto:
+            self._manifesto = ler_manifesto_snapshot(self.diretorio)
+            self._mtime_manifesto = mtime
+
+    def _mapear(self, info):
+        import pyarrow as pa
+        from pyarrow import ipc
+        mapa = pa.memory_map(os.path.join(self.diretorio, info['arquivo']))
+        # split_blocks: colunas numéricas viram visões do arquivo mapeado, sem consolidar blocos
+        df = ipc.open_file(mapa).read_all().to_pandas(split_blocks=True)
+        df.attrs['versao_snapshot'] = info['versao']
+        df.attrs['linhas_snapshot'] = len(df)
+        df.attrs['carregado_em'] = time.time()
+        return df
+
+    def obter(self, conjunto):
+        """Cópia rasa do DataFrame publicado, ou None se não houver publicação utilizável"""
+        with self._trava:
+            try:
+                self._atualizar_manifesto()
+                info = self._manifesto.get(conjunto)
+                if info is None:
+                    return None
+                versao, df = self._dataframes.get(conjunto, (None, None))
+                if versao != info['versao']:
+                    with medir_bloco(f"snapshot_compartilhado.{conjunto}", linhas=info.get('linhas')):
+                        df = self._mapear(info)
+                    self._dataframes[conjunto] = (info['versao'], df)
+            except (OSError, ValueError, KeyError, ImportError) as e:
+                # Avisar uma vez por erro: sem publicação cada rerun cairia aqui
+                if str(e) != self._ultimo_erro:
+                    self._ultimo_erro = str(e)
+                    logger.warning("Snapshot compartilhado indisponível (%s), usando o banco: %s", conjunto, e)
+                return None
+        # Cópia rasa por sessão: colunas novas numa página não aparecem nas outras
+        return df.copy(deep=False)
+
+    def estado(self):
+        """{conjunto: versão mapeada}; lido pelo servidor de saúde enquanto sessões mapeiam"""
+        with self._trava:
+            return {conjunto: versao for conjunto, (versao, _) in self._dataframes.items()}
+    
+    def idade_s(self):
+        """Segundos desde a última publicação do manifesto (None se nunca lido)"""
+        with self._trava:
+            mtime = self._mtime_manifesto
+        return time.time() - mtime / 1e9 if mtime else None
+
+@st.cache_resource(show_spinner=False)
+def _leitor_snapshot_compartilhado(diretorio):
+    return SnapshotCompartilhado(diretorio)
+
+def obter_snapshot_compartilhado():
+    """Leitor do snapshot compartilhado do processo (None se o modo estiver desligado)"""
+    if not SNAPSHOT_COMPARTILHADO_DIR:
+        return None
+    return _leitor_snapshot_compartilhado(SNAPSHOT_COMPARTILHADO_DIR)
+
+# ========== VERSÃO DO SNAPSHOT ==========
+def calcular_versao_snapshot(df):
+    """Hash do conteúdo do DataFrame, usado como chave dos índices em memória"""
+    try:
+        hash_conteudo = int(pd.util.hash_pandas_object(df, index=False).sum()) & 0xFFFFFFFFFFFFFFFF
+        return f"{hash_conteudo:016x}-{len(df)}"
+    except Exception:
+        # Colunas com tipos não hasheáveis: versão única para este objeto
+        return f"obj{id(df):x}-{len(df)}-{time.time_ns():x}"
+
+def marcar_versao_snapshot(df):
+    """Grava a versão do snapshot em df.attrs (sobrevive ao cache do Streamlit)"""
+    df.attrs['versao_snapshot'] = calcular_versao_snapshot(df)
+    df.attrs['linhas_snapshot'] = len(df)
+    df.attrs['carregado_em'] = time.time()
+    return df
+
+def versao_snapshot(df):
+    """Versão do snapshot de um DataFrame carregado pelos loaders.
+
+    O pandas propaga `attrs` para recortes do DataFrame, então a versão só é
+    reaproveitada quando o número de linhas confere; caso contrário é recalculada.
+    """
+    if df.attrs.get('versao_snapshot') and df.attrs.get('linhas_snapshot') == len(df):
+        return df.attrs['versao_snapshot']
+    return calcular_versao_snapshot(df)
+
+# ========== HISTÓRICO DE MÉTRICAS ==========
+# Arquivo separado: o banco do bot continua só com os totais atuais
+# Métricas de cached_stats acompanhadas no histórico (gravadas como deltas)
+METRICAS_HISTORICO = ['total_views', 'total_likes', 'total_comments', 'total_shares', 'total_videos',
+                      'tiktok_views', 'youtube_views', 'instagram_views']
+
+def caminho_historico():
+    """Arquivo do histórico: TRENDX_HISTORICO_DB ou trendx_historico.db ao lado do DB_PATH"""
+    return HISTORICO_DB_PATH or os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "trendx_historico.db")
+
+def conectar_historico():
+    """Conecta com o banco de histórico, criando as tabelas se necessário"""
+    conn = sqlite3.connect(caminho_historico(), timeout=10)
+    colunas = ',\n        '.join(f"{m} INTEGER NOT NULL DEFAULT 0" for m in METRICAS_HISTORICO)
+    colunas_ranks = ',\n        '.join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in COLUNAS_RANK_MOVIMENTO)
+    conn.executescript(f"""
+    CREATE TABLE IF NOT EXISTS capturas (
+        versao TEXT PRIMARY KEY,
+        capturado_em INTEGER NOT NULL,
+        usuarios INTEGER NOT NULL,
+        alterados INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS estado_atual (
+        user_id TEXT PRIMARY KEY,
+        {colunas}
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS deltas_usuarios (
+        user_id TEXT NOT NULL,
+        capturado_em INTEGER NOT NULL,
+        base INTEGER NOT NULL DEFAULT 0,
+        {colunas},
+        PRIMARY KEY (user_id, capturado_em)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_deltas_capturado_em ON deltas_usuarios (capturado_em);
+    CREATE TABLE IF NOT EXISTS versoes_ranks (
+        ordem INTEGER PRIMARY KEY,
+        versao TEXT NOT NULL UNIQUE,
+        registrado_em INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS ranks_usuarios (
+        versao TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        {colunas_ranks},
+        PRIMARY KEY (versao, user_id)
+    ) WITHOUT ROWID;
+    """)
+    return conn
+
+def registrar_captura_historico(df_usuarios, capturado_em=None):
+    """Grava os deltas por usuário desde a última captura; roda uma vez por versão dos dados.
+
+    Só usuários com alguma métrica alterada geram linha. A primeira aparição de
+    um usuário fica marcada como base (delta a partir de zero = valores absolutos).
+    Devolve o número de linhas gravadas.
+    """
+    if df_usuarios.empty or 'user_id' not in df_usuarios.columns:
+        return 0
+    
+    versao = versao_snapshot(df_usuarios)
+    capturado_em = int(capturado_em or time.time())
+    metricas = [m for m in METRICAS_HISTORICO if m in df_usuarios.columns]
+    
+    atual = df_usuarios[['user_id'] + metricas].copy()
+    atual['user_id'] = atual['user_id'].astype(str)
+    atual[metricas] = atual[metricas].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
+    atual = atual.drop_duplicates('user_id')
+    
+    conn = conectar_historico()
+    try:
+        # Verificação, leitura do estado_atual e gravação numa transação só: duas réplicas
+        # capturando versões diferentes ao mesmo tempo não calculam o delta contra o mesmo
+        # estado (a segunda espera a primeira terminar e lê o estado já atualizado)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM capturas WHERE versao = ?", (versao,)).fetchone():
+                return 0
+            
+            anterior = pd.read_sql_query(f"SELECT user_id, {', '.join(metricas)} FROM estado_atual", conn)
+            combinado = atual.merge(anterior, on='user_id', how='left', suffixes=('', '_anterior'), indicator=True)
+            
+            deltas = pd.DataFrame({
+                'user_id': combinado['user_id'],
+                'capturado_em': capturado_em,
+                'base': (combinado['_merge'] == 'left_only').astype(int)
+            })
+            for m in metricas:
+                deltas[m] = (combinado[m] - combinado[f'{m}_anterior'].fillna(0)).astype('int64')
+            alterados = (deltas['base'] == 1) | (deltas[metricas] != 0).any(axis=1)
+            deltas = deltas[alterados]
+            
+            colunas = ', '.join(metricas)
+            marcadores = ', '.join('?' * len(metricas))
+            # Duas versões no mesmo segundo somam os deltas na mesma linha
+            conn.executemany(
+                f"""INSERT INTO deltas_usuarios (user_id, capturado_em, base, {colunas})
+                VALUES (?, ?, ?, {marcadores})
+                ON CONFLICT (user_id, capturado_em) DO UPDATE SET
+                {', '.join(f'{m} = {m} + excluded.{m}' for m in metricas)}""",
+                deltas.itertuples(index=False, name=None)
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO estado_atual (user_id, {colunas}) VALUES (?, {marcadores})",
+                atual[alterados.to_numpy()].itertuples(index=False, name=None)
+            )
+            conn.execute("INSERT INTO capturas VALUES (?, ?, ?, ?)", (versao, capturado_em, len(atual), len(deltas)))
+        return len(deltas)
+    except sqlite3.IntegrityError:
+        # Outro processo registrou a mesma versão ao mesmo tempo
+        return 0
+    finally:
+        conn.close()
+
+@st.cache_resource(show_spinner=False)
+def _versoes_capturadas():
+    """Versões de usuários que este processo já enviou ao histórico"""
+    return set()
+
+def capturar_historico(df_usuarios):
+    """Registra a versão dos usuários no histórico uma vez por processo; falhas vão para o log.
+
+    Chamado por carregar_conjunto (toda execução, com ou sem acerto no cache),
+    pelo aquecimento e por publicador_snapshot.py; a tabela capturas descarta
+    versões que outro processo já gravou.
+    """
+    if df_usuarios.empty:
+        return 0
+    versao = versao_snapshot(df_usuarios)
+    capturadas = _versoes_capturadas()
+    if versao in capturadas:
+        return 0
+    try:
+        gravadas = registrar_captura_historico(df_usuarios)
+    except sqlite3.Error as e:
+        logger.warning("Falha ao gravar histórico em %s: %s", caminho_historico(), e)
+        return 0
+    capturadas.add(versao)
+    return gravadas
+
+@st.cache_data(ttl=CACHE_TTL)
+def carregar_historico_usuario(user_id):
+    """Deltas de um usuário por captura, com os totais acumulados (consulta pela chave user_id + data)"""
+    if not os.path.exists(caminho_historico()):
+        return pd.DataFrame()
+    
+    conn = conectar_historico()
+    try:
+        df = pd.read_sql_query(
+            f"SELECT capturado_em, base, {', '.join(METRICAS_HISTORICO)} FROM deltas_usuarios "
+            "WHERE user_id = ? ORDER BY capturado_em",
+            conn, params=(str(user_id),)
+        )
+    finally:
+        conn.close()
+    
+    if df.empty:
+        return df
+    for m in METRICAS_HISTORICO:
+        df[f'acumulado_{m}'] = df[m].cumsum()
+    df['data'] = pd.to_datetime(df['capturado_em'], unit='s')
+    return df
+
+@st.cache_data(ttl=CACHE_TTL)
+def carregar_maiores_altas(metrica, desde, limite=50):
+    """Usuários que mais cresceram numa métrica desde `desde` (epoch), sem contar capturas base"""
+    if metrica not in METRICAS_HISTORICO:
+        raise ValueError(f"Métrica sem histórico: {metrica}")
+    if not os.path.exists(caminho_historico()):
+        return pd.DataFrame(columns=['user_id', 'crescimento', 'capturas'])
+    
+    conn = conectar_historico()
+    try:
+        return pd.read_sql_query(
+            f"""SELECT user_id, SUM({metrica}) AS crescimento, COUNT(*) AS capturas
+            FROM deltas_usuarios
+            WHERE capturado_em >= ? AND base = 0
+            GROUP BY user_id
+            HAVING crescimento > 0
+            ORDER BY crescimento DESC
+            LIMIT ?""",
+            conn, params=(int(desde), int(limite))
+        )
+    finally:
+        conn.close()
+
+# ========== MOVIMENTAÇÃO NOS RANKINGS ==========
+COLUNAS_RANK_MOVIMENTO = ['rank_views', 'rank_performance']
+# Versões de snapshot com ranks guardados no banco de histórico
+RANKS_VERSOES_MAX = 4
+
+def calcular_diff_ranks(anterior, atual):
+    """Compara os ranks de dois snapshots com um merge vetorizado por user_id (O(N)).
+
+    Para cada coluna de rank: `delta_<col>` (positivo = subiu), `novo_<col>`
+    (sem rank antes, com rank agora) e `saiu_<col>` (o contrário).
+    """
+    combinado = atual.merge(anterior, on='user_id', how='outer', suffixes=('', '_anterior'))
+    resultado = pd.DataFrame({'user_id': combinado['user_id']})
+    for coluna in COLUNAS_RANK_MOVIMENTO:
+        agora = combinado[coluna].fillna(0).to_numpy()
+        antes = combinado[f'{coluna}_anterior'].fillna(0).to_numpy()
+        resultado[f'delta_{coluna}'] = np.where((agora > 0) & (antes > 0), antes - agora, 0).astype(int)
+        resultado[f'novo_{coluna}'] = (agora > 0) & (antes <= 0)
+        resultado[f'saiu_{coluna}'] = (agora <= 0) & (antes > 0)
+    return resultado.set_index('user_id')
+
+def registrar_ranks_historico(versao, ranks):
+    """Grava os ranks da versão (se ainda não gravados) e devolve os da versão anterior, ou None.
+
+    A anterior é a registrada logo antes no banco de histórico, então réplicas
+    e processos reiniciados comparam a mesma dupla de versões. Só as últimas
+    RANKS_VERSOES_MAX versões são mantidas.
+    """
+    colunas = ', '.join(COLUNAS_RANK_MOVIMENTO)
+    conn = conectar_historico()
+    try:
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO versoes_ranks (versao, registrado_em) VALUES (?, ?)",
+                (versao, int(time.time()))
+            )
+            if cursor.rowcount:
+                conn.executemany(
+                    f"INSERT INTO ranks_usuarios (versao, user_id, {colunas}) "
+                    f"VALUES (?, ?, {', '.join('?' * len(COLUNAS_RANK_MOVIMENTO))})",
+                    ((versao,) + linha for linha in ranks.itertuples(index=False, name=None))
+                )
+                antigas = "SELECT versao FROM versoes_ranks ORDER BY ordem DESC LIMIT -1 OFFSET ?"
+                conn.execute(f"DELETE FROM ranks_usuarios WHERE versao IN ({antigas})", (RANKS_VERSOES_MAX,))
+                conn.execute(f"DELETE FROM versoes_ranks WHERE versao IN ({antigas})", (RANKS_VERSOES_MAX,))
+        
+        anterior = conn.execute(
+            "SELECT versao FROM versoes_ranks "
+            "WHERE ordem < (SELECT ordem FROM versoes_ranks WHERE versao = ?) ORDER BY ordem DESC LIMIT 1",
+            (versao,)
+        ).fetchone()
+        if anterior is None:
+            return None
+        return pd.read_sql_query(
+            f"SELECT user_id, {colunas} FROM ranks_usuarios WHERE versao = ?", conn, params=(anterior[0],)
+        )
+    finally:
+        conn.close()
+
+class HistoricoRanks:
+    """Diffs de ranks por versão do snapshot; os ranks ficam no banco de histórico.
+
+    O processo só memoriza os diffs já calculados, então um reinício (ou outra
+    réplica) chega ao mesmo resultado lendo a versão anterior do banco.
+    """
+    
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._diffs = OrderedDict()
+    
+    def diff(self, versao, df_usuarios):
+        """Movimentação da versão em relação à anterior, ou None se não houver anterior"""
+        with self._trava:
+            if versao in self._diffs:
+                return self._diffs[versao]
+        
+        ranks = df_usuarios[['user_id'] + COLUNAS_RANK_MOVIMENTO].copy()
+        ranks['user_id'] = ranks['user_id'].astype(str)
+        ranks[COLUNAS_RANK_MOVIMENTO] = ranks[COLUNAS_RANK_MOVIMENTO].fillna(0).astype('int64')
+        ranks = ranks.drop_duplicates('user_id')
+        try:
+            anterior = registrar_ranks_historico(versao, ranks)
+        except sqlite3.Error as e:
+            # Sem banco não há anterior confiável; tenta de novo na próxima execução
+            logger.warning("Falha ao gravar ranks em %s: %s", caminho_historico(), e)
+            return None
+        
+        diff = calcular_diff_ranks(anterior, ranks) if anterior is not None else None
+        with self._trava:
+            self._diffs[versao] = diff
+            while len(self._diffs) > RANKS_VERSOES_MAX:
+                self._diffs.popitem(last=False)
+        return diff
+
+@st.cache_resource(show_spinner=False)
+def _obter_historico_ranks():
+    return HistoricoRanks()
+
+def obter_diff_ranks(df_usuarios):
+    """Movimentação nos rankings desde o snapshot anterior (calculada uma vez por versão).
+
+    Só aceita o DataFrame inteiro marcado pelo loader: um recorte herda os
+    attrs e seria gravado como se fosse uma versão nova.
+    """
+    if df_usuarios.empty or not set(['user_id'] + COLUNAS_RANK_MOVIMENTO) <= set(df_usuarios.columns):
+        return None
+    versao = df_usuarios.attrs.get('versao_snapshot')
+    if not versao or df_usuarios.attrs.get('linhas_snapshot') != len(df_usuarios):
+        return None
+    with medir_bloco("ranks.diff", linhas=len(df_usuarios)):
+        return _obter_historico_ranks().diff(versao, df_usuarios)
+
+def rotulos_movimento(diff_ranks, df, coluna):
+    """Indicadores ↑/↓/🆕 de um rank para as linhas de df (vazio sem snapshot anterior)"""
+    if diff_ranks is None or df.empty:
+        return pd.Series('', index=df.index, dtype=object)
+    chaves = df['user_id'].astype(str)
+    deltas = chaves.map(diff_ranks[f'delta_{coluna}']).fillna(0).astype(int)
+    novos = chaves.map(diff_ranks[f'novo_{coluna}']).fillna(False).astype(bool)
+    return pd.Series(np.select(
+        [novos.to_numpy(), deltas.to_numpy() > 0, deltas.to_numpy() < 0],
+        ['🆕', '↑' + deltas.abs().astype(str), '↓' + deltas.abs().astype(str)],
+        default='='
+    ), index=df.index, dtype=object)
+
 def detectar_dispositivo_mobile():
     """Detecta se o usuário está em um dispositivo móvel baseado na largura da tela"""
     # Usando JavaScript para detectar largura da tela
@@ -747,6 +1755,7 @@ def detectar_plataforma_do_link(url):
     
     return None, None
 
+@medir_desempenho()
 def obter_contas_por_usuario_melhorado(df_usuarios, df_videos):
     """Versão melhorada que detecta contas de forma mais robusta"""
     if df_usuarios.empty:
@@ -759,63 +1768,89 @@ def obter_contas_por_usuario_melhorado(df_usuarios, df_videos):
     if not df_videos.empty and 'url' in df_videos.columns:
         videos_com_url = len(df_videos[df_videos['url'].notna()])
     
+    indice_caminhos = None
+    
+    # Vídeos agrupados uma vez por usuário (posições) em vez de filtrar o DataFrame a cada usuário
+    posicoes_por_usuario = {}
+    urls_limpas = []
+    if not df_videos.empty and 'discord_username' in df_videos.columns:
+        posicoes_por_usuario = df_videos.groupby('discord_username', sort=False).indices
+        if 'url' in df_videos.columns:
+            urls_limpas = [str(url).strip() if pd.notna(url) else '' for url in df_videos['url']]
+    # Rótulo -> URL para o Método 2 (df.at por vídeo encontrado custava mais que a busca)
+    urls_por_rotulo = None
+    # O mesmo vídeo aparece na busca de vários usuários: detectar a plataforma uma vez
+    plataformas_por_rotulo = {}
+    
     for _, usuario in df_usuarios.iterrows():
         username_discord = usuario['discord_username']
+        posicoes_videos = posicoes_por_usuario.get(username_discord, ())
+        urls_usuario = [urls_limpas[posicao] for posicao in posicoes_videos] if urls_limpas else []
         
         # Inicializar conjuntos de contas
         contas_tiktok = set()
         contas_youtube = set()
         contas_instagram = set()
+        # Score de similaridade das contas vindas do Método 2 (define a ordem de exibição)
+        score_contas = {}
         
         # Método 1: Analisar URLs dos vídeos deste usuário
-        if not df_videos.empty and 'discord_username' in df_videos.columns:
-            videos_usuario = df_videos[df_videos['discord_username'] == username_discord]
-            
-            for _, video in videos_usuario.iterrows():
-                if pd.notna(video.get('url')):
-                    url = str(video['url']).strip()
-                    if url:
-                        plataforma, username = detectar_plataforma_do_link(url)
-                        
-                        if plataforma and username:
-                            # Filtrar usernames genéricos ou IDs de posts/vídeos
-                            if not any(x in username.lower() for x in ['video_especifico', 'detectado', 'link_curto', 'post_', 'reel_', 'channel_', 'shorts_', 'video_', 'vm_link_', 'short_link_', 'igtv_', 'story_']):
-                                if plataforma == 'tiktok' and len(username) > 2:
-                                    contas_tiktok.add(username)
-                                elif plataforma == 'youtube' and len(username) > 2:
-                                    contas_youtube.add(username)
-                                elif plataforma == 'instagram' and len(username) > 2:
-                                    contas_instagram.add(username)
-                            # Para formatos especiais, ainda considerar como atividade na plataforma
-                            else:
-                                if plataforma == 'tiktok':
-                                    contas_tiktok.add('conta_tiktok_ativa')
-                                elif plataforma == 'youtube' and 'shorts_' in username.lower():
-                                    contas_youtube.add('canal_youtube_shorts')
-                                elif plataforma == 'instagram':
-                                    contas_instagram.add('conta_instagram_ativa')
+        for url in urls_usuario:
+            if url:
+                plataforma, username = detectar_plataforma_do_link(url)
+                
+                if plataforma and username:
+                    # Filtrar usernames genéricos ou IDs de posts/vídeos
+                    if not any(x in username.lower() for x in ['video_especifico', 'detectado', 'link_curto', 'post_', 'reel_', 'channel_', 'shorts_', 'video_', 'vm_link_', 'short_link_', 'igtv_', 'story_']):
+                        if plataforma == 'tiktok' and len(username) > 2:
+                            contas_tiktok.add(username)
+                        elif plataforma == 'youtube' and len(username) > 2:
+                            contas_youtube.add(username)
+                        elif plataforma == 'instagram' and len(username) > 2:
+                            contas_instagram.add(username)
+                    # Para formatos especiais, ainda considerar como atividade na plataforma
+                    else:
+                        if plataforma == 'tiktok':
+                            contas_tiktok.add('conta_tiktok_ativa')
+                        elif plataforma == 'youtube' and 'shorts_' in username.lower():
+                            contas_youtube.add('canal_youtube_shorts')
+                        elif plataforma == 'instagram':
+                            contas_instagram.add('conta_instagram_ativa')
         
         # Método 2: Buscar por similaridade de nomes (fallback)
         if not (contas_tiktok or contas_youtube or contas_instagram):
             # Se não encontrou nada, vamos buscar de forma mais ampla
             username_parts = username_discord.lower().replace('#', '').replace(' ', '')
             
-            # Buscar em todos os vídeos por similaridade
+            # Buscar no índice de trigramas dos caminhos das URLs por similaridade
             if not df_videos.empty and 'url' in df_videos.columns:
-                for _, video in df_videos.iterrows():
-                    if pd.notna(video.get('url')):
-                        url = str(video['url']).lower()
-                        
-                        # Se o username ou parte dele aparece na URL
-                        if username_parts in url or any(part in url for part in username_parts.split('_') if len(part) > 3):
-                            plataforma, username_url = detectar_plataforma_do_link(video['url'])
-                            
-                            if plataforma == 'tiktok':
-                                contas_tiktok.add(username_url or 'conta_detectada')
-                            elif plataforma == 'youtube':
-                                contas_youtube.add(username_url or 'conta_detectada')
-                            elif plataforma == 'instagram':
-                                contas_instagram.add(username_url or 'conta_detectada')
+                if indice_caminhos is None:
+                    indice_caminhos = obter_indice_caminhos(df_videos)
+                    urls_por_rotulo = dict(zip(df_videos.index, df_videos['url'].astype(str)))
+                
+                # Se o username ou parte dele aparece na URL: melhor score por vídeo
+                termos = {username_parts} | {part for part in username_parts.split('_') if len(part) > 3}
+                score_videos = {}
+                for termo in termos:
+                    for rotulo, score in indice_caminhos.buscar(termo):
+                        if score > score_videos.get(rotulo, -1):
+                            score_videos[rotulo] = score
+                
+                for rotulo, score in sorted(score_videos.items(), key=lambda item: -item[1]):
+                    if rotulo not in plataformas_por_rotulo:
+                        plataformas_por_rotulo[rotulo] = detectar_plataforma_do_link(urls_por_rotulo[rotulo])
+                    plataforma, username_url = plataformas_por_rotulo[rotulo]
+                    conta = username_url or 'conta_detectada'
+                    
+                    if plataforma == 'tiktok':
+                        contas_tiktok.add(conta)
+                    elif plataforma == 'youtube':
+                        contas_youtube.add(conta)
+                    elif plataforma == 'instagram':
+                        contas_instagram.add(conta)
+                    else:
+                        continue
+                    score_contas[conta] = max(score_contas.get(conta, 0), score)
         
         # Método 3: Verificar se tem vídeos nas plataformas mas não detectou conta
         # Se tem vídeos na plataforma, mas não detectou conta, adicionar genérico
@@ -833,9 +1868,9 @@ def obter_contas_por_usuario_melhorado(df_usuarios, df_videos):
             'discord_username': username_discord,
             'total_videos': usuario.get('total_videos', 0),
             'total_views': usuario.get('total_views', 0),
-            'contas_tiktok': list(contas_tiktok),
-            'contas_youtube': list(contas_youtube),
-            'contas_instagram': list(contas_instagram),
+            'contas_tiktok': sorted(contas_tiktok, key=lambda c: -score_contas.get(c, 0)),
+            'contas_youtube': sorted(contas_youtube, key=lambda c: -score_contas.get(c, 0)),
+            'contas_instagram': sorted(contas_instagram, key=lambda c: -score_contas.get(c, 0)),
             'videos_tiktok': usuario.get('tiktok_videos', 0),
             'videos_youtube': usuario.get('youtube_videos', 0),
             'videos_instagram': usuario.get('instagram_videos', 0),
@@ -878,8 +1913,8 @@ def obter_contas_por_usuario_melhorado(df_usuarios, df_videos):
         
         # Debug info
         user_info['debug_info'] = {
-            'videos_analisados': len(df_videos[df_videos.get('discord_username') == username_discord]) if not df_videos.empty else 0,
-            'urls_validas': len([v for v in df_videos[df_videos.get('discord_username') == username_discord]['url'].dropna() if str(v).strip()]) if not df_videos.empty and 'discord_username' in df_videos.columns else 0
+            'videos_analisados': len(posicoes_videos),
+            'urls_validas': sum(1 for url in urls_usuario if url)
         }
         
         contas_usuarios.append(user_info)
@@ -889,190 +1924,412 @@ def obter_contas_por_usuario_melhorado(df_usuarios, df_videos):
     
     return contas_usuarios
 
-def buscar_video_no_banco(url, df_videos):
-    """Busca se o vídeo existe no banco de dados - versão melhorada"""
-    if df_videos.empty or 'url' not in df_videos.columns:
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _construir_contas_usuarios(versao_usuarios, versao_videos, _df_usuarios, _df_videos):
+    with medir_bloco("contas_usuarios.construir", linhas=len(_df_usuarios)):
+        return obter_contas_por_usuario_melhorado(_df_usuarios, _df_videos)
+
+def obter_contas_usuarios(df_usuarios, df_videos):
+    """Contas detectadas por usuário, calculadas uma vez por versão dos dados (lista compartilhada: não alterar)"""
+    return _construir_contas_usuarios(versao_snapshot(df_usuarios), versao_snapshot(df_videos), df_usuarios, df_videos)
+
+# ========== ÍNDICE DE TRIGRAMAS ==========
+def trigramas(texto):
+    """Conjunto de trigramas (sem preenchimento) de um texto em minúsculas"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def similaridade_trigramas(a, b):
+    """Similaridade de Jaccard entre os trigramas de dois textos (0 a 1)"""
+    if a == b:
+        return 1.0
+    ta, tb = trigramas(a), trigramas(b)
+    if not ta or not tb:
+        return len(a) / len(b) if a and a in b else 0.0
+    return len(ta & tb) / len(ta | tb)
+
+class IndiceTrigramas:
+    """Índice invertido de trigramas para busca de substrings sem varrer todos os textos.
+
+    Os candidatos de um termo são a interseção das listas dos seus trigramas;
+    a confirmação final (`termo in texto`) só roda sobre eles.
+    """
+    
+    def __init__(self, itens):
+        self.chaves = []
+        self.textos = []
+        self.quantidades = []
+        self.postagens = defaultdict(set)
+        for chave, texto in itens:
+            texto = str(texto).lower()
+            posicao = len(self.chaves)
+            trigramas_texto = trigramas(texto)
+            self.chaves.append(chave)
+            self.textos.append(texto)
+            self.quantidades.append(len(trigramas_texto))
+            for trigrama in trigramas_texto:
+                self.postagens[trigrama].add(posicao)
+    
+    def __len__(self):
+        return len(self.chaves)
+    
+    def candidatos(self, termo):
+        """Posições dos textos que contêm todos os trigramas do termo"""
+        trigramas_termo = trigramas(termo)
+        if not trigramas_termo:
+            # Termos com menos de 3 caracteres não filtram nada
+            return range(len(self.textos))
+        listas = sorted((self.postagens.get(t, ()) for t in trigramas_termo), key=len)
+        resultado = set(listas[0])
+        for lista in listas[1:]:
+            if not resultado:
+                break
+            resultado &= lista
+        return sorted(resultado)
+    
+    def buscar(self, termo, limite=None):
+        """Chaves cujo texto contém o termo, das mais parecidas para as menos: [(chave, score)]"""
+        termo = str(termo).lower()
+        if not termo:
+            return []
+        # Termo contido no texto: os trigramas do termo estão todos no texto, então o
+        # Jaccard de similaridade_trigramas vira |trigramas(termo)| / |trigramas(texto)|
+        quantidade_termo = len(trigramas(termo))
+        encontrados = [
+            (quantidade_termo / self.quantidades[posicao] if quantidade_termo and self.quantidades[posicao]
+             else len(termo) / len(self.textos[posicao]), posicao)
+            for posicao in self.candidatos(termo)
+            if termo in self.textos[posicao]
+        ]
+        # Empate no score mantém a ordem original dos textos
+        encontrados.sort(key=lambda item: (-item[0], item[1]))
+        if limite is not None:
+            encontrados = encontrados[:limite]
+        return [(self.chaves[posicao], score) for score, posicao in encontrados]
+    
+    def primeiro(self, termo):
+        """Chave do primeiro texto (na ordem de inserção) que contém o termo, ou None"""
+        termo = str(termo).lower()
+        if not termo:
+            return None
+        for posicao in self.candidatos(termo):
+            if termo in self.textos[posicao]:
+                return self.chaves[posicao]
         return None
     
-    # Busca exata primeiro
-    video_exato = df_videos[df_videos['url'] == url]
-    if not video_exato.empty:
-        return video_exato.iloc[0]
-    
-    # Extrair ID do vídeo para comparação mais inteligente
-    import re
-    
-    # Para YouTube: extrair video ID
-    youtube_id = None
+    def semelhantes(self, termo, limite=10, minimo=0.3):
+        """Busca aproximada (tolera erros de digitação): textos que compartilham trigramas com o termo"""
+        trigramas_termo = trigramas(str(termo).lower())
+        comuns = defaultdict(int)
+        for trigrama in trigramas_termo:
+            for posicao in self.postagens.get(trigrama, ()):
+                comuns[posicao] += 1
+        
+        encontrados = []
+        for posicao, quantidade in comuns.items():
+            score = quantidade / (len(trigramas_termo) + self.quantidades[posicao] - quantidade)
+            if score >= minimo:
+                encontrados.append((score, posicao))
+        encontrados.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.chaves[posicao], score) for score, posicao in encontrados[:limite]]
+
+# ========== ÍNDICE DE URLS ==========
+_RE_YOUTUBE_V = re.compile(r'[?&]v=([^&]+)')
+_RE_YOUTU_BE = re.compile(r'youtu\.be/([^?&]+)')
+_RE_YOUTUBE_SHORTS = re.compile(r'youtube\.com/shorts/([^?&]+)')
+_RE_TIKTOK_VIDEO = re.compile(r'/video/(\d+)')
+_RE_TIKTOK_T = re.compile(r'/t/([^/?&]+)')
+_RE_TIKTOK_VM = re.compile(r'vm\.tiktok\.com/([^/?&]+)')
+_RE_INSTAGRAM_POST = re.compile(r'/p/([^/?&]+)')
+_RE_INSTAGRAM_REEL = re.compile(r'/reel/([^/?&]+)')
+_RE_INSTAGRAM_TV = re.compile(r'/tv/([^/?&]+)')
+
+def extrair_id_video(url):
+    """Extrai (plataforma, id do vídeo) de um link, ou (None, None)"""
     if 'youtube.com' in url or 'youtu.be' in url:
-        # youtube.com/watch?v=ID
-        match = re.search(r'[?&]v=([^&]+)', url)
+        match = _RE_YOUTUBE_V.search(url)
+        if not match and 'youtu.be/' in url:
+            match = _RE_YOUTU_BE.search(url)
+        elif not match and 'youtube.com/shorts/' in url:
+            match = _RE_YOUTUBE_SHORTS.search(url)
         if match:
-            youtube_id = match.group(1)
-        # youtu.be/ID
-        elif 'youtu.be/' in url:
-            match = re.search(r'youtu\.be/([^?&]+)', url)
-            if match:
-                youtube_id = match.group(1)
-        # youtube.com/shorts/ID
-        elif 'youtube.com/shorts/' in url:
-            match = re.search(r'youtube\.com/shorts/([^?&]+)', url)
-            if match:
-                youtube_id = match.group(1)
+            return 'youtube', match.group(1)
     
-    # Para TikTok: extrair video ID
-    tiktok_id = None
     if 'tiktok.com' in url:
-        # Extrair ID do vídeo: /video/123456
-        match = re.search(r'/video/(\d+)', url)
+        match = _RE_TIKTOK_VIDEO.search(url)
+        if not match and '/t/' in url:
+            match = _RE_TIKTOK_T.search(url)
+        elif not match and 'vm.tiktok.com' in url:
+            match = _RE_TIKTOK_VM.search(url)
         if match:
-            tiktok_id = match.group(1)
-        # Links curtos tiktok.com/t/
-        elif '/t/' in url:
-            match = re.search(r'/t/([^/?&]+)', url)
-            if match:
-                tiktok_id = match.group(1)
-        # Links vm.tiktok.com
-        elif 'vm.tiktok.com' in url:
-            match = re.search(r'vm\.tiktok\.com/([^/?&]+)', url)
-            if match:
-                tiktok_id = match.group(1)
+            return 'tiktok', match.group(1)
     
-    # Para Instagram: extrair post/reel ID
-    instagram_id = None
     if 'instagram.com' in url:
+        match = None
         if '/p/' in url:
-            match = re.search(r'/p/([^/?&]+)', url)
-            if match:
-                instagram_id = match.group(1)
+            match = _RE_INSTAGRAM_POST.search(url)
         elif '/reel/' in url:
-            match = re.search(r'/reel/([^/?&]+)', url)
-            if match:
-                instagram_id = match.group(1)
+            match = _RE_INSTAGRAM_REEL.search(url)
         elif '/tv/' in url:
-            match = re.search(r'/tv/([^/?&]+)', url)
-            if match:
-                instagram_id = match.group(1)
-    
-    # Buscar por IDs extraídos
-    for _, video in df_videos.iterrows():
-        if pd.notna(video['url']):
-            video_url = str(video['url'])
-            
-            # Comparar IDs do YouTube
-            if youtube_id:
-                if youtube_id in video_url:
-                    return video
-                # Verificar diferentes formatos do mesmo vídeo
-                video_youtube_id = None
-                if 'youtube.com' in video_url or 'youtu.be' in video_url:
-                    match = re.search(r'[?&]v=([^&]+)', video_url)
-                    if match:
-                        video_youtube_id = match.group(1)
-                    elif 'youtu.be/' in video_url:
-                        match = re.search(r'youtu\.be/([^?&]+)', video_url)
-                        if match:
-                            video_youtube_id = match.group(1)
-                    elif 'youtube.com/shorts/' in video_url:
-                        match = re.search(r'youtube\.com/shorts/([^?&]+)', video_url)
-                        if match:
-                            video_youtube_id = match.group(1)
-                    
-                    if video_youtube_id == youtube_id:
-                        return video
-            
-            # Comparar IDs do TikTok
-            elif tiktok_id:
-                if tiktok_id in video_url:
-                    return video
-                # Verificar diferentes formatos do mesmo vídeo TikTok
-                video_tiktok_id = None
-                if 'tiktok.com' in video_url:
-                    # /video/ID
-                    match = re.search(r'/video/(\d+)', video_url)
-                    if match:
-                        video_tiktok_id = match.group(1)
-                    # /t/ID
-                    elif '/t/' in video_url:
-                        match = re.search(r'/t/([^/?&]+)', video_url)
-                        if match:
-                            video_tiktok_id = match.group(1)
-                    # vm.tiktok.com
-                    elif 'vm.tiktok.com' in video_url:
-                        match = re.search(r'vm\.tiktok\.com/([^/?&]+)', video_url)
-                        if match:
-                            video_tiktok_id = match.group(1)
-                    
-                    if video_tiktok_id == tiktok_id:
-                        return video
-            
-            # Comparar IDs do Instagram
-            elif instagram_id:
-                if instagram_id in video_url:
-                    return video
-                # Verificar diferentes formatos do mesmo post/reel/IGTV
-                video_instagram_id = None
-                if 'instagram.com' in video_url:
-                    if '/p/' in video_url:
-                        match = re.search(r'/p/([^/?&]+)', video_url)
-                        if match:
-                            video_instagram_id = match.group(1)
-                    elif '/reel/' in video_url:
-                        match = re.search(r'/reel/([^/?&]+)', video_url)
-                        if match:
-                            video_instagram_id = match.group(1)
-                    elif '/tv/' in video_url:
-                        match = re.search(r'/tv/([^/?&]+)', video_url)
-                        if match:
-                            video_instagram_id = match.group(1)
-                    
-                    if video_instagram_id == instagram_id:
-                        return video
-    
-    # Busca parcial (para casos de links com parâmetros diferentes)
-    url_limpo = url.split('?')[0]  # Remove parâmetros
-    
-    for _, video in df_videos.iterrows():
-        if pd.notna(video['url']):
-            video_url_limpo = str(video['url']).split('?')[0]
-            if url_limpo in video_url_limpo or video_url_limpo in url_limpo:
-                return video
+            match = _RE_INSTAGRAM_TV.search(url)
+        if match:
+            return 'instagram', match.group(1)
     
-    return None
+    return None, None
 
-def identificar_dono_da_conta(plataforma, username, df_usuarios, video_info=None):
-    """Identifica qual usuário Discord é dono da conta - versão melhorada"""
-    
-    # Prioridade 1: Se o vídeo tem criador conhecido, usar essa informação
-    if video_info is not None and 'discord_username' in video_info.index and pd.notna(video_info['discord_username']):
-        # Buscar usuário completo baseado no discord_username do vídeo
-        usuario_encontrado = df_usuarios[df_usuarios['discord_username'] == video_info['discord_username']]
-        if not usuario_encontrado.empty:
-            return usuario_encontrado.iloc[0]
+def normalizar_url(url):
+    """Chave de comparação de links: sem esquema, 'www.'/'m.', parâmetros, âncora e barra final"""
+    sem_esquema = url.strip().split('://', 1)[-1]
+    sem_parametros = re.split(r'[?#]', sem_esquema, maxsplit=1)[0]
+    dominio, _, caminho = sem_parametros.partition('/')
+    dominio = dominio.lower()
+    for prefixo in ('www.', 'm.'):
+        if dominio.startswith(prefixo):
+            dominio = dominio[len(prefixo):]
+            break
+    return f"{dominio}/{caminho}".rstrip('/')
+
+class IndiceUrls:
+    """Índice em memória dos links de um snapshot de vídeos.
+
+    Um link é reconhecido, nesta ordem, por: URL idêntica; mesma plataforma e
+    mesmo ID de vídeo (youtu.be/ID e youtube.com/shorts/ID são o mesmo vídeo);
+    mesma URL normalizada (normalizar_url). Links que só contêm ou estão
+    contidos em outro (ex.: o perfil tiktok.com/@conta) não contam como
+    vídeo cadastrado. Havendo repetidos, vale a primeira linha do DataFrame.
+
+    Guarda rótulos do índice do DataFrame (não posições), então continua
+    válido se o DataFrame for reordenado.
+    """
     
-    # Prioridade 2: Busca por username se fornecido
-    if not plataforma or not username or df_usuarios.empty:
+    def __init__(self, df_videos):
+        self.por_url = {}
+        self.por_id = {}
+        self.por_url_normalizada = {}
+        
+        if df_videos.empty or 'url' not in df_videos.columns:
+            return
+        
+        urls = df_videos['url']
+        urls = urls[urls.notna()]
+        for rotulo, url in zip(urls.index, urls.astype(str)):
+            self.por_url.setdefault(url, rotulo)
+            chave_id = extrair_id_video(url)
+            if chave_id[0]:
+                self.por_id.setdefault(chave_id, rotulo)
+            self.por_url_normalizada.setdefault(normalizar_url(url), rotulo)
+    
+    def buscar(self, url):
+        """Rótulo do vídeo correspondente ao link, ou None"""
+        # Busca exata primeiro
+        rotulo = self.por_url.get(url)
+        if rotulo is not None:
+            return rotulo
+        
+        # Mesmo vídeo em outro formato de link (ID extraído)
+        chave_id = extrair_id_video(url)
+        if chave_id[0]:
+            rotulo = self.por_id.get(chave_id)
+            if rotulo is not None:
+                return rotulo
+        
+        # Mesmo link com parâmetros, 'www.' ou barra final diferentes
+        return self.por_url_normalizada.get(normalizar_url(url))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _construir_indice_urls(versao, _df_videos):
+    with medir_bloco("indice_urls.construir", linhas=len(_df_videos)):
+        return IndiceUrls(_df_videos)
+
+def obter_indice_urls(df_videos):
+    """Índice de URLs do snapshot, construído uma vez por versão dos dados"""
+    return _construir_indice_urls(versao_snapshot(df_videos), df_videos)
+
+def caminho_da_url(url):
+    """Parte do link depois do domínio (caminho e parâmetros), sem o esquema"""
+    sem_esquema = url.split('://', 1)[-1]
+    barra = sem_esquema.find('/')
+    return sem_esquema[barra:] if barra >= 0 else ''
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _construir_indice_caminhos(versao, _df_videos):
+    with medir_bloco("indice_caminhos.construir", linhas=len(_df_videos)):
+        if _df_videos.empty or 'url' not in _df_videos.columns:
+            return IndiceTrigramas([])
+        urls = _df_videos['url'].dropna().astype(str)
+        return IndiceTrigramas(zip(urls.index, map(caminho_da_url, urls)))
+
+def obter_indice_caminhos(df_videos):
+    """Índice de trigramas dos caminhos das URLs do snapshot (busca de usernames nos links)"""
+    return _construir_indice_caminhos(versao_snapshot(df_videos), df_videos)
+
+def buscar_video_no_banco(url, df_videos, indice_urls=None):
+    """Busca se o vídeo existe no banco de dados (critérios em IndiceUrls)"""
+    if df_videos.empty or 'url' not in df_videos.columns:
+        return None
+    
+    # Índice por URL exata, ID do vídeo (YouTube, TikTok, Instagram) e URL sem parâmetros
+    if indice_urls is None:
+        indice_urls = obter_indice_urls(df_videos)
+    
+    rotulo = indice_urls.buscar(url)
+    if rotulo is None:
+        return None
+    return df_videos.loc[rotulo]
+
+# ========== ÍNDICE DE DONOS ==========
+class IndiceDonos:
+    """Índice em memória dos usuários de um snapshot para identificar donos de contas.
+
+    Para cada coluna de busca (`<plataforma>_username`, `discord_username`,
+    `user_id`) guarda um índice de trigramas dos valores, na ordem do
+    DataFrame: o dono é a primeira linha cujo valor contém o termo (sem
+    diferenciar maiúsculas), como no filtro str.contains original.
+    """
+    
+    def __init__(self, df_usuarios):
+        self.por_discord = {}
+        self.parciais = {}
+        
+        if df_usuarios.empty:
+            return
+        
+        if 'discord_username' in df_usuarios.columns:
+            nomes = df_usuarios['discord_username'].dropna()
+            for rotulo, nome in zip(nomes.index, nomes):
+                self.por_discord.setdefault(nome, rotulo)
+        
+        colunas = [c for c in df_usuarios.columns if c.endswith('_username')]
+        if 'user_id' in df_usuarios.columns:
+            colunas.append('user_id')
+        
+        for coluna in colunas:
+            # user_id pode vir como número: tudo é indexado como texto
+            valores = df_usuarios[coluna].dropna().astype(str)
+            valores = valores[valores.str.strip() != '']
+            self.parciais[coluna] = IndiceTrigramas(zip(valores.index, valores))
+    
+    def buscar_por_discord(self, discord_username):
+        """Rótulo do usuário com esse discord_username exato, ou None"""
+        return self.por_discord.get(discord_username)
+    
+    def buscar(self, coluna, termo):
+        """Rótulo do primeiro usuário cujo valor na coluna contém o termo (texto literal), ou None"""
+        if coluna not in self.parciais:
+            return None
+        return self.parciais[coluna].primeiro(termo)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _construir_indice_donos(versao, _df_usuarios):
+    with medir_bloco("indice_donos.construir", linhas=len(_df_usuarios)):
+        return IndiceDonos(_df_usuarios)
+
+def obter_indice_donos(df_usuarios):
+    """Índice de donos do snapshot, construído uma vez por versão dos dados"""
+    return _construir_indice_donos(versao_snapshot(df_usuarios), df_usuarios)
+
+# ========== BUSCA DE USUÁRIOS ==========
+# Máximo de opções enviadas ao navegador no seletor de usuários
+USUARIOS_SUGESTOES_MAX = 20
+
+class IndicePrefixos:
+    """Textos em minúsculas num array ordenado: um prefixo vira um intervalo via np.searchsorted"""
+    
+    def __init__(self, itens):
+        chaves, textos = [], []
+        for chave, texto in itens:
+            chaves.append(chave)
+            textos.append(str(texto).lower())
+        textos = np.array(textos, dtype=str)
+        ordem = np.argsort(textos, kind='stable')
+        self.textos = textos[ordem]
+        self.chaves = [chaves[i] for i in ordem]
+    
+    def __len__(self):
+        return len(self.chaves)
+    
+    def buscar(self, prefixo, limite=None):
+        """Chaves cujo texto começa com o prefixo, em ordem alfabética"""
+        prefixo = str(prefixo).lower()
+        inicio = int(np.searchsorted(self.textos, prefixo, side='left'))
+        fim = int(np.searchsorted(self.textos, prefixo + '\U0010ffff', side='left'))
+        if limite is not None:
+            fim = min(fim, inicio + limite)
+        return self.chaves[inicio:fim]
+
+class IndiceNomesUsuarios:
+    """Sugestões de usuários por nome do Discord: prefixo, depois substring, depois aproximado"""
+    
+    def __init__(self, df_usuarios):
+        itens = list(zip(df_usuarios.index, df_usuarios['discord_username'].fillna('').astype(str)))
+        self.nomes = dict(itens)
+        self.prefixos = IndicePrefixos(itens)
+        self.trigramas = IndiceTrigramas(itens)
+    
+    def __len__(self):
+        return len(self.nomes)
+    
+    def nome(self, rotulo):
+        return self.nomes.get(rotulo, '')
+    
+    def sugerir(self, termo, limite=USUARIOS_SUGESTOES_MAX):
+        """Rótulos (índice do DataFrame) dos usuários mais prováveis para o termo digitado"""
+        termo = str(termo or '').strip().lower()
+        sugestoes = list(self.prefixos.buscar(termo, limite))
+        if not termo or len(sugestoes) >= limite:
+            return sugestoes
+        
+        vistos = set(sugestoes)
+        for rotulo, _ in self.trigramas.buscar(termo):
+            if rotulo not in vistos:
+                sugestoes.append(rotulo)
+                vistos.add(rotulo)
+                if len(sugestoes) >= limite:
+                    return sugestoes
+        
+        if not sugestoes:
+            # Nada contém o termo: provável erro de digitação
+            sugestoes = [rotulo for rotulo, _ in self.trigramas.semelhantes(termo, limite)]
+        return sugestoes
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _construir_indice_nomes_usuarios(versao, _df_usuarios):
+    with medir_bloco("indice_nomes_usuarios.construir", linhas=len(_df_usuarios)):
+        return IndiceNomesUsuarios(_df_usuarios)
+
+def obter_indice_nomes_usuarios(df_usuarios):
+    """Índice de nomes do snapshot, construído uma vez por versão dos dados"""
+    return _construir_indice_nomes_usuarios(versao_snapshot(df_usuarios), df_usuarios)
+
+def identificar_dono_da_conta(plataforma, username, df_usuarios, video_info=None, indice_donos=None):
+    """Identifica qual usuário Discord é dono da conta - versão melhorada"""
+    if df_usuarios.empty:
         return None
     
-    coluna_plataforma = f"{plataforma.lower()}_username"
+    if indice_donos is None:
+        indice_donos = obter_indice_donos(df_usuarios)
+    
+    # Prioridade 1: Se o vídeo tem criador conhecido, usar essa informação
+    if video_info is not None and 'discord_username' in video_info.index and pd.notna(video_info['discord_username']):
+        # Buscar usuário completo baseado no discord_username do vídeo
+        rotulo = indice_donos.buscar_por_discord(video_info['discord_username'])
+        if rotulo is not None:
+            return df_usuarios.loc[rotulo]
     
-    # Se existe coluna específica da plataforma
-    if coluna_plataforma in df_usuarios.columns:
-        dono = df_usuarios[df_usuarios[coluna_plataforma].str.contains(username, case=False, na=False)]
-        if not dono.empty:
-            return dono.iloc[0]
+    # Prioridade 2: Busca por username se fornecido
+    if not plataforma or not username:
+        return None
     
-    # Busca em outras colunas que possam conter o username
-    colunas_busca = ['discord_username', 'user_id']
+    # Coluna específica da plataforma primeiro, depois outras colunas que possam conter o username
+    colunas_busca = [f"{plataforma.lower()}_username", 'discord_username', 'user_id']
     for coluna in colunas_busca:
-        if coluna in df_usuarios.columns:
-            dono = df_usuarios[df_usuarios[coluna].str.contains(username, case=False, na=False)]
-            if not dono.empty:
-                return dono.iloc[0]
+        rotulo = indice_donos.buscar(coluna, username)
+        if rotulo is not None:
+            return df_usuarios.loc[rotulo]
     
     return None
 
-def extrair_informacoes_do_link(url, df_videos, df_usuarios):
+@medir_desempenho()
+def extrair_informacoes_do_link(url, df_videos, df_usuarios, indice_urls=None, indice_donos=None):
     """Função principal que extrai todas as informações de um link"""
     if not url.strip():
         return None
@@ -1081,10 +2338,10 @@ def extrair_informacoes_do_link(url, df_videos, df_usuarios):
     plataforma, username = detectar_plataforma_do_link(url)
     
     # 2. Buscar vídeo no banco
-    video_info = buscar_video_no_banco(url, df_videos)
+    video_info = buscar_video_no_banco(url, df_videos, indice_urls)
     
     # 3. Identificar dono da conta (priorizar info do vídeo se encontrado)
-    dono_conta = identificar_dono_da_conta(plataforma, username, df_usuarios, video_info)
+    dono_conta = identificar_dono_da_conta(plataforma, username, df_usuarios, video_info, indice_donos)
     
     # 4. Compilar informações
     resultado = {
@@ -1100,6 +2357,369 @@ def extrair_informacoes_do_link(url, df_videos, df_usuarios):
     
     return resultado
 
+# ========== BUSCA POR TÍTULO ==========
+_RE_PALAVRA_BUSCA = re.compile(r'\w+')
+# Acima disso o ranking bm25 custa mais que a busca; termos amplos voltam sem ranking
+BUSCA_TITULO_MAX_RANQUEADOS = 20000
+BUSCA_TITULO_CACHE_CONSULTAS = 64
+
+def montar_consulta_fts(texto):
+    """Converte o texto digitado numa consulta FTS5: todas as palavras, como prefixo"""
+    return ' '.join(f'"{palavra}"*' for palavra in _RE_PALAVRA_BUSCA.findall(texto.lower()))
+
+class IndiceTitulos:
+    """Índice FTS5 em memória dos títulos dos vídeos.
+
+    Cada vídeo entra com o `id` de valid_videos como rowid. A cada snapshot
+    novo só os títulos inseridos, alterados ou removidos são reindexados; o
+    banco do bot nunca é escrito.
+    """
+    
+    def __init__(self):
+        self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE titulos USING fts5(title, tokenize='unicode61 remove_diacritics 2')"
+        )
+        self._trava = threading.Lock()
+        self._titulos = {}
+        self._consultas = OrderedDict()
+        self.versao = None
+    
+    @staticmethod
+    def _titulos_do_snapshot(df_videos):
+        if df_videos.empty or 'title' not in df_videos.columns:
+            return {}
+        titulos = df_videos['title'].dropna().astype(str)
+        if 'id' in df_videos.columns:
+            chaves = pd.to_numeric(df_videos.loc[titulos.index, 'id'], errors='coerce')
+            titulos, chaves = titulos[chaves.notna()], chaves[chaves.notna()]
+        else:
+            chaves = titulos.index.to_series()
+        return dict(zip(chaves.astype('int64'), titulos))
+    
+    def sincronizar(self, df_videos):
+        """Aplica ao índice as diferenças do snapshot; devolve quantos títulos mudaram"""
+        versao = versao_snapshot(df_videos)
+        with self._trava:
+            if versao == self.versao:
+                return 0
+            
+            atuais = self._titulos_do_snapshot(df_videos)
+            remover = [(chave,) for chave, titulo in self._titulos.items() if atuais.get(chave) != titulo]
+            inserir = [(chave, titulo) for chave, titulo in atuais.items() if self._titulos.get(chave) != titulo]
+            with medir_bloco("indice_titulos.sincronizar", linhas=len(remover) + len(inserir)):
+                with self._conn:
+                    self._conn.executemany("DELETE FROM titulos WHERE rowid = ?", remover)
+                    self._conn.executemany("INSERT INTO titulos(rowid, title) VALUES (?, ?)", inserir)
+            
+            self._titulos = atuais
+            self._consultas.clear()
+            self.versao = versao
+            return len(remover) + len(inserir)
+    
+    def buscar(self, texto):
+        """Ids dos vídeos cujo título casa com todas as palavras (prefixo) e se vieram ranqueados.
+
+        Com até BUSCA_TITULO_MAX_RANQUEADOS resultados a ordem é a relevância
+        (bm25); acima disso os ids voltam do mais novo para o mais antigo.
+        """
+        consulta = montar_consulta_fts(texto)
+        if not consulta:
+            return [], True
+        
+        with self._trava:
+            resultado = self._consultas.get(consulta)
+            if resultado is not None:
+                self._consultas.move_to_end(consulta)
+                return resultado
+            
+            total = self._conn.execute(
+                "SELECT COUNT(*) FROM titulos WHERE titulos MATCH ?", (consulta,)
+            ).fetchone()[0]
+            ranqueado = total <= BUSCA_TITULO_MAX_RANQUEADOS
+            ordem = "rank" if ranqueado else "rowid DESC"
+            linhas = self._conn.execute(
+                f"SELECT rowid FROM titulos WHERE titulos MATCH ? ORDER BY {ordem}", (consulta,)
+            ).fetchall()
+            
+            resultado = ([linha[0] for linha in linhas], ranqueado)
+            self._consultas[consulta] = resultado
+            if len(self._consultas) > BUSCA_TITULO_CACHE_CONSULTAS:
+                self._consultas.popitem(last=False)
+            return resultado
+
+@st.cache_resource(show_spinner=False)
+def _obter_indice_titulos():
+    try:
+        return IndiceTitulos()
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5
+        return None
+
+def buscar_videos_por_titulo(df_videos, df_filtrado, texto):
+    """Vídeos de df_filtrado cujo título casa com o texto e se a ordem é por relevância"""
+    indice = _obter_indice_titulos()
+    if indice is None:
+        return df_filtrado[df_filtrado['title'].str.contains(texto, case=False, na=False, regex=False)], False
+    
+    indice.sincronizar(df_videos)
+    with medir_bloco("busca_titulo.fts") as registro:
+        ids, ranqueado = indice.buscar(texto)
+        registro['linhas'] = len(ids)
+    
+    ordem = pd.Series(np.arange(len(ids)), index=pd.Index(ids, dtype='int64'))
+    if 'id' in df_filtrado.columns:
+        chaves = pd.to_numeric(df_filtrado['id'], errors='coerce')
+    else:
+        chaves = df_filtrado.index.to_series()
+    posicao = chaves.map(ordem)
+    encontrados = df_filtrado[posicao.notna().to_numpy()]
+    return encontrados.iloc[np.argsort(posicao.dropna().to_numpy(), kind='stable')], ranqueado
+
+# ========== IDENTIFICAÇÃO EM LOTE ==========
+LOTE_TAMANHO_BLOCO = 25      # links por tarefa enviada ao pool
+LOTE_MINIMO_PARALELO = 40    # abaixo disso criar processos custa mais que analisar direto
+LOTE_MAXIMO_LINKS = 5000
+LOTE_MAX_PROCESSOS = max(1, min(os.cpu_count() or 1, 8))
+
+# Preenchido em cada processo do pool pelo initializer (recebido uma vez, na partida do processo)
+_CONTEXTO_LOTE = {}
+
+def _iniciar_worker_lote(df_videos, df_usuarios, indice_urls, indice_donos):
+    _CONTEXTO_LOTE['df_videos'] = df_videos
+    _CONTEXTO_LOTE['df_usuarios'] = df_usuarios
+    _CONTEXTO_LOTE['indice_urls'] = indice_urls
+    _CONTEXTO_LOTE['indice_donos'] = indice_donos
+
+def _valor_simples(valor, padrao=None):
+    """Converte escalares numpy/pandas para tipos Python (serializáveis entre processos)"""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return padrao
+    return valor.item() if hasattr(valor, 'item') else valor
+
+def resumir_analise_link(url, df_videos, df_usuarios, indice_urls=None, indice_donos=None):
+    """Resultado de extrair_informacoes_do_link como dicionário plano"""
+    resultado = extrair_informacoes_do_link(url, df_videos, df_usuarios, indice_urls, indice_donos)
+    if resultado is None:
+        return {'url': url, 'plataforma': None, 'identificacao': None, 'cadastrado': False,
+                'criador': None, 'views': 0, 'dono': None, 'user_id': None, 'status': 'erro'}
+    
+    video = resultado['video_info']
+    dono = resultado['dono_info']
+    return {
+        'url': url,
+        'plataforma': resultado['plataforma'],
+        'identificacao': resultado['username_extraido'],
+        'cadastrado': resultado['video_cadastrado'],
+        'criador': _valor_simples(video.get('discord_username')) if video is not None else None,
+        'views': _valor_simples(video.get('views'), 0) if video is not None else 0,
+        'dono': _valor_simples(dono.get('discord_username')) if dono is not None else None,
+        'user_id': str(_valor_simples(dono.get('user_id'), '')) if dono is not None else None,
+        'status': resultado['status']
+    }
+
+def _analisar_bloco_lote(bloco):
+    """Executado nos processos do pool: analisa uma lista de (posição, url)"""
+    return [
+        (posicao, resumir_analise_link(url, _CONTEXTO_LOTE['df_videos'], _CONTEXTO_LOTE['df_usuarios'],
+                                       _CONTEXTO_LOTE['indice_urls'], _CONTEXTO_LOTE['indice_donos']))
+        for posicao, url in bloco
+    ]
+
+def _contexto_pool_lote():
+    """Contexto multiprocessing para o pool do lote: 'forkserver' onde existir, senão 'spawn'.
+
+    'fork' não serve aqui: o servidor do Streamlit tem várias threads e o filho
+    herdaria locks presos por elas (logging, imports, pandas), podendo travar.
+    """
+    metodo = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(metodo)
+
+class PoolLote:
+    """Pool de processos da identificação em lote, compartilhado entre sessões.
+
+    Os processos recebem DataFrames e índices uma única vez, ao partir; o pool
+    só é recriado quando o snapshot muda ou depois de quebrar.
+    """
+    
+    def __init__(self, max_processos=LOTE_MAX_PROCESSOS):
+        self.max_processos = max_processos
+        self._trava = threading.Lock()
+        self._pool = None
+        self._chave = None
+    
+    def obter(self, df_videos, df_usuarios, indice_urls, indice_donos):
+        chave = (versao_snapshot(df_videos), versao_snapshot(df_usuarios))
+        with self._trava:
+            if self._pool is None or self._chave != chave:
+                if self._pool is not None:
+                    # Tarefas já enviadas por outras sessões terminam normalmente
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_processos,
+                    mp_context=_contexto_pool_lote(),
+                    initializer=_iniciar_worker_lote,
+                    initargs=(df_videos, df_usuarios, indice_urls, indice_donos)
+                )
+                self._chave = chave
+            return self._pool
+    
+    def descartar(self, pool):
+        """Tira de uso um pool quebrado; a próxima chamada cria outro"""
+        with self._trava:
+            if self._pool is pool:
+                self._pool = None
+                self._chave = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def encerrar(self):
+        with self._trava:
+            pool, self._pool, self._chave = self._pool, None, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+@st.cache_resource(show_spinner=False)
+def obter_pool_lote():
+    """Um pool por processo do servidor, encerrado na saída"""
+    pool_lote = PoolLote()
+    atexit.register(pool_lote.encerrar)
+    return pool_lote
+
+def analisar_links_em_lote(urls, df_videos, df_usuarios):
+    """Analisa vários links em paralelo, gerando (posição, resultado) conforme terminam.
+
+    Lotes grandes vão para o pool compartilhado (obter_pool_lote). Se o pool não
+    sobe ou quebra, o motivo vai para o log e os links restantes são analisados
+    no próprio processo; erros da análise em si são propagados.
+    """
+    indice_urls = obter_indice_urls(df_videos)
+    indice_donos = obter_indice_donos(df_usuarios)
+    pendentes = list(enumerate(urls))
+    
+    if len(pendentes) >= LOTE_MINIMO_PARALELO and LOTE_MAX_PROCESSOS > 1:
+        blocos = [pendentes[i:i + LOTE_TAMANHO_BLOCO] for i in range(0, len(pendentes), LOTE_TAMANHO_BLOCO)]
+        concluidos = set()
+        pool_lote = obter_pool_lote()
+        pool = None
+        try:
+            pool = pool_lote.obter(df_videos, df_usuarios, indice_urls, indice_donos)
+            futuros = [pool.submit(_analisar_bloco_lote, bloco) for bloco in blocos]
+            for futuro in as_completed(futuros):
+                for posicao, item in futuro.result():
+                    concluidos.add(posicao)
+                    yield posicao, item
+        except (BrokenProcessPool, OSError, pickle.PicklingError) as e:
+            logger.warning("Pool do lote indisponível, analisando %d links no próprio processo: %r",
+                           len(pendentes) - len(concluidos), e)
+            if pool is not None:
+                pool_lote.descartar(pool)
+        pendentes = [(posicao, url) for posicao, url in pendentes if posicao not in concluidos]
+    
+    for posicao, url in pendentes:
+        yield posicao, resumir_analise_link(url, df_videos, df_usuarios, indice_urls, indice_donos)
+
+def ler_links_em_lote(texto, arquivo_csv=None):
+    """Extrai a lista de links (sem duplicados, na ordem) do texto colado e/ou de um CSV"""
+    candidatos = re.split(r'[\s,;]+', texto or '')
+    
+    if arquivo_csv is not None:
+        df_csv = pd.read_csv(arquivo_csv, dtype=str)
+        if not df_csv.empty:
+            colunas = {c.strip().lower(): c for c in df_csv.columns}
+            coluna = next((colunas[c] for c in ('url', 'urls', 'link', 'links') if c in colunas), df_csv.columns[0])
+            candidatos.extend(df_csv[coluna].dropna().astype(str).str.strip().tolist())
+    
+    vistos = set()
+    links = []
+    for link in candidatos:
+        link = link.strip()
+        if link and link not in vistos:
+            vistos.add(link)
+            links.append(link)
+    return links
+
+@fragmento
+def secao_identificacao_em_lote(df_videos, df_usuarios):
+    """Modo em lote do identificador: vários links analisados em paralelo"""
+    st.subheader("📋 Identificação em Lote")
+    st.info(f"💡 Cole vários links (um por linha) ou envie um CSV com uma coluna 'url'. A análise usa até {LOTE_MAX_PROCESSOS} processos em paralelo.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        texto_links = st.text_area("🔗 Links para analisar:", height=150, placeholder="https://www.tiktok.com/@usuario/video/123\nhttps://youtube.com/shorts/abc")
+    with col2:
+        arquivo_csv = st.file_uploader("📄 Ou envie um CSV:", type=['csv'])
+    
+    if st.button("🚀 Analisar Lote", type="primary"):
+        try:
+            links = ler_links_em_lote(texto_links, arquivo_csv)
+        except Exception as e:
+            st.error(f"❌ Não foi possível ler o CSV: {str(e)}")
+            return
+        
+        if not links:
+            st.warning("⚠️ Nenhum link informado")
+            return
+        
+        if len(links) > LOTE_MAXIMO_LINKS:
+            st.warning(f"⚠️ Analisando apenas os primeiros {LOTE_MAXIMO_LINKS:,} de {len(links):,} links")
+            links = links[:LOTE_MAXIMO_LINKS]
+        
+        progresso = st.progress(0.0, text=f"🔄 Analisando {len(links):,} links...")
+        tabela = st.empty()
+        resultados = [None] * len(links)
+        concluidos = 0
+        
+        with medir_bloco("lote.analisar_links", linhas=len(links)):
+            for posicao, item in analisar_links_em_lote(links, df_videos, df_usuarios):
+                resultados[posicao] = item
+                concluidos += 1
+                if concluidos % LOTE_TAMANHO_BLOCO == 0 or concluidos == len(links):
+                    progresso.progress(concluidos / len(links), text=f"🔄 {concluidos:,}/{len(links):,} links analisados")
+                    tabela.dataframe(pd.DataFrame([r for r in resultados if r is not None]), hide_index=True, use_container_width=True)
+        
+        progresso.empty()
+        tabela.empty()
+        st.session_state['resultado_lote'] = pd.DataFrame(resultados)
+    
+    df_resultado = st.session_state.get('resultado_lote')
+    if df_resultado is None or df_resultado.empty:
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🔗 Links Analisados", f"{len(df_resultado):,}")
+    with col2:
+        st.metric("✅ Cadastrados", f"{int(df_resultado['cadastrado'].sum()):,}")
+    with col3:
+        st.metric("👤 Dono Identificado", f"{int(df_resultado['dono'].notna().sum()):,}")
+    with col4:
+        st.metric("❌ Não Reconhecidos", f"{int((df_resultado['status'] == 'erro').sum()):,}")
+    
+    st.dataframe(
+        df_resultado,
+        column_config={
+            "url": st.column_config.LinkColumn("🔗 Link"),
+            "plataforma": "📱 Plataforma",
+            "identificacao": "🆔 Identificação",
+            "cadastrado": st.column_config.CheckboxColumn("✅ Cadastrado"),
+            "criador": "🎬 Criador",
+            "views": st.column_config.NumberColumn("👁️ Views", format="%d"),
+            "dono": "👤 Dono",
+            "user_id": "🆔 User ID",
+            "status": "📊 Status"
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    st.download_button(
+        "📥 Baixar resultado (CSV)",
+        df_resultado.to_csv(index=False).encode('utf-8'),
+        file_name="identificacao_links.csv",
+        mime="text/csv"
+    )
+
 def obter_contas_por_usuario(df_usuarios, df_videos):
     """Obtém lista de contas por usuário baseada nos vídeos cadastrados"""
     if df_usuarios.empty or df_videos.empty:
@@ -1168,6 +2788,444 @@ def obter_contas_por_usuario(df_usuarios, df_videos):
     
     return contas_usuarios
 
+@fragmento
+@medir_desempenho()
+def secao_identificar_link(df_videos, df_usuarios):
+    """Identificador de um link (analisar reexecuta só esta região)"""
+    st.subheader("🔍 Identificador de Links de Vídeos")
+    st.info("💡 Cole um link de vídeo para descobrir automaticamente a plataforma e o dono")
+    
+    # Interface de identificação
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        url_input = st.text_input(
+            "🔗 Cole o link do vídeo aqui:",
+            placeholder="Ex: tiktok.com/t/abc, youtube.com/shorts/xyz, instagram.com/reel/123",
+            help="Suporta TODOS os formatos: TikTok (5 tipos), YouTube (6 tipos), Instagram (6 tipos) - Total: 17 formatos!"
+        )
+    
+    with col2:
+        st.markdown("<br>", unsafe_allow_html=True)  # Espaçamento
+        analisar = st.button("🔍 Analisar Link", type="primary", use_container_width=True)
+    
+    # Análise do link
+    if url_input and analisar:
+        with st.spinner("🔄 Analisando link..."):
+            resultado = extrair_informacoes_do_link(url_input, df_videos, df_usuarios)
+            
+            if resultado['status'] == 'erro':
+                st.error("❌ Link não reconhecido ou formato inválido")
+                st.info("💡 **Formatos suportados (17 tipos):**")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.info("**🎵 TikTok:**\n• @usuario/video/123\n• /t/abc123\n• vm.tiktok.com\n• m.tiktok.com\n• @usuario")
+                with col2:
+                    st.info("**📺 YouTube:**\n• /watch?v=abc\n• /shorts/abc\n• /@canal\n• /c/canal\n• youtu.be/abc")
+                with col3:
+                    st.info("**📸 Instagram:**\n• /p/abc123\n• /reel/xyz\n• /tv/def\n• /stories/user\n• /usuario")
+            else:
+                # Mostrar resultados
+                st.success("✅ Link analisado com sucesso!")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Informações da plataforma
+                    plataforma_emoji = {
+                        'tiktok': '🎵',
+                        'youtube': '📺', 
+                        'instagram': '📸'
+                    }.get(resultado['plataforma'], '📱')
+                    
+                    # Detectar tipo de conteúdo específico
+                    tipo_conteudo = ""
+                    username_display = resultado['username_extraido']
+                    
+                    if resultado['plataforma'] == 'youtube':
+                        if 'shorts_' in username_display:
+                            tipo_conteudo = " (YouTube Short)"
+                            plataforma_emoji = "🩳"
+                            video_id = username_display.replace('shorts_', '')
+                            username_display = f"Short ID: {video_id}"
+                        elif 'canal_' in username_display:
+                            tipo_conteudo = " (Canal)"
+                            username_display = "Canal detectado"
+                    
+                    elif resultado['plataforma'] == 'tiktok':
+                        if 'video_' in username_display:
+                            tipo_conteudo = " (Vídeo)"
+                            video_id = username_display.replace('video_', '')
+                            username_display = f"Vídeo ID: {video_id}"
+                        elif 'vm_link_' in username_display:
+                            tipo_conteudo = " (Link Curto VM)"
+                            plataforma_emoji = "🔗"
+                            short_id = username_display.replace('vm_link_', '')
+                            username_display = f"VM ID: {short_id}"
+                        elif 'short_link_' in username_display:
+                            tipo_conteudo = " (Link Curto T)"
+                            plataforma_emoji = "🔗"
+                            short_id = username_display.replace('short_link_', '')
+                            username_display = f"T ID: {short_id}"
+                        else:
+                            username_display = f"@{username_display}"
+                    
+                    elif resultado['plataforma'] == 'instagram':
+                        if 'post_' in username_display:
+                            tipo_conteudo = " (Post)"
+                            plataforma_emoji = "📷"
+                            post_id = username_display.replace('post_', '')
+                            username_display = f"Post ID: {post_id}"
+                        elif 'reel_' in username_display:
+                            tipo_conteudo = " (Reel)"
+                            plataforma_emoji = "🎬"
+                            reel_id = username_display.replace('reel_', '')
+                            username_display = f"Reel ID: {reel_id}"
+                        elif 'igtv_' in username_display:
+                            tipo_conteudo = " (IGTV)"
+                            plataforma_emoji = "📺"
+                            tv_id = username_display.replace('igtv_', '')
+                            username_display = f"IGTV ID: {tv_id}"
+                        elif 'story_' in username_display:
+                            tipo_conteudo = " (Story)"
+                            plataforma_emoji = "📱"
+                            story_user = username_display.replace('story_', '')
+                            username_display = f"Story de: @{story_user}"
+                        else:
+                            username_display = f"@{username_display}"
+                    
+                    st.markdown(f"""
+                    <div class="ranking-card">
+                        <h4>{plataforma_emoji} Informações da Plataforma</h4>
+                        <p><strong>Plataforma:</strong> {resultado['plataforma'].title()}{tipo_conteudo}</p>
+                        <p><strong>Identificação:</strong> {username_display}</p>
+                        <p><strong>Link analisado:</strong> <a href="{resultado['url_original']}" target="_blank">Ver original</a></p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                with col2:
+                    # Status no banco de dados
+                    if resultado['video_cadastrado']:
+                        video = resultado['video_info']
+                        st.markdown(f"""
+                        <div class="success-box">
+                            <h4>✅ Vídeo Cadastrado na Competição</h4>
+                            <p><strong>Criador:</strong> {video.get('discord_username', 'N/A')}</p>
+                            <p><strong>Views:</strong> {formatar_numero(video.get('views', 0))}</p>
+                            <p><strong>Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
+                            <p><strong>Plataforma:</strong> {video.get('platform', 'N/A')}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown("""
+                        <div class="warning-box">
+                            <h4>🚫 Vídeo NÃO cadastrado na competição</h4>
+                            <p>Este vídeo não foi encontrado na base de dados da competição.</p>
+                            <ul>
+                                <li>Pode ser de um usuário não participante</li>
+                                <li>Pode ser um vídeo muito recente</li>
+                                <li>Link pode ter sido alterado</li>
+                            </ul>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                # Informações do dono da conta
+                if resultado['dono_identificado']:
+                    st.divider()
+                    dono = resultado['dono_info']
+                    
+                    st.markdown("#### 👤 Dono da Conta Identificado")
+                    
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        st.markdown(f"""
+                        <div class="insight-box">
+                            <h5>🎯 Usuário Discord</h5>
+                            <p><strong>{dono['discord_username']}</strong></p>
+                            <p>ID: {dono.get('user_id', 'N/A')}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    with col2:
+                        st.markdown(f"""
+                        <div class="insight-box">
+                            <h5>📊 Estatísticas Gerais</h5>
+                            <p><strong>Vídeos:</strong> {dono.get('total_videos', 0)}</p>
+                            <p><strong>Views:</strong> {formatar_numero(dono.get('total_views', 0))}</p>
+                            <p><strong>Curtidas:</strong> {formatar_numero(dono.get('total_likes', 0))}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    with col3:
+                        st.markdown(f"""
+                        <div class="insight-box">
+                            <h5>🏆 Performance</h5>
+                            <p><strong>Score:</strong> {dono.get('score_performance', 0):.1f}/100</p>
+                            <p><strong>Engajamento:</strong> {dono.get('taxa_engajamento', 0):.1f}%</p>
+                            <p><strong>Categoria:</strong> {dono.get('categoria_performance', 'N/A')}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                else:
+                    st.divider()
+                    st.markdown("""
+                    <div class="warning-box">
+                        <h4>❓ Dono da Conta Não Identificado</h4>
+                        <p>Não foi possível associar esta conta a nenhum usuário Discord cadastrado.</p>
+                        <ul>
+                            <li>Pode ser um criador externo</li>
+                            <li>Username pode ter mudado</li>
+                            <li>Associação manual pode ser necessária</li>
+                        </ul>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+@fragmento
+@medir_desempenho()
+def secao_lista_contas(contas_usuarios, df_videos):
+    """Filtros e lista de contas por usuário (as contas já detectadas são reaproveitadas)"""
+    # Debug info
+    with st.expander("🔍 Informações de Debug", expanded=False):
+        videos_totais = len(df_videos) if not df_videos.empty else 0
+        videos_com_url = len(df_videos[df_videos['url'].notna()]) if not df_videos.empty and 'url' in df_videos.columns else 0
+        usuarios_com_videos = len([u for u in contas_usuarios if u['total_videos'] > 0])
+        usuarios_com_contas = len([u for u in contas_usuarios if u['plataformas_ativas'] > 0])
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("📊 Vídeos no Banco", videos_totais)
+        with col2:
+            st.metric("🔗 Vídeos com URLs", videos_com_url)
+        with col3:
+            st.metric("👥 Usuários com Vídeos", usuarios_com_videos)
+        with col4:
+            st.metric("🎯 Usuários com Contas", usuarios_com_contas)
+        
+        st.info("💡 Se um usuário tem vídeos mas não tem contas detectadas, pode ser problema na extração de username dos URLs")
+    
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        filtro_status = st.selectbox(
+            "🎯 Filtrar por status:",
+            ["Todos", "🟢 Completo", "🟡 Parcial", "🔴 Sem contas"]
+        )
+    
+    with col2:
+        filtro_plataforma = st.selectbox(
+            "📱 Filtrar por plataforma:",
+            ["Todas", "TikTok", "YouTube", "Instagram"]
+        )
+    
+    with col3:
+        ordenar_por = st.selectbox(
+            "📊 Ordenar por:",
+            ["Plataformas ativas", "Views totais", "Vídeos totais", "Nome"]
+        )
+    
+    # Aplicar filtros
+    contas_filtradas = contas_usuarios.copy()
+    
+    if filtro_status != "Todos":
+        contas_filtradas = [u for u in contas_filtradas if u['status'] == filtro_status]
+    
+    if filtro_plataforma != "Todas":
+        plat_key = f"contas_{filtro_plataforma.lower()}"
+        contas_filtradas = [u for u in contas_filtradas if u.get(plat_key, [])]
+    
+    # Ordenar
+    if ordenar_por == "Views totais":
+        contas_filtradas.sort(key=lambda x: x['total_views'], reverse=True)
+    elif ordenar_por == "Vídeos totais":
+        contas_filtradas.sort(key=lambda x: x['total_videos'], reverse=True)
+    elif ordenar_por == "Nome":
+        contas_filtradas.sort(key=lambda x: x['discord_username'])
+    
+    st.info(f"📊 Mostrando {len(contas_filtradas)} de {len(contas_usuarios)} usuários")
+    
+    # Exibir contas
+    for i, usuario in enumerate(contas_filtradas):
+        debug_info = usuario.get('debug_info', {})
+        videos_analisados = debug_info.get('videos_analisados', 0)
+        urls_validas = debug_info.get('urls_validas', 0)
+        
+        status_debug = ""
+        if videos_analisados > 0 and usuario['plataformas_ativas'] == 0:
+            status_debug = f" ⚠️ {videos_analisados} vídeos analisados, {urls_validas} URLs válidas"
+        
+        with st.expander(f"{usuario['status']} {usuario['discord_username']} ({usuario['plataformas_ativas']}/{usuario['plataformas_com_videos']} plataformas){status_debug}"):
+            col1, col2 = st.columns([2, 1])
+            
+            with col1:
+                # Informações das contas
+                st.markdown("#### 📱 Contas por Plataforma")
+                
+                plataforma_cols = st.columns(3)
+                
+                # TikTok
+                with plataforma_cols[0]:
+                    if usuario['contas_tiktok']:
+                        contas_display = "<br>".join([f"@{conta}" for conta in usuario['contas_tiktok']])
+                        st.markdown(f"""
+                        <div class="success-box">
+                            <h5>🎵 TikTok ({len(usuario['contas_tiktok'])})</h5>
+                            {contas_display}
+                            <br><small>{usuario['videos_tiktok']} vídeos • {formatar_numero(usuario['views_tiktok'])} views</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    elif usuario['videos_tiktok'] > 0:
+                        st.markdown(f"""
+                        <div class="warning-box">
+                            <h5>🎵 TikTok</h5>
+                            <small>❌ {usuario['videos_tiktok']} vídeos, mas conta não detectada</small><br>
+                            <small>🔍 URLs podem ter formato inesperado</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown("""
+                        <div class="stats-box">
+                            <h5>🎵 TikTok</h5>
+                            <small>Nenhum vídeo nesta plataforma</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                # YouTube
+                with plataforma_cols[1]:
+                    if usuario['contas_youtube']:
+                        contas_display = "<br>".join([f"@{conta}" for conta in usuario['contas_youtube']])
+                        st.markdown(f"""
+                        <div class="success-box">
+                            <h5>📺 YouTube ({len(usuario['contas_youtube'])})</h5>
+                            {contas_display}
+                            <br><small>{usuario['videos_youtube']} vídeos • {formatar_numero(usuario['views_youtube'])} views</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    elif usuario['videos_youtube'] > 0:
+                        st.markdown(f"""
+                        <div class="warning-box">
+                            <h5>📺 YouTube</h5>
+                            <small>❌ {usuario['videos_youtube']} vídeos, mas conta não detectada</small><br>
+                            <small>🔍 URLs podem ter formato inesperado</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown("""
+                        <div class="stats-box">
+                            <h5>📺 YouTube</h5>
+                            <small>Nenhum vídeo nesta plataforma</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                # Instagram
+                with plataforma_cols[2]:
+                    if usuario['contas_instagram']:
+                        contas_display = "<br>".join([f"@{conta}" for conta in usuario['contas_instagram']])
+                        st.markdown(f"""
+                        <div class="success-box">
+                            <h5>📸 Instagram ({len(usuario['contas_instagram'])})</h5>
+                            {contas_display}
+                            <br><small>{usuario['videos_instagram']} vídeos • {formatar_numero(usuario['views_instagram'])} views</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    elif usuario['videos_instagram'] > 0:
+                        st.markdown(f"""
+                        <div class="warning-box">
+                            <h5>📸 Instagram</h5>
+                            <small>❌ {usuario['videos_instagram']} vídeos, mas conta não detectada</small><br>
+                            <small>🔍 URLs podem ter formato inesperado</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown("""
+                        <div class="stats-box">
+                            <h5>📸 Instagram</h5>
+                            <small>Nenhum vídeo nesta plataforma</small>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                # Debug detalhado para casos problemáticos
+                if videos_analisados > 0 and usuario['plataformas_ativas'] == 0:
+                    st.markdown("#### 🔍 Debug Detalhado")
+                    st.warning(f"⚠️ Este usuário tem {videos_analisados} vídeos, mas nenhuma conta foi detectada automaticamente.")
+                    
+                    # Mostrar alguns URLs para debug
+                    if not df_videos.empty and 'discord_username' in df_videos.columns:
+                        videos_usuario = df_videos[df_videos['discord_username'] == usuario['discord_username']]
+                        urls_amostra = videos_usuario['url'].dropna().head(3).tolist()
+                        
+                        if urls_amostra:
+                            st.markdown("**Exemplos de URLs encontradas:**")
+                            for j, url in enumerate(urls_amostra, 1):
+                                plataforma, username = detectar_plataforma_do_link(url)
+                                st.code(f"{j}. {url[:60]}... → {plataforma or 'NÃO DETECTADA'} / {username or 'SEM USERNAME'}")
+            
+            with col2:
+                # Estatísticas do usuário
+                st.markdown("#### 📊 Estatísticas Gerais")
+                
+                st.metric("🎥 Total de Vídeos", usuario['total_videos'])
+                st.metric("👁️ Total de Views", formatar_numero(usuario['total_views']))
+                st.metric("🔍 Vídeos Analisados", videos_analisados)
+                st.metric("🔗 URLs Válidas", urls_validas)
+                
+                # Status de detecção
+                if usuario['plataformas_ativas'] > 0:
+                    st.success(f"✅ {usuario['plataformas_ativas']} plataformas detectadas")
+                elif usuario['total_videos'] > 0:
+                    st.error(f"❌ {usuario['total_videos']} vídeos, mas 0 contas detectadas")
+                else:
+                    st.info("😴 Usuário sem vídeos")
+                
+                # Distribuição por plataforma
+                if usuario['total_videos'] > 0:
+                    st.markdown("**📈 Distribuição:**")
+                    
+                    for plataforma, videos, views in [
+                        ('TikTok', usuario['videos_tiktok'], usuario['views_tiktok']),
+                        ('YouTube', usuario['videos_youtube'], usuario['views_youtube']),
+                        ('Instagram', usuario['videos_instagram'], usuario['views_instagram'])
+                    ]:
+                        if videos > 0:
+                            perc_videos = (videos / usuario['total_videos']) * 100
+                            perc_views = (views / usuario['total_views']) * 100 if usuario['total_views'] > 0 else 0
+                            st.markdown(f"• **{plataforma}:** {videos} vídeos ({perc_videos:.1f}%) • {formatar_numero(views)} views ({perc_views:.1f}%)")
+    
+    # Botão para forçar re-análise
+    st.divider()
+    if st.button("🔄 Forçar Re-análise das Contas", help="Executa novamente a detecção de contas"):
+        # O mapa de contas fica em st.cache_resource (por versão dos dados), não no cache_data
+        _construir_contas_usuarios.clear()
+        st.rerun()
+    
+    # Estatísticas de resumo
+    st.divider()
+    st.markdown("#### 📈 Resumo das Contas")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        usuarios_completos = len([u for u in contas_usuarios if u['plataformas_ativas'] == 3])
+        st.metric("🟢 Usuários Completos", f"{usuarios_completos}", 
+                 help="Usuários com contas em todas as 3 plataformas")
+    
+    with col2:
+        usuarios_parciais = len([u for u in contas_usuarios if 1 <= u['plataformas_ativas'] < 3])
+        st.metric("🟡 Usuários Parciais", f"{usuarios_parciais}",
+                 help="Usuários com contas em 1-2 plataformas")
+    
+    with col3:
+        usuarios_sem_contas = len([u for u in contas_usuarios if u['plataformas_ativas'] == 0])
+        st.metric("🔴 Sem Contas", f"{usuarios_sem_contas}",
+                 help="Usuários sem contas detectadas")
+    
+    with col4:
+        total_contas_detectadas = sum(len(u['contas_tiktok']) + len(u['contas_youtube']) + len(u['contas_instagram']) for u in contas_usuarios)
+        st.metric("🎯 Total de Contas", f"{total_contas_detectadas}",
+                 help="Total de contas únicas detectadas")
+
+@medir_desempenho()
 def pagina_gestao_contas(df_videos, df_usuarios):
     """Nova página para gestão de contas e identificação"""
     st.markdown('<div class="main-header"><h1>🔗 Gestão de Contas e Identificação</h1><p>Identifique donos de links e gerencie contas dos usuários</p></div>', unsafe_allow_html=True)
@@ -1191,20 +3249,22 @@ def pagina_gestao_contas(df_videos, df_usuarios):
         # Contar plataformas detectadas
         plataformas_detectadas = set()
         if not df_videos.empty and 'url' in df_videos.columns:
-            for url in df_videos['url'].dropna():
-                plataforma, _ = detectar_plataforma_do_link(str(url))
-                if plataforma:
-                    plataformas_detectadas.add(plataforma)
+            with medir_bloco("gestao.plataformas_detectadas", linhas=len(df_videos)):
+                for url in df_videos['url'].dropna():
+                    plataforma, _ = detectar_plataforma_do_link(str(url))
+                    if plataforma:
+                        plataformas_detectadas.add(plataforma)
         st.metric("📱 Plataformas", len(plataformas_detectadas))
     
     with col4:
         # Contas únicas detectadas
         contas_unicas = set()
         if not df_videos.empty and 'url' in df_videos.columns:
-            for url in df_videos['url'].dropna():
-                _, username = detectar_plataforma_do_link(str(url))
-                if username and not username.startswith(('video_especifico', 'post_', 'reel_', 'link_curto_')):
-                    contas_unicas.add(username)
+            with medir_bloco("gestao.contas_unicas", linhas=len(df_videos)):
+                for url in df_videos['url'].dropna():
+                    _, username = detectar_plataforma_do_link(str(url))
+                    if username and not username.startswith(('video_especifico', 'post_', 'reel_', 'link_curto_')):
+                        contas_unicas.add(username)
         st.metric("🎯 Contas Detectadas", len(contas_unicas))
     
     st.divider()
@@ -1213,194 +3273,10 @@ def pagina_gestao_contas(df_videos, df_usuarios):
     tab1, tab2 = st.tabs(["🔍 Identificar Link", "👥 Contas dos Usuários"])
     
     with tab1:
-        st.subheader("🔍 Identificador de Links de Vídeos")
-        st.info("💡 Cole um link de vídeo para descobrir automaticamente a plataforma e o dono")
-        
-        # Interface de identificação
-        col1, col2 = st.columns([3, 1])
+        secao_identificar_link(df_videos, df_usuarios)
         
-        with col1:
-            url_input = st.text_input(
-                "🔗 Cole o link do vídeo aqui:",
-                placeholder="Ex: tiktok.com/t/abc, youtube.com/shorts/xyz, instagram.com/reel/123",
-                help="Suporta TODOS os formatos: TikTok (5 tipos), YouTube (6 tipos), Instagram (6 tipos) - Total: 17 formatos!"
-            )
-        
-        with col2:
-            st.markdown("<br>", unsafe_allow_html=True)  # Espaçamento
-            analisar = st.button("🔍 Analisar Link", type="primary", use_container_width=True)
-        
-        # Análise do link
-        if url_input and analisar:
-            with st.spinner("🔄 Analisando link..."):
-                resultado = extrair_informacoes_do_link(url_input, df_videos, df_usuarios)
-                
-                if resultado['status'] == 'erro':
-                    st.error("❌ Link não reconhecido ou formato inválido")
-                    st.info("💡 **Formatos suportados (17 tipos):**")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.info("**🎵 TikTok:**\n• @usuario/video/123\n• /t/abc123\n• vm.tiktok.com\n• m.tiktok.com\n• @usuario")
-                    with col2:
-                        st.info("**📺 YouTube:**\n• /watch?v=abc\n• /shorts/abc\n• /@canal\n• /c/canal\n• youtu.be/abc")
-                    with col3:
-                        st.info("**📸 Instagram:**\n• /p/abc123\n• /reel/xyz\n• /tv/def\n• /stories/user\n• /usuario")
-                else:
-                    # Mostrar resultados
-                    st.success("✅ Link analisado com sucesso!")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Informações da plataforma
-                        plataforma_emoji = {
-                            'tiktok': '🎵',
-                            'youtube': '📺', 
-                            'instagram': '📸'
-                        }.get(resultado['plataforma'], '📱')
-                        
-                        # Detectar tipo de conteúdo específico
-                        tipo_conteudo = ""
-                        username_display = resultado['username_extraido']
-                        
-                        if resultado['plataforma'] == 'youtube':
-                            if 'shorts_' in username_display:
-                                tipo_conteudo = " (YouTube Short)"
-                                plataforma_emoji = "🩳"
-                                video_id = username_display.replace('shorts_', '')
-                                username_display = f"Short ID: {video_id}"
-                            elif 'canal_' in username_display:
-                                tipo_conteudo = " (Canal)"
-                                username_display = "Canal detectado"
-                        
-                        elif resultado['plataforma'] == 'tiktok':
-                            if 'video_' in username_display:
-                                tipo_conteudo = " (Vídeo)"
-                                video_id = username_display.replace('video_', '')
-                                username_display = f"Vídeo ID: {video_id}"
-                            elif 'vm_link_' in username_display:
-                                tipo_conteudo = " (Link Curto VM)"
-                                plataforma_emoji = "🔗"
-                                short_id = username_display.replace('vm_link_', '')
-                                username_display = f"VM ID: {short_id}"
-                            elif 'short_link_' in username_display:
-                                tipo_conteudo = " (Link Curto T)"
-                                plataforma_emoji = "🔗"
-                                short_id = username_display.replace('short_link_', '')
-                                username_display = f"T ID: {short_id}"
-                            else:
-                                username_display = f"@{username_display}"
-                        
-                        elif resultado['plataforma'] == 'instagram':
-                            if 'post_' in username_display:
-                                tipo_conteudo = " (Post)"
-                                plataforma_emoji = "📷"
-                                post_id = username_display.replace('post_', '')
-                                username_display = f"Post ID: {post_id}"
-                            elif 'reel_' in username_display:
-                                tipo_conteudo = " (Reel)"
-                                plataforma_emoji = "🎬"
-                                reel_id = username_display.replace('reel_', '')
-                                username_display = f"Reel ID: {reel_id}"
-                            elif 'igtv_' in username_display:
-                                tipo_conteudo = " (IGTV)"
-                                plataforma_emoji = "📺"
-                                tv_id = username_display.replace('igtv_', '')
-                                username_display = f"IGTV ID: {tv_id}"
-                            elif 'story_' in username_display:
-                                tipo_conteudo = " (Story)"
-                                plataforma_emoji = "📱"
-                                story_user = username_display.replace('story_', '')
-                                username_display = f"Story de: @{story_user}"
-                            else:
-                                username_display = f"@{username_display}"
-                        
-                        st.markdown(f"""
-                        <div class="ranking-card">
-                            <h4>{plataforma_emoji} Informações da Plataforma</h4>
-                            <p><strong>Plataforma:</strong> {resultado['plataforma'].title()}{tipo_conteudo}</p>
-                            <p><strong>Identificação:</strong> {username_display}</p>
-                            <p><strong>Link analisado:</strong> <a href="{resultado['url_original']}" target="_blank">Ver original</a></p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        # Status no banco de dados
-                        if resultado['video_cadastrado']:
-                            video = resultado['video_info']
-                            st.markdown(f"""
-                            <div class="success-box">
-                                <h4>✅ Vídeo Cadastrado na Competição</h4>
-                                <p><strong>Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                                <p><strong>Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                                <p><strong>Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                                <p><strong>Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown("""
-                            <div class="warning-box">
-                                <h4>🚫 Vídeo NÃO cadastrado na competição</h4>
-                                <p>Este vídeo não foi encontrado na base de dados da competição.</p>
-                                <ul>
-                                    <li>Pode ser de um usuário não participante</li>
-                                    <li>Pode ser um vídeo muito recente</li>
-                                    <li>Link pode ter sido alterado</li>
-                                </ul>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    # Informações do dono da conta
-                    if resultado['dono_identificado']:
-                        st.divider()
-                        dono = resultado['dono_info']
-                        
-                        st.markdown("#### 👤 Dono da Conta Identificado")
-                        
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.markdown(f"""
-                            <div class="insight-box">
-                                <h5>🎯 Usuário Discord</h5>
-                                <p><strong>{dono['discord_username']}</strong></p>
-                                <p>ID: {dono.get('user_id', 'N/A')}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col2:
-                            st.markdown(f"""
-                            <div class="insight-box">
-                                <h5>📊 Estatísticas Gerais</h5>
-                                <p><strong>Vídeos:</strong> {dono.get('total_videos', 0)}</p>
-                                <p><strong>Views:</strong> {formatar_numero(dono.get('total_views', 0))}</p>
-                                <p><strong>Curtidas:</strong> {formatar_numero(dono.get('total_likes', 0))}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col3:
-                            st.markdown(f"""
-                            <div class="insight-box">
-                                <h5>🏆 Performance</h5>
-                                <p><strong>Score:</strong> {dono.get('score_performance', 0):.1f}/100</p>
-                                <p><strong>Engajamento:</strong> {dono.get('taxa_engajamento', 0):.1f}%</p>
-                                <p><strong>Categoria:</strong> {dono.get('categoria_performance', 'N/A')}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    else:
-                        st.divider()
-                        st.markdown("""
-                        <div class="warning-box">
-                            <h4>❓ Dono da Conta Não Identificado</h4>
-                            <p>Não foi possível associar esta conta a nenhum usuário Discord cadastrado.</p>
-                            <ul>
-                                <li>Pode ser um criador externo</li>
-                                <li>Username pode ter mudado</li>
-                                <li>Associação manual pode ser necessária</li>
-                            </ul>
-                        </div>
-                        """, unsafe_allow_html=True)
+        st.divider()
+        secao_identificacao_em_lote(df_videos, df_usuarios)
     
     with tab2:
         st.subheader("👥 Gestão de Contas dos Usuários")
@@ -1408,252 +3284,16 @@ def pagina_gestao_contas(df_videos, df_usuarios):
         
         # Obter dados das contas
         with st.spinner("🔄 Analisando contas dos usuários..."):
-            contas_usuarios = obter_contas_por_usuario_melhorado(df_usuarios, df_videos)
+            contas_usuarios = obter_contas_usuarios(df_usuarios, df_videos)
         
         if not contas_usuarios:
             st.warning("⚠️ Nenhuma conta foi detectada nos dados disponíveis")
             return
         
-        # Debug info
-        with st.expander("🔍 Informações de Debug", expanded=False):
-            videos_totais = len(df_videos) if not df_videos.empty else 0
-            videos_com_url = len(df_videos[df_videos['url'].notna()]) if not df_videos.empty and 'url' in df_videos.columns else 0
-            usuarios_com_videos = len([u for u in contas_usuarios if u['total_videos'] > 0])
-            usuarios_com_contas = len([u for u in contas_usuarios if u['plataformas_ativas'] > 0])
-            
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("📊 Vídeos no Banco", videos_totais)
-            with col2:
-                st.metric("🔗 Vídeos com URLs", videos_com_url)
-            with col3:
-                st.metric("👥 Usuários com Vídeos", usuarios_com_videos)
-            with col4:
-                st.metric("🎯 Usuários com Contas", usuarios_com_contas)
-            
-            st.info("💡 Se um usuário tem vídeos mas não tem contas detectadas, pode ser problema na extração de username dos URLs")
-        
-        # Filtros
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            filtro_status = st.selectbox(
-                "🎯 Filtrar por status:",
-                ["Todos", "🟢 Completo", "🟡 Parcial", "🔴 Sem contas"]
-            )
-        
-        with col2:
-            filtro_plataforma = st.selectbox(
-                "📱 Filtrar por plataforma:",
-                ["Todas", "TikTok", "YouTube", "Instagram"]
-            )
-        
-        with col3:
-            ordenar_por = st.selectbox(
-                "📊 Ordenar por:",
-                ["Plataformas ativas", "Views totais", "Vídeos totais", "Nome"]
-            )
-        
-        # Aplicar filtros
-        contas_filtradas = contas_usuarios.copy()
-        
-        if filtro_status != "Todos":
-            contas_filtradas = [u for u in contas_filtradas if u['status'] == filtro_status]
-        
-        if filtro_plataforma != "Todas":
-            plat_key = f"contas_{filtro_plataforma.lower()}"
-            contas_filtradas = [u for u in contas_filtradas if u.get(plat_key, [])]
-        
-        # Ordenar
-        if ordenar_por == "Views totais":
-            contas_filtradas.sort(key=lambda x: x['total_views'], reverse=True)
-        elif ordenar_por == "Vídeos totais":
-            contas_filtradas.sort(key=lambda x: x['total_videos'], reverse=True)
-        elif ordenar_por == "Nome":
-            contas_filtradas.sort(key=lambda x: x['discord_username'])
-        
-        st.info(f"📊 Mostrando {len(contas_filtradas)} de {len(contas_usuarios)} usuários")
-        
-        # Exibir contas
-        for i, usuario in enumerate(contas_filtradas):
-            debug_info = usuario.get('debug_info', {})
-            videos_analisados = debug_info.get('videos_analisados', 0)
-            urls_validas = debug_info.get('urls_validas', 0)
-            
-            status_debug = ""
-            if videos_analisados > 0 and usuario['plataformas_ativas'] == 0:
-                status_debug = f" ⚠️ {videos_analisados} vídeos analisados, {urls_validas} URLs válidas"
-            
-            with st.expander(f"{usuario['status']} {usuario['discord_username']} ({usuario['plataformas_ativas']}/{usuario['plataformas_com_videos']} plataformas){status_debug}"):
-                col1, col2 = st.columns([2, 1])
-                
-                with col1:
-                    # Informações das contas
-                    st.markdown("#### 📱 Contas por Plataforma")
-                    
-                    plataforma_cols = st.columns(3)
-                    
-                    # TikTok
-                    with plataforma_cols[0]:
-                        if usuario['contas_tiktok']:
-                            contas_display = "<br>".join([f"@{conta}" for conta in usuario['contas_tiktok']])
-                            st.markdown(f"""
-                            <div class="success-box">
-                                <h5>🎵 TikTok ({len(usuario['contas_tiktok'])})</h5>
-                                {contas_display}
-                                <br><small>{usuario['videos_tiktok']} vídeos • {formatar_numero(usuario['views_tiktok'])} views</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        elif usuario['videos_tiktok'] > 0:
-                            st.markdown(f"""
-                            <div class="warning-box">
-                                <h5>🎵 TikTok</h5>
-                                <small>❌ {usuario['videos_tiktok']} vídeos, mas conta não detectada</small><br>
-                                <small>🔍 URLs podem ter formato inesperado</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown("""
-                            <div class="stats-box">
-                                <h5>🎵 TikTok</h5>
-                                <small>Nenhum vídeo nesta plataforma</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    # YouTube
-                    with plataforma_cols[1]:
-                        if usuario['contas_youtube']:
-                            contas_display = "<br>".join([f"@{conta}" for conta in usuario['contas_youtube']])
-                            st.markdown(f"""
-                            <div class="success-box">
-                                <h5>📺 YouTube ({len(usuario['contas_youtube'])})</h5>
-                                {contas_display}
-                                <br><small>{usuario['videos_youtube']} vídeos • {formatar_numero(usuario['views_youtube'])} views</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        elif usuario['videos_youtube'] > 0:
-                            st.markdown(f"""
-                            <div class="warning-box">
-                                <h5>📺 YouTube</h5>
-                                <small>❌ {usuario['videos_youtube']} vídeos, mas conta não detectada</small><br>
-                                <small>🔍 URLs podem ter formato inesperado</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown("""
-                            <div class="stats-box">
-                                <h5>📺 YouTube</h5>
-                                <small>Nenhum vídeo nesta plataforma</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    # Instagram
-                    with plataforma_cols[2]:
-                        if usuario['contas_instagram']:
-                            contas_display = "<br>".join([f"@{conta}" for conta in usuario['contas_instagram']])
-                            st.markdown(f"""
-                            <div class="success-box">
-                                <h5>📸 Instagram ({len(usuario['contas_instagram'])})</h5>
-                                {contas_display}
-                                <br><small>{usuario['videos_instagram']} vídeos • {formatar_numero(usuario['views_instagram'])} views</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        elif usuario['videos_instagram'] > 0:
-                            st.markdown(f"""
-                            <div class="warning-box">
-                                <h5>📸 Instagram</h5>
-                                <small>❌ {usuario['videos_instagram']} vídeos, mas conta não detectada</small><br>
-                                <small>🔍 URLs podem ter formato inesperado</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown("""
-                            <div class="stats-box">
-                                <h5>📸 Instagram</h5>
-                                <small>Nenhum vídeo nesta plataforma</small>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    # Debug detalhado para casos problemáticos
-                    if videos_analisados > 0 and usuario['plataformas_ativas'] == 0:
-                        st.markdown("#### 🔍 Debug Detalhado")
-                        st.warning(f"⚠️ Este usuário tem {videos_analisados} vídeos, mas nenhuma conta foi detectada automaticamente.")
-                        
-                        # Mostrar alguns URLs para debug
-                        if not df_videos.empty and 'discord_username' in df_videos.columns:
-                            videos_usuario = df_videos[df_videos['discord_username'] == usuario['discord_username']]
-                            urls_amostra = videos_usuario['url'].dropna().head(3).tolist()
-                            
-                            if urls_amostra:
-                                st.markdown("**Exemplos de URLs encontradas:**")
-                                for j, url in enumerate(urls_amostra, 1):
-                                    plataforma, username = detectar_plataforma_do_link(url)
-                                    st.code(f"{j}. {url[:60]}... → {plataforma or 'NÃO DETECTADA'} / {username or 'SEM USERNAME'}")
-                
-                with col2:
-                    # Estatísticas do usuário
-                    st.markdown("#### 📊 Estatísticas Gerais")
-                    
-                    st.metric("🎥 Total de Vídeos", usuario['total_videos'])
-                    st.metric("👁️ Total de Views", formatar_numero(usuario['total_views']))
-                    st.metric("🔍 Vídeos Analisados", videos_analisados)
-                    st.metric("🔗 URLs Válidas", urls_validas)
-                    
-                    # Status de detecção
-                    if usuario['plataformas_ativas'] > 0:
-                        st.success(f"✅ {usuario['plataformas_ativas']} plataformas detectadas")
-                    elif usuario['total_videos'] > 0:
-                        st.error(f"❌ {usuario['total_videos']} vídeos, mas 0 contas detectadas")
-                    else:
-                        st.info("😴 Usuário sem vídeos")
-                    
-                    # Distribuição por plataforma
-                    if usuario['total_videos'] > 0:
-                        st.markdown("**📈 Distribuição:**")
-                        
-                        for plataforma, videos, views in [
-                            ('TikTok', usuario['videos_tiktok'], usuario['views_tiktok']),
-                            ('YouTube', usuario['videos_youtube'], usuario['views_youtube']),
-                            ('Instagram', usuario['videos_instagram'], usuario['views_instagram'])
-                        ]:
-                            if videos > 0:
-                                perc_videos = (videos / usuario['total_videos']) * 100
-                                perc_views = (views / usuario['total_views']) * 100 if usuario['total_views'] > 0 else 0
-                                st.markdown(f"• **{plataforma}:** {videos} vídeos ({perc_videos:.1f}%) • {formatar_numero(views)} views ({perc_views:.1f}%)")
-        
-        # Botão para forçar re-análise
-        st.divider()
-        if st.button("🔄 Forçar Re-análise das Contas", help="Executa novamente a detecção de contas"):
-            st.cache_data.clear()
-            st.rerun()
-        
-        # Estatísticas de resumo
-        st.divider()
-        st.markdown("#### 📈 Resumo das Contas")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            usuarios_completos = len([u for u in contas_usuarios if u['plataformas_ativas'] == 3])
-            st.metric("🟢 Usuários Completos", f"{usuarios_completos}", 
-                     help="Usuários com contas em todas as 3 plataformas")
-        
-        with col2:
-            usuarios_parciais = len([u for u in contas_usuarios if 1 <= u['plataformas_ativas'] < 3])
-            st.metric("🟡 Usuários Parciais", f"{usuarios_parciais}",
-                     help="Usuários com contas em 1-2 plataformas")
-        
-        with col3:
-            usuarios_sem_contas = len([u for u in contas_usuarios if u['plataformas_ativas'] == 0])
-            st.metric("🔴 Sem Contas", f"{usuarios_sem_contas}",
-                     help="Usuários sem contas detectadas")
-        
-        with col4:
-            total_contas_detectadas = sum(len(u['contas_tiktok']) + len(u['contas_youtube']) + len(u['contas_instagram']) for u in contas_usuarios)
-            st.metric("🎯 Total de Contas", f"{total_contas_detectadas}",
-                     help="Total de contas únicas detectadas")
+        secao_lista_contas(contas_usuarios, df_videos)
 
-def criar_ranking_card(titulo, subtitulo, cor_bg, usuarios_data, metrica_principal, metrica_secundaria, icone_metrica):
+def criar_ranking_card(titulo, subtitulo, cor_bg, usuarios_data, metrica_principal, metrica_secundaria, icone_metrica,
+                       diff_ranks=None):
     """Cria um card de ranking padronizado"""
     st.markdown(f"""
     <div style="background: {cor_bg}; 
@@ -1673,22 +3313,29 @@ def criar_ranking_card(titulo, subtitulo, cor_bg, usuarios_data, metrica_princip
     st.metric(f"{icone_metrica} Total Top 5", valor_formatado)
     
     # Lista dos top 5
-    for i, (_, user) in enumerate(usuarios_data.head(5).iterrows(), 1):
+    top5 = usuarios_data.head(5)
+    numeros_formatados = {
+        coluna: formatar_numeros(top5[coluna]).tolist()
+        for coluna in (metrica_principal, metrica_secundaria) if coluna in ('total_views', 'total_likes', 'media_views_por_video')
+    }
+    coluna_rank = {'total_views': 'rank_views', 'score_performance': 'rank_performance'}.get(metrica_principal)
+    movimentos = rotulos_movimento(diff_ranks if coluna_rank else None, top5, coluna_rank).tolist()
+    for i, (_, user) in enumerate(top5.iterrows(), 1):
         if metrica_principal == 'score_performance':
             categoria, cor = user['categoria_performance'], user['cor_categoria']
             valor_principal = f"Score: {user[metrica_principal]:.1f}/100"
             valor_secundario = categoria
         elif metrica_principal == 'total_views':
             cor = "#007bff"
-            valor_principal = f"👁️ {formatar_numero(user[metrica_principal])} views"
+            valor_principal = f"👁️ {numeros_formatados[metrica_principal][i - 1]} views"
             valor_secundario = f"🎥 {user[metrica_secundaria]} vídeos"
         elif metrica_principal == 'total_videos':
             cor = "#28a745"
             valor_principal = f"🎥 {user[metrica_principal]} vídeos"
-            valor_secundario = f"📊 {formatar_numero(user[metrica_secundaria])} views/vídeo"
+            valor_secundario = f"📊 {numeros_formatados[metrica_secundaria][i - 1]} views/vídeo"
         elif metrica_principal == 'total_likes':
             cor = "#dc3545"
-            valor_principal = f"❤️ {formatar_numero(user[metrica_principal])} curtidas"
+            valor_principal = f"❤️ {numeros_formatados[metrica_principal][i - 1]} curtidas"
             valor_secundario = f"📈 {user[metrica_secundaria]:.1f}% engajamento"
         
         # Truncar nome para não quebrar layout
@@ -1696,13 +3343,61 @@ def criar_ranking_card(titulo, subtitulo, cor_bg, usuarios_data, metrica_princip
         
         st.markdown(f"""
         <div class="ranking-item" style="border-left: 4px solid {cor};">
-            <strong>#{i} {nome_truncado}</strong><br>
+            <strong>#{i} {nome_truncado}</strong> <small>{movimentos[i - 1]}</small><br>
             <small>{valor_principal}</small><br>
             <small>{valor_secundario}</small>
         </div>
         """, unsafe_allow_html=True)
 
-def gerar_insights_usuario(usuario_data, df_usuarios):
+# ========== ESTATÍSTICAS DA COORTE ==========
+METRICAS_COORTE = ['total_views', 'total_likes', 'total_videos', 'taxa_engajamento', 'score_performance', 'media_views_por_video']
+QUANTIS_COORTE = [0.25, 0.5, 0.75, 0.9, 0.99]
+
+class EstatisticasCoorte:
+    """Médias, medianas, quantis e percentis dos usuários ativos de um snapshot.
+
+    `percentis` é um DataFrame (usuário ativo × métrica) indexado como df_usuarios:
+    a posição de qualquer usuário é uma consulta direta, sem refiltrar a base.
+    """
+    
+    def __init__(self, df_usuarios):
+        ativos = df_usuarios[df_usuarios['total_views'] > 0]
+        metricas = [m for m in METRICAS_COORTE if m in df_usuarios.columns]
+        numeros = ativos[metricas].apply(pd.to_numeric, errors='coerce')
+        
+        self.total_usuarios = len(df_usuarios)
+        self.total_ativos = len(ativos)
+        self.medias = numeros.mean().to_dict()
+        self.medianas = numeros.median().to_dict()
+        self.quantis = numeros.quantile(QUANTIS_COORTE)
+        # Mesma posição decrescente (min) das colunas rank_*: quem empata fica com a melhor
+        # posição do grupo, e o 1º de N fica com (N-1)/N, como (1 - posicao/total) antes
+        self.percentis = 100 - numeros.rank(ascending=False, method='min') / max(len(ativos), 1) * 100
+    
+    def media(self, metrica):
+        return self.medias.get(metrica, 0.0)
+    
+    def mediana(self, metrica):
+        return self.medianas.get(metrica, 0.0)
+    
+    def percentil(self, rotulo, metrica):
+        """Percentil do usuário entre os ativos, ou None se ele for inativo"""
+        try:
+            valor = self.percentis.at[rotulo, metrica]
+        except KeyError:
+            return None
+        return None if pd.isna(valor) else float(valor)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _construir_estatisticas_coorte(versao, _df_usuarios):
+    with medir_bloco("coorte.construir", linhas=len(_df_usuarios)):
+        return EstatisticasCoorte(_df_usuarios)
+
+def obter_estatisticas_coorte(df_usuarios):
+    """Estatísticas dos usuários ativos do snapshot, calculadas uma vez por versão dos dados"""
+    return _construir_estatisticas_coorte(versao_snapshot(df_usuarios), df_usuarios)
+
+def gerar_insights_usuario(usuario_data, df_usuarios, coorte=None):
     """Gera insights personalizados para um usuário"""
     insights = []
     recomendacoes = []
@@ -1715,8 +3410,8 @@ def gerar_insights_usuario(usuario_data, df_usuarios):
         return insights, recomendacoes
     
     # Análise de posição (só para usuários ativos)
-    usuarios_ativos = df_usuarios[df_usuarios['total_views'] > 0]
-    total_usuarios_ativos = len(usuarios_ativos)
+    coorte = coorte or obter_estatisticas_coorte(df_usuarios)
+    total_usuarios_ativos = coorte.total_ativos
     rank_views = usuario_data['rank_views']
     rank_performance = usuario_data['rank_performance']
     
@@ -1731,7 +3426,7 @@ def gerar_insights_usuario(usuario_data, df_usuarios):
     
     # Análise de engajamento
     taxa = usuario_data['taxa_engajamento']
-    media_taxa = usuarios_ativos['taxa_engajamento'].mean()
+    media_taxa = coorte.media('taxa_engajamento')
     
     if taxa > media_taxa * 2:
         insights.append("🚀 Sua taxa de engajamento é DUPLA da média!")
@@ -1769,7 +3464,259 @@ def gerar_insights_usuario(usuario_data, df_usuarios):
     
     return insights, recomendacoes
 
+# ========== CACHE DE FIGURAS ==========
+FIGURAS_CACHE_MAX = 128
+# Acima disso o ranking mostra a distribuição em vez de uma barra por usuário
+RANKING_MAX_BARRAS = 100
+RANKING_MAX_LINHAS_TABELA = 1000
+DISTRIBUICAO_FAIXAS = 40
+LORENZ_PONTOS = 200
+
+class CacheFiguras:
+    """LRU de figuras Plotly serializadas em JSON, compartilhado entre as sessões.
+
+    Montar a figura com plotly.express custa bem mais que reconstruí-la do
+    JSON; a chave deve conter a versão do snapshot e tudo que muda a figura.
+    """
+    
+    def __init__(self, max_itens=FIGURAS_CACHE_MAX):
+        self.max_itens = max_itens
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+    
+    def obter(self, chave, construir):
+        with self._trava:
+            json_figura = self._itens.get(chave)
+            if json_figura is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+        
+        if json_figura is not None:
+            return pio.from_json(json_figura, skip_invalid=True)
+        
+        figura = construir()
+        json_figura = figura.to_json()
+        with self._trava:
+            self.falhas += 1
+            self._itens[chave] = json_figura
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+        return figura
+    
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'itens': len(self._itens),
+                'bytes': sum(len(j) for j in self._itens.values()),
+                'acertos': self.acertos,
+                'falhas': self.falhas
+            }
+
+@st.cache_resource(show_spinner=False)
+def obter_cache_figuras():
+    return CacheFiguras()
+
+def figura_em_cache(chave, construir):
+    """Figura para a chave; `construir()` só roda quando ela não está no cache"""
+    return obter_cache_figuras().obter(chave, construir)
+
+def criar_figura_pizza(contagens, titulo, cores):
+    """Pizza de uma contagem (value_counts) com percentual e rótulo dentro das fatias"""
+    fig = px.pie(
+        values=contagens.values,
+        names=contagens.index,
+        title=titulo,
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+def ranking_agregado(df_top, formato_grafico="Barras Horizontais"):
+    """Rankings longos viram distribuição: uma barra por usuário deixa de ser legível e pesa no navegador"""
+    return formato_grafico == "Barras Horizontais" and len(df_top) > RANKING_MAX_BARRAS
+
+def criar_figura_distribuicao(valores, titulo, escala_cor, escala_log=True):
+    """Histograma já agregado em faixas: o tamanho da figura não depende do número de usuários"""
+    valores = pd.to_numeric(pd.Series(valores), errors='coerce').dropna().to_numpy(dtype=float)
+    rotulos, contagens = [], []
+    
+    if escala_log:
+        # Métricas de cauda longa (views, curtidas): faixas geométricas, zeros à parte
+        zeros = int((valores <= 0).sum())
+        if zeros:
+            rotulos.append("0")
+            contagens.append(zeros)
+        valores = valores[valores > 0]
+    
+    if valores.size:
+        if escala_log and valores.min() < valores.max():
+            limites = np.geomspace(valores.min(), valores.max(), DISTRIBUICAO_FAIXAS + 1)
+        else:
+            limites = np.histogram_bin_edges(valores, bins=DISTRIBUICAO_FAIXAS)
+        contagem_faixas, limites = np.histogram(valores, bins=limites)
+        limites_formatados = formatar_numeros(limites).tolist()
+        for i, quantidade in enumerate(contagem_faixas):
+            if quantidade:
+                if escala_log:
+                    rotulos.append(f"{limites_formatados[i]}–{limites_formatados[i + 1]}")
+                else:
+                    rotulos.append(f"{limites[i]:.1f}–{limites[i + 1]:.1f}")
+                contagens.append(int(quantidade))
+    
+    # Eixo por posição: rótulos arredondados iguais não fundem barras
+    posicoes = list(range(len(rotulos)))
+    fig = go.Figure(go.Bar(
+        x=posicoes,
+        y=contagens,
+        customdata=rotulos,
+        marker=dict(color=contagens, colorscale=escala_cor),
+        hovertemplate='%{customdata}<br>%{y} usuários<extra></extra>'
+    ))
+    fig.update_xaxes(tickmode='array', tickvals=posicoes, ticktext=rotulos, tickangle=45)
+    fig.update_layout(
+        title=f"{titulo} - Distribuição de {sum(contagens):,} usuários",
+        xaxis_title="Faixa", yaxis_title="Usuários", height=500, showlegend=False
+    )
+    return fig
+
+def criar_figura_lorenz(valores, titulo):
+    """Curva de Lorenz com no máximo LORENZ_PONTOS pontos e índice de Gini no título"""
+    valores = np.sort(pd.to_numeric(pd.Series(valores), errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float))
+    usuarios = np.linspace(0, 1, len(valores) + 1)
+    total = valores.sum()
+    if total > 0:
+        acumulado = np.concatenate(([0.0], np.cumsum(valores) / total))
+    else:
+        acumulado = usuarios.copy()
+    
+    area = ((acumulado[1:] + acumulado[:-1]) / 2 * np.diff(usuarios)).sum()
+    gini = 1 - 2 * area
+    
+    pontos = np.unique(np.linspace(0, len(valores), min(LORENZ_PONTOS, len(valores) + 1)).round().astype(int))
+    fig = go.Figure([
+        go.Scatter(x=usuarios[pontos] * 100, y=acumulado[pontos] * 100, mode='lines', fill='tozeroy',
+                   name='Distribuição real', line=dict(color='#667eea')),
+        go.Scatter(x=[0, 100], y=[0, 100], mode='lines', name='Igualdade', line=dict(color='gray', dash='dash'))
+    ])
+    fig.update_layout(
+        title=f"{titulo} (Gini {gini:.2f})",
+        xaxis_title="% dos usuários (do menor para o maior)", yaxis_title="% acumulado",
+        height=450
+    )
+    return fig
+
+def recortar_tabela_ranking(df_display, chave):
+    """Tabelas muito longas são exibidas em páginas para o payload não crescer com o número de usuários"""
+    if len(df_display) <= RANKING_MAX_LINHAS_TABELA:
+        return df_display
+    
+    total_paginas = (len(df_display) - 1) // RANKING_MAX_LINHAS_TABELA + 1
+    pagina = st.number_input(f"📄 Página da tabela (de {total_paginas}):", min_value=1, max_value=total_paginas, value=1, key=chave)
+    inicio = (pagina - 1) * RANKING_MAX_LINHAS_TABELA
+    fim = min(inicio + RANKING_MAX_LINHAS_TABELA, len(df_display))
+    st.caption(f"Posições {inicio + 1:,} a {fim:,} de {len(df_display):,}")
+    return df_display.iloc[inicio:fim]
+
+def criar_figura_ranking(df_top, coluna, titulo, titulo_top20, escala_cor, formato_grafico="Barras Horizontais",
+                         mostrar_valores=False, altura_maxima=800):
+    """Barras de um ranking: horizontais com todos os usuários ou verticais com o top 20"""
+    if ranking_agregado(df_top, formato_grafico):
+        return criar_figura_distribuicao(df_top[coluna], titulo, escala_cor,
+                                         escala_log=coluna not in ('taxa_engajamento', 'score_performance'))
+    
+    if formato_grafico == "Barras Verticais":
+        fig = px.bar(
+            df_top.head(20),  # Limit to 20 for vertical bars
+            x='discord_username',
+            y=coluna,
+            title=titulo_top20,
+            color=coluna,
+            color_continuous_scale=escala_cor
+        )
+        fig.update_xaxes(tickangle=45)
+        fig.update_layout(height=600, showlegend=False)
+        return fig
+    
+    fig = px.bar(
+        df_top,
+        x=coluna,
+        y='discord_username',
+        orientation='h',
+        title=titulo,
+        color=coluna,
+        color_continuous_scale=escala_cor,
+        text=coluna if mostrar_valores else None
+    )
+    if mostrar_valores:
+        fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+    fig.update_yaxes(categoryorder='total ascending')
+    fig.update_layout(height=max(400, min(len(df_top) * 25, altura_maxima)), showlegend=False)
+    return fig
+
+# ========== CARDS DE VÍDEOS ==========
+# (rótulo, coluna, formato) exibidos em cada card
+CAMPOS_CARD_COMPLETO = [
+    ('👤 Criador', 'discord_username', 'texto'),
+    ('📱 Plataforma', 'platform', 'texto'),
+    ('👁️ Views', 'views', 'numero'),
+    ('❤️ Curtidas', 'likes', 'numero')
+]
+
+# Prefixo e sufixo em volta da URL do vídeo, por estilo de link
+ESTILOS_LINK_CARD = {
+    'azul': ('<div style="background: linear-gradient(135deg, #007bff, #0056b3); padding: 1rem; border-radius: 8px; '
+             'margin: 0.5rem 0; text-align: center;"><a href="',
+             '" target="_blank" style="color: white; text-decoration: none; font-weight: bold;">🔗 ASSISTIR VÍDEO</a></div>'),
+    'verde': ('<div style="background: linear-gradient(135deg, #28a745, #20c997); padding: 1.5rem; border-radius: 10px; '
+              'margin: 1rem 0; text-align: center;"><a href="',
+              '" target="_blank" style="color: white; text-decoration: none; font-weight: bold; font-size: 1.1em;">🔗 ASSISTIR VÍDEO AGORA</a></div>'),
+    'roxo': ('<div style="background: linear-gradient(135deg, #6f42c1, #5a2d91); padding: 1rem; border-radius: 8px; '
+             'margin: 0.5rem 0; text-align: center;"><a href="',
+             '" target="_blank" style="color: white; text-decoration: none; font-weight: bold;">🔗 VER VÍDEO</a></div>'),
+    'texto': ('<p>🔗 <strong><a href="', '" target="_blank">Ver Vídeo Original</a></strong></p>')
+}
+
+def _coluna_card(videos, coluna, formato):
+    """Valores de uma coluna já formatados para o HTML dos cards"""
+    if coluna not in videos.columns:
+        return pd.Series('0' if formato == 'numero' else 'N/A', index=videos.index)
+    if formato == 'numero':
+        return formatar_numeros(videos[coluna])
+    if formato == 'percentual':
+        return pd.to_numeric(videos[coluna], errors='coerce').fillna(0).map('{:.2f}%'.format)
+    return videos[coluna].astype(object).fillna('N/A').astype(str).map(html.escape)
+
+def renderizar_cards_videos(videos, campos, estilo_link='texto', limite_titulo=80):
+    """Monta o HTML de todos os cards de uma lista de vídeos e envia como um único elemento"""
+    if videos.empty:
+        return
+    
+    titulos = videos['title'] if 'title' in videos.columns else pd.Series('Sem título', index=videos.index)
+    titulos = titulos.astype(object).fillna('Sem título').astype(str)
+    if limite_titulo:
+        titulos = titulos.str.slice(0, limite_titulo) + '...'
+    posicoes = pd.Series(range(1, len(videos) + 1), index=videos.index).astype(str)
+    
+    cards = '<div class="video-card"><h4>#' + posicoes + ' - ' + titulos.map(html.escape) + '</h4>'
+    for rotulo, coluna, formato in campos:
+        # Percentuais só aparecem quando a coluna existe
+        if formato == 'percentual' and coluna not in videos.columns:
+            continue
+        cards = cards + f'<p><strong>{rotulo}:</strong> ' + _coluna_card(videos, coluna, formato) + '</p>'
+    cards = cards + '</div>'
+    
+    if estilo_link and 'url' in videos.columns:
+        urls = videos['url'].astype(object).fillna('').astype(str)
+        prefixo, sufixo = ESTILOS_LINK_CARD[estilo_link]
+        links = prefixo + urls.map(lambda url: html.escape(url, quote=True)) + sufixo
+        cards = cards + links.where(urls != '', '')
+    
+    st.markdown(''.join(cards + '<hr>'), unsafe_allow_html=True)
+
 # ========== PÁGINAS AVANÇADAS ==========
+@medir_desempenho()
 def pagina_dashboard_executivo(df_usuarios):
     """Dashboard executivo com visão geral completa"""
     st.markdown('<div class="main-header"><h1>📊 Dashboard Executivo Completo</h1><p>Visão Geral de TODOS os Usuários</p></div>', unsafe_allow_html=True)
@@ -1851,30 +3798,28 @@ def pagina_dashboard_executivo(df_usuarios):
     
     with col1:
         # Status dos usuários
-        status_counts = df_usuarios['status_usuario'].value_counts()
-        
-        fig_status = px.pie(
-            values=status_counts.values,
-            names=status_counts.index,
-            title="📊 Distribuição por Status de Atividade",
-            color_discrete_sequence=['#28a745', '#ffc107', '#fd7e14', '#dc3545']
+        fig_status = figura_em_cache(
+            (versao_snapshot(df_usuarios), 'executivo.status'),
+            lambda: criar_figura_pizza(
+                df_usuarios['status_usuario'].value_counts(),
+                "📊 Distribuição por Status de Atividade",
+                ['#28a745', '#ffc107', '#fd7e14', '#dc3545']
+            )
         )
-        fig_status.update_traces(textposition='inside', textinfo='percent+label')
         st.plotly_chart(fig_status, use_container_width=True)
     
     with col2:
         # Distribuição por categoria (só usuários ativos)
         usuarios_ativos_df = df_usuarios[df_usuarios['total_views'] > 0]
         if not usuarios_ativos_df.empty:
-            dist_categoria = usuarios_ativos_df['categoria_performance'].value_counts()
-            
-            fig_cat = px.pie(
-                values=dist_categoria.values,
-                names=dist_categoria.index,
-                title="🏆 Distribuição por Performance (Usuários Ativos)",
-                color_discrete_sequence=['#ffd700', '#c0c0c0', '#cd7f32', '#4caf50', '#ff9800']
+            fig_cat = figura_em_cache(
+                (versao_snapshot(df_usuarios), 'executivo.categoria'),
+                lambda: criar_figura_pizza(
+                    usuarios_ativos_df['categoria_performance'].value_counts(),
+                    "🏆 Distribuição por Performance (Usuários Ativos)",
+                    ['#ffd700', '#c0c0c0', '#cd7f32', '#4caf50', '#ff9800']
+                )
             )
-            fig_cat.update_traces(textposition='inside', textinfo='percent+label')
             st.plotly_chart(fig_cat, use_container_width=True)
         else:
             st.info("📊 Nenhum usuário ativo para análise de performance")
@@ -1889,6 +3834,7 @@ def pagina_dashboard_executivo(df_usuarios):
         st.info("📊 Nenhum usuário ativo encontrado para rankings")
     else:
         # Preparar dados dos rankings
+        diff_ranks = obter_diff_ranks(df_usuarios)
         top_performance = usuarios_ativos_df.nlargest(5, 'score_performance')
         top_views = usuarios_ativos_df.nlargest(5, 'total_views')
         top_videos = usuarios_ativos_df.nlargest(5, 'total_videos')
@@ -1904,28 +3850,28 @@ def pagina_dashboard_executivo(df_usuarios):
                 "🏆 Top Performance", 
                 "Score baseado em métricas reais",
                 "linear-gradient(135deg, #ffd700, #ffed4e)",
-                top_performance, 'score_performance', 'categoria_performance', "📊"
+                top_performance, 'score_performance', 'categoria_performance', "📊", diff_ranks
             )
             
             criar_ranking_card(
                 "👁️ Campeões de Views", 
                 "Maior alcance total",
                 "linear-gradient(135deg, #007bff, #66b3ff)",
-                top_views, 'total_views', 'total_videos', "👁️"
+                top_views, 'total_views', 'total_videos', "👁️", diff_ranks
             )
             
             criar_ranking_card(
                 "🎥 Reis da Produção", 
                 "Mais conteúdo criado",
                 "linear-gradient(135deg, #28a745, #6fbf73)",
-                top_videos, 'total_videos', 'media_views_por_video', "🎬"
+                top_videos, 'total_videos', 'media_views_por_video', "🎬", diff_ranks
             )
             
             criar_ranking_card(
                 "❤️ Mais Amados", 
                 "Maior engajamento total",
                 "linear-gradient(135deg, #dc3545, #ff6b7a)",
-                top_likes, 'total_likes', 'taxa_engajamento', "❤️"
+                top_likes, 'total_likes', 'taxa_engajamento', "❤️", diff_ranks
             )
         else:
             # Layout desktop: 4 colunas
@@ -1936,7 +3882,7 @@ def pagina_dashboard_executivo(df_usuarios):
                     "🏆 Top Performance", 
                     "Score baseado em métricas reais",
                     "linear-gradient(135deg, #ffd700, #ffed4e)",
-                    top_performance, 'score_performance', 'categoria_performance', "📊"
+                    top_performance, 'score_performance', 'categoria_performance', "📊", diff_ranks
                 )
             
             with col2:
@@ -1944,7 +3890,7 @@ def pagina_dashboard_executivo(df_usuarios):
                     "👁️ Campeões de Views", 
                     "Maior alcance total",
                     "linear-gradient(135deg, #007bff, #66b3ff)",
-                    top_views, 'total_views', 'total_videos', "👁️"
+                    top_views, 'total_views', 'total_videos', "👁️", diff_ranks
                 )
             
             with col3:
@@ -1952,7 +3898,7 @@ def pagina_dashboard_executivo(df_usuarios):
                     "🎥 Reis da Produção", 
                     "Mais conteúdo criado",
                     "linear-gradient(135deg, #28a745, #6fbf73)",
-                    top_videos, 'total_videos', 'media_views_por_video', "🎬"
+                    top_videos, 'total_videos', 'media_views_por_video', "🎬", diff_ranks
                 )
             
             with col4:
@@ -1960,7 +3906,7 @@ def pagina_dashboard_executivo(df_usuarios):
                     "❤️ Mais Amados", 
                     "Maior engajamento total",
                     "linear-gradient(135deg, #dc3545, #ff6b7a)",
-                    top_likes, 'total_likes', 'taxa_engajamento', "❤️"
+                    top_likes, 'total_likes', 'taxa_engajamento', "❤️", diff_ranks
                 )
     
     # Estatísticas comparativas dos rankings
@@ -2095,6 +4041,7 @@ def pagina_dashboard_executivo(df_usuarios):
     else:
         st.success("🎉 Todos os usuários têm atividade!")
 
+@medir_desempenho()
 def pagina_rankings_completos(df_usuarios):
     """Rankings completos com controle de visualização"""
     st.markdown('<div class="main-header"><h1>🏆 Rankings Completos</h1><p>Controle Total sobre Visualizações</p></div>', unsafe_allow_html=True)
@@ -2103,6 +4050,14 @@ def pagina_rankings_completos(df_usuarios):
         st.warning("⚠️ Nenhum dado disponível")
         return
     
+    secao_rankings(df_usuarios)
+
+@fragmento
+@medir_desempenho()
+def secao_rankings(df_usuarios):
+    """Controles e abas dos rankings (reexecuta sem recarregar a página)"""
+    versao = versao_snapshot(df_usuarios)
+    
     # Controles avançados
     st.subheader("🎛️ Controles de Visualização")
     col1, col2, col3, col4 = st.columns(4)
@@ -2131,11 +4086,15 @@ def pagina_rankings_completos(df_usuarios):
         formato_grafico = st.selectbox("📊 Tipo de gráfico:", ["Barras Horizontais", "Barras Verticais", "Apenas Tabela"])
     
     # Filtrar dados baseado na seleção
+    with medir_bloco("rankings.filtro", linhas=len(df_usuarios)):
+        if incluir_inativos:
+            df_trabalho = df_usuarios.copy()
+        else:
+            df_trabalho = df_usuarios[df_usuarios['total_views'] > 0].copy()
+    
     if incluir_inativos:
-        df_trabalho = df_usuarios.copy()
         st.info(f"📊 Mostrando dados de {len(df_trabalho)} usuários (incluindo {len(df_usuarios[df_usuarios['total_views'] == 0])} inativos)")
     else:
-        df_trabalho = df_usuarios[df_usuarios['total_views'] > 0].copy()
         inativos_ocultos = len(df_usuarios) - len(df_trabalho)
         if inativos_ocultos > 0:
             st.info(f"📊 Mostrando apenas usuários ativos. {inativos_ocultos} usuários inativos ocultos.")
@@ -2144,12 +4103,33 @@ def pagina_rankings_completos(df_usuarios):
         st.warning("⚠️ Nenhum usuário encontrado com os filtros aplicados")
         return
     
+    diff_ranks = obter_diff_ranks(df_usuarios)
+    if diff_ranks is not None:
+        with st.expander("🔄 Movimentação desde a última atualização dos dados"):
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("↑ Subiram (views)", int((diff_ranks['delta_rank_views'] > 0).sum()))
+            with col2:
+                st.metric("↓ Caíram (views)", int((diff_ranks['delta_rank_views'] < 0).sum()))
+            with col3:
+                st.metric("🆕 Entraram", int(diff_ranks['novo_rank_views'].sum()))
+            with col4:
+                st.metric("🚪 Saíram", int(diff_ranks['saiu_rank_views'].sum()))
+            
+            maiores = diff_ranks[diff_ranks['delta_rank_views'] != 0]['delta_rank_views']
+            if not maiores.empty:
+                nomes = df_usuarios.assign(user_id=df_usuarios['user_id'].astype(str)).drop_duplicates('user_id').set_index('user_id')['discord_username']
+                subidas = maiores.nlargest(5)
+                st.markdown("**Maiores subidas:** " + " • ".join(
+                    f"{nomes.get(uid, uid)} ↑{delta}" for uid, delta in subidas[subidas > 0].items()
+                ))
+    
     st.divider()
     
     # Abas dos rankings
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "👁️ Mais Views", "❤️ Mais Curtidas", "📈 Melhor Engajamento", 
-        "🏆 Score Performance", "📱 Por Plataforma"
+        "🏆 Score Performance", "📱 Por Plataforma", "🚀 Maiores Altas"
     ])
     
     with tab1:
@@ -2157,37 +4137,29 @@ def pagina_rankings_completos(df_usuarios):
         top_views = df_trabalho.nlargest(top_n, 'total_views')
         
         if mostrar_graficos and formato_grafico != "Apenas Tabela":
-            if formato_grafico == "Barras Horizontais":
-                fig = px.bar(
-                    top_views,
-                    x='total_views',
-                    y='discord_username',
-                    orientation='h',
-                    title=f"Ranking por Visualizações",
-                    color='total_views',
-                    color_continuous_scale='Blues',
-                    text='total_views'
-                )
-                fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=max(400, min(len(top_views) * 25, 800)), showlegend=False)
-            else:  # Barras Verticais
-                fig = px.bar(
-                    top_views.head(20),  # Limit to 20 for vertical bars
-                    x='discord_username',
-                    y='total_views',
-                    title=f"Top 20 - Visualizações",
-                    color='total_views',
-                    color_continuous_scale='Blues'
+            with medir_bloco("rankings.views.figura", linhas=len(top_views)):
+                fig = figura_em_cache(
+                    (versao, 'rankings.views', top_n, formato_grafico, incluir_inativos),
+                    lambda: criar_figura_ranking(top_views, 'total_views', "Ranking por Visualizações", "Top 20 - Visualizações",
+                                                 'Blues', formato_grafico, mostrar_valores=True)
                 )
-                fig.update_xaxes(tickangle=45)
-                fig.update_layout(height=600, showlegend=False)
             
-            st.plotly_chart(fig, use_container_width=True)
+            with medir_bloco("rankings.views.plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
+            
+            if ranking_agregado(top_views, formato_grafico):
+                st.caption(f"📊 Com mais de {RANKING_MAX_BARRAS} usuários o gráfico mostra a distribuição; o ranking completo está na tabela abaixo.")
+                fig_lorenz = figura_em_cache(
+                    (versao, 'rankings.views.lorenz', top_n, incluir_inativos),
+                    lambda: criar_figura_lorenz(top_views['total_views'], "Concentração de Views")
+                )
+                st.plotly_chart(fig_lorenz, use_container_width=True)
         
         # Tabela detalhada
         df_display = top_views[['discord_username', 'total_views', 'total_videos', 'media_views_por_video', 'status_usuario']].copy()
         
+        df_display['movimento'] = rotulos_movimento(diff_ranks, top_views, 'rank_views')
+        
         # Adicionar indicadores visuais para usuários inativos
         if incluir_inativos:
             df_display['indicador'] = df_display.apply(
@@ -2196,20 +4168,24 @@ def pagina_rankings_completos(df_usuarios):
             colunas_ordem = ['indicador', 'discord_username', 'total_views', 'total_videos', 'media_views_por_video', 'status_usuario']
         else:
             colunas_ordem = ['discord_username', 'total_views', 'total_videos', 'media_views_por_video', 'status_usuario']
+        if diff_ranks is not None:
+            colunas_ordem.insert(colunas_ordem.index('discord_username'), 'movimento')
         
-        st.dataframe(
-            df_display[colunas_ordem],
-            column_config={
-                "indicador": "🚦 Status",
-                "discord_username": "👤 Usuário",
-                "total_views": st.column_config.NumberColumn("👁️ Views Totais", format="%d"),
-                "total_videos": "🎥 Vídeos",
-                "media_views_por_video": st.column_config.NumberColumn("📊 Média/Vídeo", format="%.0f"),
-                "status_usuario": "📊 Status"
-            },
-            hide_index=True,
-            use_container_width=True
-        )
+        with medir_bloco("rankings.views.tabela", linhas=len(df_display)):
+            st.dataframe(
+                recortar_tabela_ranking(df_display[colunas_ordem], 'tabela_ranking_views'),
+                column_config={
+                    "indicador": "🚦 Status",
+                    "movimento": "🔄 Posição",
+                    "discord_username": "👤 Usuário",
+                    "total_views": st.column_config.NumberColumn("👁️ Views Totais", format="%d"),
+                    "total_videos": "🎥 Vídeos",
+                    "media_views_por_video": st.column_config.NumberColumn("📊 Média/Vídeo", format="%.0f"),
+                    "status_usuario": "📊 Status"
+                },
+                hide_index=True,
+                use_container_width=True
+            )
         
         # Estatísticas adicionais
         st.markdown("#### 📈 Estatísticas do Ranking")
@@ -2229,45 +4205,30 @@ def pagina_rankings_completos(df_usuarios):
         top_likes = df_trabalho.nlargest(top_n, 'total_likes')
         
         if mostrar_graficos and formato_grafico != "Apenas Tabela":
-            if formato_grafico == "Barras Horizontais":
-                fig = px.bar(
-                    top_likes,
-                    x='total_likes',
-                    y='discord_username',
-                    orientation='h',
-                    title=f"Ranking por Curtidas",
-                    color='total_likes',
-                    color_continuous_scale='Reds'
-                )
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=max(400, min(len(top_likes) * 25, 800)), showlegend=False)
-            else:
-                fig = px.bar(
-                    top_likes.head(20),
-                    x='discord_username',
-                    y='total_likes',
-                    title=f"Top 20 - Curtidas",
-                    color='total_likes',
-                    color_continuous_scale='Reds'
+            with medir_bloco("rankings.likes.figura", linhas=len(top_likes)):
+                fig = figura_em_cache(
+                    (versao, 'rankings.likes', top_n, formato_grafico, incluir_inativos),
+                    lambda: criar_figura_ranking(top_likes, 'total_likes', "Ranking por Curtidas", "Top 20 - Curtidas",
+                                                 'Reds', formato_grafico)
                 )
-                fig.update_xaxes(tickangle=45)
-                fig.update_layout(height=600, showlegend=False)
             
-            st.plotly_chart(fig, use_container_width=True)
+            with medir_bloco("rankings.likes.plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
         
         df_display = top_likes[['discord_username', 'total_likes', 'total_views', 'media_likes_por_video', 'taxa_engajamento']].copy()
-        st.dataframe(
-            df_display,
-            column_config={
-                "discord_username": "👤 Usuário",
-                "total_likes": st.column_config.NumberColumn("❤️ Curtidas", format="%d"),
-                "total_views": st.column_config.NumberColumn("👁️ Views", format="%d"),
-                "media_likes_por_video": st.column_config.NumberColumn("💖 Média/Vídeo", format="%.0f"),
-                "taxa_engajamento": st.column_config.NumberColumn("📈 Engajamento %", format="%.2f")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
+        with medir_bloco("rankings.likes.tabela", linhas=len(df_display)):
+            st.dataframe(
+                recortar_tabela_ranking(df_display, 'tabela_ranking_likes'),
+                column_config={
+                    "discord_username": "👤 Usuário",
+                    "total_likes": st.column_config.NumberColumn("❤️ Curtidas", format="%d"),
+                    "total_views": st.column_config.NumberColumn("👁️ Views", format="%d"),
+                    "media_likes_por_video": st.column_config.NumberColumn("💖 Média/Vídeo", format="%.0f"),
+                    "taxa_engajamento": st.column_config.NumberColumn("📈 Engajamento %", format="%.2f")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
     
     with tab3:
         st.subheader(f"📈 Ranking por Engajamento")
@@ -2281,94 +4242,67 @@ def pagina_rankings_completos(df_usuarios):
             top_engagement = df_engajamento.nlargest(min(top_n, len(df_engajamento)), 'taxa_engajamento')
             
             if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                if formato_grafico == "Barras Horizontais":
-                    fig = px.bar(
-                        top_engagement,
-                        x='taxa_engajamento',
-                        y='discord_username',
-                        orientation='h',
-                        title=f"Ranking por Taxa de Engajamento",
-                        color='taxa_engajamento',
-                        color_continuous_scale='Viridis'
-                    )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_engagement) * 25, 800)), showlegend=False)
-                else:
-                    fig = px.bar(
-                        top_engagement.head(20),
-                        x='discord_username',
-                        y='taxa_engajamento',
-                        title=f"Top 20 - Engajamento",
-                        color='taxa_engajamento',
-                        color_continuous_scale='Viridis'
+                with medir_bloco("rankings.engajamento.figura", linhas=len(top_engagement)):
+                    fig = figura_em_cache(
+                        (versao, 'rankings.engajamento', top_n, formato_grafico, incluir_inativos),
+                        lambda: criar_figura_ranking(top_engagement, 'taxa_engajamento', "Ranking por Taxa de Engajamento", "Top 20 - Engajamento",
+                                                     'Viridis', formato_grafico)
                     )
-                    fig.update_xaxes(tickangle=45)
-                    fig.update_layout(height=600, showlegend=False)
                 
-                st.plotly_chart(fig, use_container_width=True)
+                with medir_bloco("rankings.engajamento.plotly_chart"):
+                    st.plotly_chart(fig, use_container_width=True)
             
             df_display = top_engagement[['discord_username', 'taxa_engajamento', 'total_views', 'total_interactions', 'consistencia']].copy()
-            st.dataframe(
-                df_display,
-                column_config={
-                    "discord_username": "👤 Usuário",
-                    "taxa_engajamento": st.column_config.NumberColumn("📈 Taxa %", format="%.2f"),
-                    "total_views": st.column_config.NumberColumn("👁️ Views", format="%d"),
-                    "total_interactions": st.column_config.NumberColumn("💬 Interações", format="%d"),
-                    "consistencia": "🎯 Consistência"
-                },
-                hide_index=True,
-                use_container_width=True
-            )
+            with medir_bloco("rankings.engajamento.tabela", linhas=len(df_display)):
+                st.dataframe(
+                    recortar_tabela_ranking(df_display, 'tabela_ranking_engajamento'),
+                    column_config={
+                        "discord_username": "👤 Usuário",
+                        "taxa_engajamento": st.column_config.NumberColumn("📈 Taxa %", format="%.2f"),
+                        "total_views": st.column_config.NumberColumn("👁️ Views", format="%d"),
+                        "total_interactions": st.column_config.NumberColumn("💬 Interações", format="%d"),
+                        "consistencia": "🎯 Consistência"
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
     
     with tab4:
         st.subheader(f"🏆 Ranking por Score de Performance")
         top_score = df_trabalho.nlargest(top_n, 'score_performance')
         
         if mostrar_graficos and formato_grafico != "Apenas Tabela":
-            if formato_grafico == "Barras Horizontais":
-                fig = px.bar(
-                    top_score,
-                    x='score_performance',
-                    y='discord_username',
-                    orientation='h',
-                    title=f"Ranking por Score de Performance",
-                    color='score_performance',
-                    color_continuous_scale='RdYlGn'
+            with medir_bloco("rankings.score.figura", linhas=len(top_score)):
+                fig = figura_em_cache(
+                    (versao, 'rankings.score', top_n, formato_grafico, incluir_inativos),
+                    lambda: criar_figura_ranking(top_score, 'score_performance', "Ranking por Score de Performance", "Top 20 - Performance",
+                                                 'RdYlGn', formato_grafico)
                 )
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=max(400, min(len(top_score) * 25, 800)), showlegend=False)
-            else:
-                fig = px.bar(
-                    top_score.head(20),
-                    x='discord_username',
-                    y='score_performance',
-                    title=f"Top 20 - Performance",
-                    color='score_performance',
-                    color_continuous_scale='RdYlGn'
-                )
-                fig.update_xaxes(tickangle=45)
-                fig.update_layout(height=600, showlegend=False)
             
-            st.plotly_chart(fig, use_container_width=True)
+            with medir_bloco("rankings.score.plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
         
         df_display = top_score[['discord_username', 'score_performance', 'categoria_performance', 'plataforma_principal', 'taxa_engajamento']].copy()
         
         # Formatar plataforma principal
         df_display['plataforma_principal'] = df_display['plataforma_principal'].fillna('Geral').str.title()
+        if diff_ranks is not None:
+            df_display.insert(0, 'movimento', rotulos_movimento(diff_ranks, top_score, 'rank_performance'))
         
-        st.dataframe(
-            df_display,
-            column_config={
-                "discord_username": "👤 Usuário",
-                "score_performance": st.column_config.NumberColumn("🏆 Score", format="%.1f"),
-                "categoria_performance": "📊 Categoria", 
-                "plataforma_principal": "📱 Plataforma Principal",
-                "taxa_engajamento": st.column_config.NumberColumn("📈 Engajamento %", format="%.2f")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
+        with medir_bloco("rankings.score.tabela", linhas=len(df_display)):
+            st.dataframe(
+                recortar_tabela_ranking(df_display, 'tabela_ranking_score'),
+                column_config={
+                    "movimento": "🔄 Posição",
+                    "discord_username": "👤 Usuário",
+                    "score_performance": st.column_config.NumberColumn("🏆 Score", format="%.1f"),
+                    "categoria_performance": "📊 Categoria", 
+                    "plataforma_principal": "📱 Plataforma Principal",
+                    "taxa_engajamento": st.column_config.NumberColumn("📈 Engajamento %", format="%.2f")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
     
     with tab5:
         st.subheader("📱 Rankings por Plataforma")
@@ -2381,21 +4315,15 @@ def pagina_rankings_completos(df_usuarios):
                 top_tiktok = tiktok_users.nlargest(min(top_n, len(tiktok_users)), 'tiktok_views')
                 
                 if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                    fig = px.bar(
-                        top_tiktok,
-                        x='tiktok_views',
-                        y='discord_username',
-                        orientation='h',
-                        title="Ranking TikTok - Views",
-                        color='tiktok_views',
-                        color_continuous_scale='Blues'
+                    fig = figura_em_cache(
+                        (versao, 'rankings.tiktok', top_n, incluir_inativos),
+                        lambda: criar_figura_ranking(top_tiktok, 'tiktok_views', "Ranking TikTok - Views", None,
+                                                     'Blues', altura_maxima=600)
                     )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_tiktok) * 25, 600)), showlegend=False)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 st.dataframe(
-                    top_tiktok[['discord_username', 'tiktok_views', 'tiktok_videos']],
+                    recortar_tabela_ranking(top_tiktok[['discord_username', 'tiktok_views', 'tiktok_videos']], 'tabela_ranking_tiktok'),
                     column_config={
                         "discord_username": "👤 Usuário",
                         "tiktok_views": st.column_config.NumberColumn("🎵 TikTok Views", format="%d"),
@@ -2413,21 +4341,15 @@ def pagina_rankings_completos(df_usuarios):
                 top_youtube = youtube_users.nlargest(min(top_n, len(youtube_users)), 'youtube_views')
                 
                 if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                    fig = px.bar(
-                        top_youtube,
-                        x='youtube_views',
-                        y='discord_username',
-                        orientation='h',
-                        title="Ranking YouTube - Views",
-                        color='youtube_views',
-                        color_continuous_scale='Reds'
+                    fig = figura_em_cache(
+                        (versao, 'rankings.youtube', top_n, incluir_inativos),
+                        lambda: criar_figura_ranking(top_youtube, 'youtube_views', "Ranking YouTube - Views", None,
+                                                     'Reds', altura_maxima=600)
                     )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_youtube) * 25, 600)), showlegend=False)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 st.dataframe(
-                    top_youtube[['discord_username', 'youtube_views', 'youtube_videos']],
+                    recortar_tabela_ranking(top_youtube[['discord_username', 'youtube_views', 'youtube_videos']], 'tabela_ranking_youtube'),
                     column_config={
                         "discord_username": "👤 Usuário",
                         "youtube_views": st.column_config.NumberColumn("📺 YouTube Views", format="%d"),
@@ -2445,21 +4367,15 @@ def pagina_rankings_completos(df_usuarios):
                 top_instagram = instagram_users.nlargest(min(top_n, len(instagram_users)), 'instagram_views')
                 
                 if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                    fig = px.bar(
-                        top_instagram,
-                        x='instagram_views',
-                        y='discord_username',
-                        orientation='h',
-                        title="Ranking Instagram - Views",
-                        color='instagram_views',
-                        color_continuous_scale='Purples'
+                    fig = figura_em_cache(
+                        (versao, 'rankings.instagram', top_n, incluir_inativos),
+                        lambda: criar_figura_ranking(top_instagram, 'instagram_views', "Ranking Instagram - Views", None,
+                                                     'Purples', altura_maxima=600)
                     )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_instagram) * 25, 600)), showlegend=False)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 st.dataframe(
-                    top_instagram[['discord_username', 'instagram_views', 'instagram_videos']],
+                    recortar_tabela_ranking(top_instagram[['discord_username', 'instagram_views', 'instagram_videos']], 'tabela_ranking_instagram'),
                     column_config={
                         "discord_username": "👤 Usuário",
                         "instagram_views": st.column_config.NumberColumn("📸 Instagram Views", format="%d"),
@@ -2470,7 +4386,93 @@ def pagina_rankings_completos(df_usuarios):
                 )
             else:
                 st.info("📊 Nenhum dado do Instagram encontrado")
+    
+    with tab6:
+        secao_maiores_altas(df_usuarios, top_n)
+
+PERIODOS_ALTAS = {"Últimas 24 horas": 1, "Últimos 7 dias": 7, "Últimos 30 dias": 30}
+ROTULOS_METRICAS_HISTORICO = {'total_views': "👁️ Views", 'total_likes': "❤️ Curtidas", 'total_videos': "🎥 Vídeos"}
+
+def secao_maiores_altas(df_usuarios, top_n):
+    """Ranking de quem mais cresceu no período, a partir do histórico de capturas"""
+    st.subheader("🚀 Maiores Altas do Período")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        periodo = st.selectbox("📅 Período:", list(PERIODOS_ALTAS), index=1, key="periodo_maiores_altas")
+    with col2:
+        metrica = st.selectbox("📊 Métrica:", list(ROTULOS_METRICAS_HISTORICO), format_func=ROTULOS_METRICAS_HISTORICO.get,
+                               key="metrica_maiores_altas")
+    
+    # Início do período arredondado para a hora: a consulta fica em cache entre reruns
+    desde = int(time.time() // 3600 * 3600) - PERIODOS_ALTAS[periodo] * 86400
+    altas = carregar_maiores_altas(metrica, desde, top_n)
+    
+    if altas.empty:
+        st.info("ℹ️ Ainda não há crescimento registrado neste período. O histórico é gravado a cada atualização dos dados.")
+        return
+    
+    nomes = df_usuarios.assign(user_id=df_usuarios['user_id'].astype(str)).drop_duplicates('user_id').set_index('user_id')['discord_username']
+    altas['discord_username'] = altas['user_id'].map(nomes).fillna(altas['user_id'])
+    rotulo = ROTULOS_METRICAS_HISTORICO[metrica]
+    
+    fig = px.bar(
+        altas.head(20),
+        x='crescimento',
+        y='discord_username',
+        orientation='h',
+        title=f"Top 20 - Crescimento em {rotulo} ({periodo.lower()})",
+        color='crescimento',
+        color_continuous_scale='Greens'
+    )
+    fig.update_yaxes(categoryorder='total ascending')
+    fig.update_layout(height=max(400, min(len(altas.head(20)) * 25, 600)), showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(
+        altas[['discord_username', 'crescimento', 'capturas']],
+        column_config={
+            "discord_username": "👤 Usuário",
+            "crescimento": st.column_config.NumberColumn(f"🚀 {rotulo} ganhos", format="%d"),
+            "capturas": "🔄 Atualizações"
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+def secao_crescimento_usuario(dados_usuario):
+    """Evolução das métricas do usuário a partir do histórico de capturas"""
+    st.subheader("📈 Crescimento ao Longo do Tempo")
+    
+    historico = carregar_historico_usuario(dados_usuario['user_id'])
+    if len(historico) < 2:
+        st.info("ℹ️ Histórico ainda insuficiente: o crescimento aparece depois de algumas atualizações dos dados.")
+        return
+    
+    agora = time.time()
+    ganhos = historico[historico['base'] == 0]
+    dias_acompanhados = max((historico['capturado_em'].iloc[-1] - historico['capturado_em'].iloc[0]) / 86400, 1 / 24)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("👁️ Views (24h)", formatar_numero(ganhos.loc[ganhos['capturado_em'] >= agora - 86400, 'total_views'].sum()))
+    with col2:
+        st.metric("👁️ Views (7 dias)", formatar_numero(ganhos.loc[ganhos['capturado_em'] >= agora - 7 * 86400, 'total_views'].sum()))
+    with col3:
+        st.metric("⚡ Velocidade", f"{formatar_numero(ganhos['total_views'].sum() / dias_acompanhados)}/dia")
+    
+    fig = px.line(
+        historico,
+        x='data',
+        y=['acumulado_total_views', 'acumulado_total_likes'],
+        title="Evolução de Views e Curtidas",
+        markers=True,
+        labels={'data': 'Data', 'value': 'Total', 'variable': 'Métrica'}
+    )
+    fig.for_each_trace(lambda trace: trace.update(name={'acumulado_total_views': 'Views', 'acumulado_total_likes': 'Curtidas'}[trace.name]))
+    st.plotly_chart(fig, use_container_width=True)
 
+@medir_desempenho()
 def pagina_analise_usuario_avancada(df_usuarios):
     """Análise avançada individual do usuário"""
     st.markdown('<div class="main-header"><h1>👤 Análise Individual Completa</h1><p>Insights Detalhados para Qualquer Usuário</p></div>', unsafe_allow_html=True)
@@ -2481,21 +4483,31 @@ def pagina_analise_usuario_avancada(df_usuarios):
     
     # Seleção do usuário com busca
     st.subheader("🔍 Seleção de Usuário")
-    usuarios = sorted(df_usuarios['discord_username'].tolist())
+    indice_nomes = obter_indice_nomes_usuarios(df_usuarios)
+    coorte = obter_estatisticas_coorte(df_usuarios)
     
     col1, col2 = st.columns([3, 1])
     with col1:
-        usuario_selecionado = st.selectbox("👤 Escolha o usuário para análise:", usuarios)
+        # Só as melhores sugestões vão para o navegador, não a lista inteira de usuários
+        termo_usuario = st.text_input("🔎 Buscar usuário:", placeholder="Digite parte do nome do Discord...", key="busca_usuario_analise")
+        sugestoes = indice_nomes.sugerir(termo_usuario)
+        
+        rotulo_usuario = None
+        if sugestoes:
+            rotulo_usuario = st.selectbox("👤 Escolha o usuário para análise:", sugestoes, format_func=indice_nomes.nome)
+            if len(sugestoes) >= USUARIOS_SUGESTOES_MAX:
+                st.caption(f"Mostrando {len(sugestoes)} de {len(indice_nomes):,} usuários. Digite para refinar a busca.")
+        else:
+            st.warning(f"⚠️ Nenhum usuário encontrado para '{termo_usuario}'")
+        usuario_selecionado = indice_nomes.nome(rotulo_usuario)
     
     with col2:
         # Mostrar estatísticas de seleção
-        total_usuarios = len(usuarios)
-        usuarios_ativos = len(df_usuarios[df_usuarios['total_views'] > 0])
-        st.metric("📊 Total de Usuários", f"{total_usuarios}")
-        st.metric("🟢 Usuários Ativos", f"{usuarios_ativos}")
+        st.metric("📊 Total de Usuários", f"{coorte.total_usuarios}")
+        st.metric("🟢 Usuários Ativos", f"{coorte.total_ativos}")
     
-    if usuario_selecionado:
-        dados_usuario = df_usuarios[df_usuarios['discord_username'] == usuario_selecionado].iloc[0]
+    if rotulo_usuario is not None:
+        dados_usuario = df_usuarios.loc[rotulo_usuario]
         
         # Verificar se é usuário ativo ou inativo
         eh_inativo = dados_usuario['total_views'] == 0
@@ -2627,19 +4639,20 @@ def pagina_analise_usuario_avancada(df_usuarios):
             
             # Estatísticas gerais para contexto
             st.subheader("📊 Contexto Geral da Plataforma")
-            usuarios_ativos = df_usuarios[df_usuarios['total_views'] > 0]
             
-            if not usuarios_ativos.empty:
+            if coorte.total_ativos:
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("📊 Média de Views", formatar_numero(usuarios_ativos['total_views'].mean()))
+                    st.metric("📊 Média de Views", formatar_numero(coorte.media('total_views')),
+                              help=f"Mediana: {formatar_numero(coorte.mediana('total_views'))}")
                 with col2:
-                    st.metric("🎥 Média de Vídeos", f"{usuarios_ativos['total_videos'].mean():.0f}")
+                    st.metric("🎥 Média de Vídeos", f"{coorte.media('total_videos'):.0f}",
+                              help=f"Mediana: {coorte.mediana('total_videos'):.0f}")
                 with col3:
-                    st.metric("📈 Engajamento Médio", f"{usuarios_ativos['taxa_engajamento'].mean():.1f}%")
+                    st.metric("📈 Engajamento Médio", f"{coorte.media('taxa_engajamento'):.1f}%")
                 with col4:
-                    st.metric("🏆 Score Médio", f"{usuarios_ativos['score_performance'].mean():.1f}")
+                    st.metric("🏆 Score Médio", f"{coorte.media('score_performance'):.1f}")
                 
                 st.info("💡 **Dica:** Estes são os números médios dos usuários ativos. Use como referência para suas primeiras metas!")
         
@@ -2651,12 +4664,7 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 # Comparação com a média
                 st.subheader("📊 Comparação com Usuários Ativos")
                 
-                usuarios_ativos = df_usuarios[df_usuarios['total_views'] > 0]
-                media_views = usuarios_ativos['total_views'].mean()
-                media_likes = usuarios_ativos['total_likes'].mean()
-                media_engagement = usuarios_ativos['taxa_engajamento'].mean()
-                media_videos = usuarios_ativos['total_videos'].mean()
-                
+                metricas_comparacao = ['total_views', 'total_likes', 'taxa_engajamento', 'total_videos']
                 comparacao_data = {
                     'Métrica': ['Views', 'Curtidas', 'Engajamento %', 'Vídeos'],
                     'Usuário': [
@@ -2665,7 +4673,8 @@ def pagina_analise_usuario_avancada(df_usuarios):
                         dados_usuario['taxa_engajamento'],
                         dados_usuario['total_videos']
                     ],
-                    'Média Geral': [media_views, media_likes, media_engagement, media_videos]
+                    'Média Geral': [coorte.media(m) for m in metricas_comparacao],
+                    'Mediana': [coorte.mediana(m) for m in metricas_comparacao]
                 }
                 
                 df_comp = pd.DataFrame(comparacao_data)
@@ -2673,10 +4682,10 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 fig_comp = px.bar(
                     df_comp,
                     x='Métrica',
-                    y=['Usuário', 'Média Geral'],
+                    y=['Usuário', 'Média Geral', 'Mediana'],
                     title="Comparação: Usuário vs Média de Usuários Ativos",
                     barmode='group',
-                    color_discrete_sequence=['#667eea', '#764ba2']
+                    color_discrete_sequence=['#667eea', '#764ba2', '#f093fb']
                 )
                 st.plotly_chart(fig_comp, use_container_width=True)
                 
@@ -2722,16 +4731,17 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 # Rankings específicos
                 st.subheader("🏆 Posições nos Rankings")
                 
+                total = coorte.total_ativos
                 rankings = [
-                    ("👁️ Views", dados_usuario['rank_views'], len(usuarios_ativos)),
-                    ("❤️ Curtidas", dados_usuario['rank_likes'], len(usuarios_ativos)),
-                    ("📈 Engajamento", dados_usuario['rank_engajamento'], len(usuarios_ativos)),
-                    ("🏆 Performance", dados_usuario['rank_performance'], len(usuarios_ativos))
+                    ("👁️ Views", dados_usuario['rank_views'], 'total_views'),
+                    ("❤️ Curtidas", dados_usuario['rank_likes'], 'total_likes'),
+                    ("📈 Engajamento", dados_usuario['rank_engajamento'], 'taxa_engajamento'),
+                    ("🏆 Performance", dados_usuario['rank_performance'], 'score_performance')
                 ]
                 
-                for nome, posicao, total in rankings:
-                    if posicao > 0:  # Só mostrar se tem ranking
-                        percentil = (1 - posicao / total) * 100
+                for nome, posicao, metrica in rankings:
+                    percentil = coorte.percentil(rotulo_usuario, metrica)
+                    if posicao > 0 and percentil is not None:  # Só mostrar se tem ranking
                         if percentil >= 90:
                             cor = "#ffd700"
                             nivel = "TOP 10%"
@@ -2757,7 +4767,7 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 # Insights e recomendações
                 st.subheader("💡 Insights Personalizados")
                 
-                insights, recomendacoes = gerar_insights_usuario(dados_usuario, df_usuarios)
+                insights, recomendacoes = gerar_insights_usuario(dados_usuario, df_usuarios, coorte)
                 
                 if insights:
                     for insight in insights:
@@ -2775,7 +4785,131 @@ def pagina_analise_usuario_avancada(df_usuarios):
                             <p style="margin: 0;">{rec}</p>
                         </div>
                         """, unsafe_allow_html=True)
+            
+            secao_crescimento_usuario(dados_usuario)
+
+def _mudar_pagina_lista(passo):
+    st.session_state['pagina_lista_videos'] = st.session_state.get('pagina_lista_videos', 1) + passo
+
+@fragmento
+@medir_desempenho()
+def secao_lista_paginada(df_filtrado, chave_lista=None):
+    """Lista paginada de vídeos (trocar de página reexecuta só esta região).
+
+    chave_lista identifica filtros e ordenação: quando muda, a lista volta à página 1.
+    """
+    st.subheader("📋 Lista Completa de Vídeos")
+    
+    if st.session_state.get('filtros_lista_videos') != chave_lista:
+        st.session_state['filtros_lista_videos'] = chave_lista
+        st.session_state['pagina_lista_videos'] = 1
+    
+    if df_filtrado.empty:
+        st.warning("⚠️ Nenhum vídeo encontrado com os filtros aplicados")
+    else:
+        # Controles de paginação melhorados
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            videos_por_pagina = st.selectbox("Vídeos por página:", [10, 20, 50, 100], index=2)
+        
+        with col2:
+            total_paginas = max(1, (len(df_filtrado) - 1) // videos_por_pagina + 1)
+            # Um tamanho de página maior pode reduzir o total de páginas
+            if st.session_state.get('pagina_lista_videos', 1) > total_paginas:
+                st.session_state['pagina_lista_videos'] = total_paginas
+            pagina_atual = st.number_input("Página:", min_value=1, max_value=total_paginas, key='pagina_lista_videos')
+        
+        with col3:
+            st.metric("📄 Total de Páginas", total_paginas)
+        
+        # Calcular range da página
+        inicio = (pagina_atual - 1) * videos_por_pagina
+        fim = min(inicio + videos_por_pagina, len(df_filtrado))
+        df_pagina = df_filtrado.iloc[inicio:fim]
+        
+        st.info(f"📊 Mostrando vídeos {inicio + 1:,} a {fim:,} de {len(df_filtrado):,} filtrados")
+        
+        # Métricas da página formatadas por coluna
+        numeros_pagina = {
+            coluna: formatar_numeros(df_pagina[coluna]).tolist()
+            for coluna in ('views', 'likes', 'comments', 'interactions') if coluna in df_pagina.columns
+        }
+        
+        # Exibir vídeos
+        for idx, (_, video) in enumerate(df_pagina.iterrows()):
+            titulo = video.get('title', f'Vídeo #{video.get("id", idx+1)}')
+            categoria = video.get('categoria_video', '📊 Sem categoria')
+            
+            with st.expander(f"{categoria} {titulo[:100]}..."):
+                col1, col2, col3 = st.columns([2, 1, 1])
+                
+                with col1:
+                    # Informações principais
+                    st.markdown("#### 📋 Informações do Vídeo")
+                    if 'discord_username' in video.index:
+                        st.write(f"👤 **Criador:** {video['discord_username']}")
+                    if 'platform' in video.index:
+                        st.write(f"📱 **Plataforma:** {video['platform']}")
+                    if 'title' in video.index:
+                        st.write(f"📝 **Título:** {video['title']}")
+                    
+                    # Link do vídeo - DESTAQUE
+                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
+                        st.markdown(f"""
+                        <div style="background: linear-gradient(135deg, #28a745, #20c997); 
+                                    padding: 1.5rem; border-radius: 12px; margin: 1rem 0; text-align: center;">
+                            <a href="{video['url']}" target="_blank" 
+                               style="color: white; text-decoration: none; font-weight: bold; font-size: 1.2em;">
+                                🔗 ASSISTIR VÍDEO ORIGINAL
+                            </a>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown("""
+                        <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 12px; 
+                                    border: 2px dashed #dee2e6; margin: 1rem 0; text-align: center;">
+                            <span style="color: #6c757d; font-weight: bold;">🔗 Link não disponível</span>
+                        </div>
+                        """, unsafe_allow_html=True)
+                
+                with col2:
+                    # Métricas básicas
+                    st.markdown("#### 📊 Métricas")
+                    if 'views' in video.index:
+                        st.metric("👁️ Views", numeros_pagina['views'][idx])
+                    if 'likes' in video.index:
+                        st.metric("❤️ Curtidas", numeros_pagina['likes'][idx])
+                    if 'comments' in video.index:
+                        st.metric("💬 Comentários", numeros_pagina['comments'][idx])
+                
+                with col3:
+                    # Métricas avançadas
+                    st.markdown("#### 🎯 Performance")
+                    if 'engagement_rate' in video.index:
+                        st.metric("📈 Engajamento", f"{video['engagement_rate']:.2f}%")
+                    if 'video_score' in video.index:
+                        st.metric("🏆 Score", f"{video['video_score']:.1f}")
+                    if 'interactions' in video.index:
+                        st.metric("💪 Interações", numeros_pagina['interactions'][idx])
+        
+        # Navegação da página
+        if total_paginas > 1:
+            st.divider()
+            col1, col2, col3 = st.columns([1, 2, 1])
+            
+            with col1:
+                if pagina_atual > 1:
+                    st.button("⬅️ Página Anterior", on_click=_mudar_pagina_lista, args=(-1,))
+            
+            with col2:
+                st.markdown(f"<div style='text-align: center;'><strong>Página {pagina_atual} de {total_paginas}</strong></div>", unsafe_allow_html=True)
+            
+            with col3:
+                if pagina_atual < total_paginas:
+                    st.button("Próxima Página ➡️", on_click=_mudar_pagina_lista, args=(1,))
 
+@medir_desempenho()
 def pagina_videos_completa(df_videos):
     """Análise completa de TODOS os vídeos"""
     st.markdown('<div class="main-header"><h1>🎬 Análise Completa de Vídeos</h1><p>Todos os Vídeos com Links e Filtros Avançados</p></div>', unsafe_allow_html=True)
@@ -2856,6 +4990,9 @@ def pagina_videos_completa(df_videos):
     if apenas_com_link and 'tem_link' in df_filtrado.columns:
         df_filtrado = df_filtrado[df_filtrado['tem_link'] == True]
     
+    # Tudo que muda o conjunto filtrado (a ordenação não muda os gráficos)
+    chave_filtros = (versao_snapshot(df_videos), plataforma, usuario, min_views, apenas_com_link)
+    
     # Aplicar ordenação
     coluna_ord, ascending = ordenacao_opcoes[ordenacao]
     if coluna_ord in df_filtrado.columns:
@@ -2872,105 +5009,7 @@ def pagina_videos_completa(df_videos):
     ])
     
     with tab1:
-        st.subheader("📋 Lista Completa de Vídeos")
-        
-        if df_filtrado.empty:
-            st.warning("⚠️ Nenhum vídeo encontrado com os filtros aplicados")
-        else:
-            # Controles de paginação melhorados
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                videos_por_pagina = st.selectbox("Vídeos por página:", [10, 20, 50, 100], index=2)
-            
-            with col2:
-                total_paginas = max(1, (len(df_filtrado) - 1) // videos_por_pagina + 1)
-                pagina_atual = st.number_input("Página:", min_value=1, max_value=total_paginas, value=1)
-            
-            with col3:
-                st.metric("📄 Total de Páginas", total_paginas)
-            
-            # Calcular range da página
-            inicio = (pagina_atual - 1) * videos_por_pagina
-            fim = min(inicio + videos_por_pagina, len(df_filtrado))
-            df_pagina = df_filtrado.iloc[inicio:fim]
-            
-            st.info(f"📊 Mostrando vídeos {inicio + 1:,} a {fim:,} de {len(df_filtrado):,} filtrados")
-            
-            # Exibir vídeos
-            for idx, (_, video) in enumerate(df_pagina.iterrows()):
-                titulo = video.get('title', f'Vídeo #{video.get("id", idx+1)}')
-                categoria = video.get('categoria_video', '📊 Sem categoria')
-                
-                with st.expander(f"{categoria} {titulo[:100]}..."):
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    
-                    with col1:
-                        # Informações principais
-                        st.markdown("#### 📋 Informações do Vídeo")
-                        if 'discord_username' in video.index:
-                            st.write(f"👤 **Criador:** {video['discord_username']}")
-                        if 'platform' in video.index:
-                            st.write(f"📱 **Plataforma:** {video['platform']}")
-                        if 'title' in video.index:
-                            st.write(f"📝 **Título:** {video['title']}")
-                        
-                        # Link do vídeo - DESTAQUE
-                        if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                            st.markdown(f"""
-                            <div style="background: linear-gradient(135deg, #28a745, #20c997); 
-                                        padding: 1.5rem; border-radius: 12px; margin: 1rem 0; text-align: center;">
-                                <a href="{video['url']}" target="_blank" 
-                                   style="color: white; text-decoration: none; font-weight: bold; font-size: 1.2em;">
-                                    🔗 ASSISTIR VÍDEO ORIGINAL
-                                </a>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown("""
-                            <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 12px; 
-                                        border: 2px dashed #dee2e6; margin: 1rem 0; text-align: center;">
-                                <span style="color: #6c757d; font-weight: bold;">🔗 Link não disponível</span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        # Métricas básicas
-                        st.markdown("#### 📊 Métricas")
-                        if 'views' in video.index:
-                            st.metric("👁️ Views", formatar_numero(video['views']))
-                        if 'likes' in video.index:
-                            st.metric("❤️ Curtidas", formatar_numero(video['likes']))
-                        if 'comments' in video.index:
-                            st.metric("💬 Comentários", formatar_numero(video['comments']))
-                    
-                    with col3:
-                        # Métricas avançadas
-                        st.markdown("#### 🎯 Performance")
-                        if 'engagement_rate' in video.index:
-                            st.metric("📈 Engajamento", f"{video['engagement_rate']:.2f}%")
-                        if 'video_score' in video.index:
-                            st.metric("🏆 Score", f"{video['video_score']:.1f}")
-                        if 'interactions' in video.index:
-                            st.metric("💪 Interações", formatar_numero(video['interactions']))
-            
-            # Navegação da página
-            if total_paginas > 1:
-                st.divider()
-                col1, col2, col3 = st.columns([1, 2, 1])
-                
-                with col1:
-                    if pagina_atual > 1:
-                        if st.button("⬅️ Página Anterior"):
-                            st.rerun()
-                
-                with col2:
-                    st.markdown(f"<div style='text-align: center;'><strong>Página {pagina_atual} de {total_paginas}</strong></div>", unsafe_allow_html=True)
-                
-                with col3:
-                    if pagina_atual < total_paginas:
-                        if st.button("Próxima Página ➡️"):
-                            st.rerun()
+        secao_lista_paginada(df_filtrado, chave_filtros + (ordenacao,))
     
     with tab2:
         st.subheader("🏆 Top Vídeos por Categoria")
@@ -2999,30 +5038,8 @@ def pagina_videos_completa(df_videos):
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Lista detalhada
-                for i, (_, video) in enumerate(top_views.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>📱 Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video['views'])}</p>
-                        <p><strong>❤️ Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                        {'<p><strong>📈 Engajamento:</strong> ' + f"{video['engagement_rate']:.2f}%" + '</p>' if 'engagement_rate' in video.index else ''}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                        st.markdown(f"""
-                        <div style="background: linear-gradient(135deg, #007bff, #0056b3); 
-                                    padding: 1rem; border-radius: 8px; margin: 0.5rem 0; text-align: center;">
-                            <a href="{video['url']}" target="_blank" 
-                               style="color: white; text-decoration: none; font-weight: bold;">
-                                🔗 ASSISTIR VÍDEO
-                            </a>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.divider()
+                with medir_bloco("videos.top_views.cards", linhas=len(top_views)):
+                    renderizar_cards_videos(top_views, CAMPOS_CARD_COMPLETO + [('📈 Engajamento', 'engagement_rate', 'percentual')], 'azul')
             else:
                 st.info("ℹ️ Dados de views não disponíveis")
         
@@ -3030,20 +5047,9 @@ def pagina_videos_completa(df_videos):
             if 'likes' in df_filtrado.columns and not df_filtrado.empty:
                 top_likes = df_filtrado.nlargest(top_quantidade, 'likes')
                 
-                for i, (_, video) in enumerate(top_likes.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>❤️ Curtidas:</strong> {formatar_numero(video['likes'])}</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                        st.markdown(f"🔗 **[Ver Vídeo Original]({video['url']})**")
-                    
-                    st.divider()
+                with medir_bloco("videos.top_likes.cards", linhas=len(top_likes)):
+                    renderizar_cards_videos(top_likes, [('👤 Criador', 'discord_username', 'texto'), ('❤️ Curtidas', 'likes', 'numero'),
+                                                        ('👁️ Views', 'views', 'numero')], 'texto')
         
         with subtabs[2]:  # Maior Engajamento
             if 'engagement_rate' in df_filtrado.columns and not df_filtrado.empty:
@@ -3051,20 +5057,9 @@ def pagina_videos_completa(df_videos):
                 df_eng = df_filtrado[df_filtrado['views'] >= 100] if 'views' in df_filtrado.columns else df_filtrado
                 top_engagement = df_eng.nlargest(top_quantidade, 'engagement_rate')
                 
-                for i, (_, video) in enumerate(top_engagement.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>📈 Engajamento:</strong> {video['engagement_rate']:.2f}%</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                        st.markdown(f"🔗 **[Ver Vídeo Original]({video['url']})**")
-                    
-                    st.divider()
+                with medir_bloco("videos.top_engajamento.cards", linhas=len(top_engagement)):
+                    renderizar_cards_videos(top_engagement, [('👤 Criador', 'discord_username', 'texto'), ('📈 Engajamento', 'engagement_rate', 'percentual'),
+                                                             ('👁️ Views', 'views', 'numero')], 'texto')
         
         with subtabs[3]:  # Melhores com Links
             videos_com_link = df_filtrado[df_filtrado['tem_link'] == True] if 'tem_link' in df_filtrado.columns else df_filtrado[df_filtrado['url'].notna() & (df_filtrado['url'] != '')]
@@ -3078,28 +5073,8 @@ def pagina_videos_completa(df_videos):
                 
                 top_com_links = videos_com_link.head(top_quantidade)
                 
-                for i, (_, video) in enumerate(top_com_links.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>📱 Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                        <p><strong>❤️ Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.markdown(f"""
-                    <div style="background: linear-gradient(135deg, #28a745, #20c997); 
-                                padding: 1.5rem; border-radius: 10px; margin: 1rem 0; text-align: center;">
-                        <a href="{video['url']}" target="_blank" 
-                           style="color: white; text-decoration: none; font-weight: bold; font-size: 1.1em;">
-                            🔗 ASSISTIR VÍDEO AGORA
-                        </a>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.divider()
+                with medir_bloco("videos.com_links.cards", linhas=len(top_com_links)):
+                    renderizar_cards_videos(top_com_links, CAMPOS_CARD_COMPLETO, 'verde')
             else:
                 st.warning("⚠️ Nenhum vídeo com link encontrado nos filtros aplicados")
     
@@ -3116,10 +5091,13 @@ def pagina_videos_completa(df_videos):
                 if 'platform' in df_filtrado.columns:
                     dist_plat = df_filtrado['platform'].value_counts()
                     
-                    fig_plat = px.pie(
-                        values=dist_plat.values,
-                        names=dist_plat.index,
-                        title="📱 Distribuição por Plataforma"
+                    fig_plat = figura_em_cache(
+                        chave_filtros + ('videos.plataformas',),
+                        lambda: px.pie(
+                            values=dist_plat.values,
+                            names=dist_plat.index,
+                            title="📱 Distribuição por Plataforma"
+                        )
                     )
                     st.plotly_chart(fig_plat, use_container_width=True)
             
@@ -3128,12 +5106,15 @@ def pagina_videos_completa(df_videos):
                 if 'categoria_video' in df_filtrado.columns:
                     dist_cat = df_filtrado['categoria_video'].value_counts()
                     
-                    fig_cat = px.bar(
-                        x=dist_cat.index,
-                        y=dist_cat.values,
-                        title="📈 Distribuição por Categoria de Engajamento",
-                        color=dist_cat.values,
-                        color_continuous_scale='Viridis'
+                    fig_cat = figura_em_cache(
+                        chave_filtros + ('videos.categorias',),
+                        lambda: px.bar(
+                            x=dist_cat.index,
+                            y=dist_cat.values,
+                            title="📈 Distribuição por Categoria de Engajamento",
+                            color=dist_cat.values,
+                            color_continuous_scale='Viridis'
+                        )
                     )
                     st.plotly_chart(fig_cat, use_container_width=True)
             
@@ -3202,16 +5183,25 @@ def pagina_videos_completa(df_videos):
                     help="Digite palavras-chave para buscar nos títulos dos vídeos"
                 )
                 
+                ordenar_busca = st.radio(
+                    "Ordenar resultados por:",
+                    ["Relevância", "Views"],
+                    horizontal=True,
+                    key="ordenar_busca_titulo"
+                )
+                
                 if termo_busca:
-                    videos_encontrados = df_filtrado[
-                        df_filtrado['title'].str.contains(termo_busca, case=False, na=False)
-                    ]
+                    # Índice de texto completo: cada palavra vale como prefixo ("tuto" acha "tutorial")
+                    videos_encontrados, ranqueado = buscar_videos_por_titulo(df_videos, df_filtrado, termo_busca)
                     
                     if not videos_encontrados.empty:
                         st.success(f"✅ Encontrados {len(videos_encontrados):,} vídeos com '{termo_busca}'")
                         
-                        # Ordenar por views
-                        if 'views' in videos_encontrados.columns:
+                        if ordenar_busca == "Relevância" and not ranqueado:
+                            st.caption("ℹ️ Termo muito amplo para ordenar por relevância: resultados ordenados por views")
+                        
+                        # Ordenar por views (os resultados já vêm por relevância)
+                        if (ordenar_busca == "Views" or not ranqueado) and 'views' in videos_encontrados.columns:
                             videos_encontrados = videos_encontrados.sort_values('views', ascending=False)
                         
                         # Limitar a 50 resultados para performance
@@ -3220,29 +5210,8 @@ def pagina_videos_completa(df_videos):
                         if len(videos_encontrados) > 50:
                             st.info(f"📊 Mostrando os 50 melhores de {len(videos_encontrados)} encontrados")
                         
-                        for i, (_, video) in enumerate(videos_mostrar.iterrows(), 1):
-                            st.markdown(f"""
-                            <div class="video-card">
-                                <h4>#{i} - {video['title']}</h4>
-                                <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                                <p><strong>📱 Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                                <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                                <p><strong>❤️ Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                                st.markdown(f"""
-                                <div style="background: linear-gradient(135deg, #6f42c1, #5a2d91); 
-                                            padding: 1rem; border-radius: 8px; margin: 0.5rem 0; text-align: center;">
-                                    <a href="{video['url']}" target="_blank" 
-                                       style="color: white; text-decoration: none; font-weight: bold;">
-                                        🔗 VER VÍDEO
-                                    </a>
-                                </div>
-                                """, unsafe_allow_html=True)
-                            
-                            st.divider()
+                        with medir_bloco("videos.busca_titulo.cards", linhas=len(videos_mostrar)):
+                            renderizar_cards_videos(videos_mostrar, CAMPOS_CARD_COMPLETO, 'roxo', limite_titulo=None)
                     else:
                         st.warning(f"⚠️ Nenhum vídeo encontrado com o termo '{termo_busca}'")
             else:
@@ -3298,9 +5267,386 @@ def pagina_videos_completa(df_videos):
                                     else:
                                         st.write("🔗 **Link:** Não disponível")
 
+METRICAS_COMPETICOES = {
+    'total_views': "👁️ Views",
+    'score_performance': "📊 Score",
+    'taxa_engajamento': "📈 Engajamento (%)"
+}
+
+@medir_desempenho()
+def pagina_ranking_competicoes(df_competicoes):
+    """Ranking único com os usuários de todas as competições registradas"""
+    st.markdown('<div class="main-header"><h1>🌐 Ranking entre Competições</h1><p>Todas as competições lado a lado</p></div>', unsafe_allow_html=True)
+    
+    if df_competicoes.empty:
+        st.warning("⚠️ Nenhum dado disponível")
+        return
+    
+    competicoes = list(dict.fromkeys(df_competicoes['competicao']))
+    if len(competicoes) == 1:
+        st.info("ℹ️ Só a competição principal está registrada. Defina TRENDX_COMPETICOES "
+                "(ex.: `Temporada 1=/dados/t1.db;Temporada 2=/dados/t2.db`) para comparar outras.")
+    
+    versao = versao_snapshot(df_competicoes)
+    ativos = df_competicoes[df_competicoes['total_views'] > 0]
+    
+    # Resumo por competição
+    st.subheader("📋 Resumo por Competição")
+    resumo = df_competicoes.groupby('competicao', sort=False).agg(
+        usuarios=('user_id', 'size'),
+        views=('total_views', 'sum'),
+        videos=('total_videos', 'sum')
+    )
+    resumo['ativos'] = ativos.groupby('competicao', sort=False).size().reindex(resumo.index, fill_value=0)
+    resumo['score_medio'] = ativos.groupby('competicao', sort=False)['score_performance'].mean().reindex(resumo.index).fillna(0).round(1)
+    resumo = resumo.reset_index()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(
+            resumo[['competicao', 'usuarios', 'ativos', 'videos', 'views', 'score_medio']],
+            column_config={
+                "competicao": "🏁 Competição",
+                "usuarios": st.column_config.NumberColumn("👥 Usuários", format="%d"),
+                "ativos": st.column_config.NumberColumn("✅ Ativos", format="%d"),
+                "videos": st.column_config.NumberColumn("🎬 Vídeos", format="%d"),
+                "views": st.column_config.NumberColumn("👁️ Views", format="%d"),
+                "score_medio": st.column_config.NumberColumn("📊 Score médio", format="%.1f")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    with col2:
+        fig_resumo = figura_em_cache(
+            (versao, 'competicoes.views'),
+            lambda: px.bar(resumo, x='competicao', y='views', color='competicao',
+                           title="👁️ Views por Competição", labels={'competicao': 'Competição', 'views': 'Views'})
+        )
+        st.plotly_chart(fig_resumo, use_container_width=True)
+    
+    # Ranking combinado
+    st.subheader("🏆 Ranking Combinado")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metrica = st.selectbox("📊 Métrica:", list(METRICAS_COMPETICOES), format_func=METRICAS_COMPETICOES.get,
+                               key="metrica_competicoes")
+    with col2:
+        selecionadas = st.multiselect("🏁 Competições:", competicoes, default=competicoes, key="filtro_competicoes")
+    with col3:
+        top_n = st.selectbox("📊 Quantidade:", [10, 20, 50, 100], index=1, key="top_competicoes")
+    
+    df_ranking = ativos[ativos['competicao'].isin(selecionadas)]
+    if df_ranking.empty:
+        st.warning("⚠️ Nenhum usuário ativo nas competições selecionadas")
+        return
+    
+    with medir_bloco("competicoes.ranking", linhas=len(df_ranking)):
+        # Competições de tamanhos diferentes: o percentil dentro da própria competição também é mostrado
+        top = df_ranking.nlargest(top_n, metrica)[['competicao', 'discord_username', metrica]].copy()
+        top['posicao_geral'] = range(1, len(top) + 1)
+        top['posicao_competicao'] = df_ranking.groupby('competicao')[metrica].rank(ascending=False, method='min').loc[top.index].astype(int)
+        top['percentil_competicao'] = (df_ranking.groupby('competicao')[metrica].rank(pct=True).loc[top.index] * 100).round(1)
+    
+    st.dataframe(
+        top[['posicao_geral', 'discord_username', 'competicao', metrica, 'posicao_competicao', 'percentil_competicao']],
+        column_config={
+            "posicao_geral": st.column_config.NumberColumn("🏆 Geral", format="%d"),
+            "discord_username": "👤 Usuário",
+            "competicao": "🏁 Competição",
+            metrica: st.column_config.NumberColumn(METRICAS_COMPETICOES[metrica], format="%d" if metrica == 'total_views' else "%.2f"),
+            "posicao_competicao": st.column_config.NumberColumn("🥇 Na competição", format="%d"),
+            "percentil_competicao": st.column_config.NumberColumn("📈 Percentil na competição", format="%.1f")
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+# ========== SAÚDE E PRONTIDÃO ==========
+class RegistroCargas:
+    """Última carga de cada conjunto de dados no processo.
+
+    Os loaders carimbam df.attrs['carregado_em'] quando rodam de fato; um
+    carimbo já visto significa que o DataFrame veio do cache.
+    """
+    
+    def __init__(self):
+        self.aquecimento = None
+        self._conjuntos = {}
+        self._trava = threading.Lock()
+    
+    def iniciar_aquecimento(self):
+        self.aquecimento = {'estado': 'em_andamento', 'iniciado_em': time.time()}
+    
+    def concluir_aquecimento(self, etapas, duracao_s, erro=None):
+        self.aquecimento = dict(
+            self.aquecimento or {},
+            estado='falhou' if erro else 'concluido',
+            duracao_ms=round(duracao_s * 1000, 1),
+            etapas_ms=etapas,
+            erro=erro
+        )
+    
+    def registrar_segundo_plano(self, nome, estado, duracao_s=None, erro=None):
+        """Etapa do aquecimento que roda depois do /pronto (não segura a prontidão)"""
+        aquecimento = self.aquecimento or {}
+        etapa = {'estado': estado}
+        if duracao_s is not None:
+            etapa['duracao_ms'] = round(duracao_s * 1000, 1)
+        if erro:
+            etapa['erro'] = erro
+        # Dicionário novo a cada troca: /saude pode estar serializando o anterior
+        self.aquecimento = dict(aquecimento, segundo_plano=dict(aquecimento.get('segundo_plano') or {}, **{nome: etapa}))
+    
+    def registrar(self, nome, df, duracao_s):
+        carregado_em = df.attrs.get('carregado_em')
+        with self._trava:
+            estado = self._conjuntos.setdefault(nome, {'cargas': 0, 'acertos': 0, 'carregado_em': None})
+            if carregado_em is not None and carregado_em == estado['carregado_em']:
+                estado['acertos'] += 1
+                return
+            estado['cargas'] += 1
+            estado['carregado_em'] = carregado_em if carregado_em is not None else time.time()
+            estado['ultima_carga_ms'] = round(duracao_s * 1000, 1)
+            estado['linhas'] = len(df)
+            estado['versao'] = df.attrs.get('versao_snapshot')
+    
+    def estado(self):
+        agora = time.time()
+        with self._trava:
+            return {
+                nome: dict(
+                    estado,
+                    idade_s=round(agora - estado['carregado_em'], 1),
+                    taxa_acertos=round(estado['acertos'] / (estado['acertos'] + estado['cargas']), 3)
+                )
+                for nome, estado in self._conjuntos.items()
+            }
+
+@st.cache_resource(show_spinner=False)
+def obter_registro_cargas():
+    return RegistroCargas()
+
+def _taxa_acertos(acertos, falhas):
+    return round(acertos / (acertos + falhas), 3) if acertos + falhas else None
+
+def estado_saude():
+    """JSON de saúde: snapshot, cargas dos conjuntos, caches e memória do processo"""
+    registro = obter_registro_cargas()
+    conjuntos = registro.estado()
+    pendentes = [nome for nome in CONJUNTOS_PRONTIDAO if not conjuntos.get(nome, {}).get('linhas')]
+    # Aquecimento em andamento segura a prontidão mesmo com os dados já carregados
+    if registro.aquecimento and registro.aquecimento['estado'] == 'em_andamento':
+        pendentes.append('aquecimento')
+    atrasados = [nome for nome, estado in conjuntos.items() if estado['idade_s'] > SAUDE_ATRASO_MAX_S]
+    
+    figuras = obter_cache_figuras().estatisticas()
+    saude = {
+        'pronto': not pendentes,
+        'pendentes': pendentes,
+        'atrasados': atrasados,
+        'pid': os.getpid(),
+        'memoria_mb': round(_memoria_atual_mb(), 1),
+        'aquecimento': registro.aquecimento,
+        'conjuntos': conjuntos,
+        'cache_figuras': dict(figuras, taxa_acertos=_taxa_acertos(figuras['acertos'], figuras['falhas']))
+    }
+    
+    # Só consulta snapshots já criados: a verificação de saúde não dispara cópia do banco
+    snapshot = _SNAPSHOTS_BANCO.get(os.path.abspath(DB_PATH))
+    if snapshot is not None:
+        idade = snapshot.idade_s()
+        saude['snapshot_banco'] = {
+            'idade_s': None if idade is None else round(idade, 1),
+            'duracao_copia_ms': round(snapshot.duracao_copia * 1000, 1),
+            'copias': snapshot.copias
+        }
+    compartilhado = obter_snapshot_compartilhado()
+    if compartilhado is not None:
+        idade = compartilhado.idade_s()
+        saude['snapshot_compartilhado'] = {
+            'idade_s': None if idade is None else round(idade, 1),
+            'versoes': compartilhado.estado()
+        }
+    return saude
+
+@st.cache_resource(show_spinner=False)
+def _servidor_saude(host, porta):
+    # Importado aqui: fora do orçamento de import do dashboard
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class ManipuladorSaude(BaseHTTPRequestHandler):
+        def do_GET(self):
+            rota = self.path.split('?', 1)[0]
+            if rota not in ('/saude', '/pronto'):
+                status, corpo = 404, {'erro': 'rota não encontrada'}
+            else:
+                try:
+                    corpo = estado_saude()
+                    status = 200 if rota == '/saude' or corpo['pronto'] else 503
+                except Exception as e:
+                    status, corpo = 500, {'erro': str(e)}
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+        
+        def log_message(self, formato, *args):
+            # Healthchecks a cada poucos segundos poluiriam o log do Streamlit
+            pass
+    
+    try:
+        servidor = ThreadingHTTPServer((host, porta), ManipuladorSaude)
+    except OSError as e:
+        # Porta ocupada (ex.: outra réplica no mesmo host): segue sem o servidor
+        logger.warning("Servidor de saúde indisponível em %s:%s: %s", host, porta, e)
+        return None
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='trendx-saude', daemon=True).start()
+    return servidor
+
+def iniciar_servidor_saude(host=SAUDE_HOST, porta=SAUDE_PORTA):
+    """Sobe (uma vez por processo) o servidor lateral com GET /saude e GET /pronto.
+
+    /saude responde 200 enquanto o processo estiver de pé; /pronto responde 503
+    até os CONJUNTOS_PRONTIDAO terem sido carregados.
+    """
+    return _servidor_saude(host, porta) if porta else None
+
+# ========== AQUECIMENTO ==========
+def _aquecer_em_segundo_plano(nome, funcao, *args):
+    """Roda uma etapa do aquecimento numa thread, registrando o resultado no /saude"""
+    registro = obter_registro_cargas()
+    
+    def rodar():
+        inicio = time.perf_counter()
+        try:
+            funcao(*args)
+        except Exception as e:
+            logger.warning("Aquecimento em segundo plano de %s falhou: %s", nome, e)
+            registro.registrar_segundo_plano(nome, 'falhou', time.perf_counter() - inicio, erro=str(e))
+            return
+        registro.registrar_segundo_plano(nome, 'concluido', time.perf_counter() - inicio)
+    
+    registro.registrar_segundo_plano(nome, 'em_andamento')
+    thread = threading.Thread(target=rodar, name=f"trendx-aquecimento-{nome}", daemon=True)
+    thread.start()
+    return thread
+
+def aquecer_caches(conjuntos=CONJUNTOS_PRONTIDAO):
+    """Carrega os dados e monta índices e ranks antes do primeiro visitante.
+
+    Usa os mesmos loaders e caches das páginas, fora de qualquer sessão
+    (iniciar.py chama antes de subir o Streamlit). Devolve {etapa: ms}; o
+    total fica em estado_saude()['aquecimento'].
+
+    O mapa de contas por usuário (Gestão de Contas) cresce com o número de
+    usuários sem vídeos e não segura o /pronto: é montado numa thread depois
+    que o aquecimento termina, e quem abrir a página antes espera a mesma
+    construção no cache_resource em vez de repeti-la.
+    """
+    registro = obter_registro_cargas()
+    registro.iniciar_aquecimento()
+    etapas = {}
+    inicio = time.perf_counter()
+    
+    def etapa(nome, funcao, *args):
+        inicio_etapa = time.perf_counter()
+        resultado = funcao(*args)
+        etapas[nome] = round((time.perf_counter() - inicio_etapa) * 1000, 1)
+        return resultado
+    
+    try:
+        dados = {nome: etapa(f"carregar.{nome}", carregar_conjunto, nome) for nome in conjuntos}
+        etapa("resumo", carregar_resumo_dados)
+        
+        df_videos = dados.get('videos')
+        if df_videos is not None and not df_videos.empty:
+            etapa("indice_urls", obter_indice_urls, df_videos)
+            etapa("indice_caminhos", obter_indice_caminhos, df_videos)
+            indice_titulos = _obter_indice_titulos()
+            if indice_titulos is not None:
+                etapa("indice_titulos", indice_titulos.sincronizar, df_videos)
+        
+        df_usuarios = dados.get('usuarios')
+        if df_usuarios is not None and not df_usuarios.empty:
+            etapa("indice_donos", obter_indice_donos, df_usuarios)
+            etapa("indice_nomes_usuarios", obter_indice_nomes_usuarios, df_usuarios)
+            etapa("estatisticas_coorte", obter_estatisticas_coorte, df_usuarios)
+            # Grava os ranks desta versão: a próxima já mostra a movimentação
+            etapa("ranks", obter_diff_ranks, df_usuarios)
+    except Exception as e:
+        registro.concluir_aquecimento(etapas, time.perf_counter() - inicio, erro=str(e))
+        raise
+    
+    registro.concluir_aquecimento(etapas, time.perf_counter() - inicio)
+    if df_usuarios is not None and not df_usuarios.empty and df_videos is not None and not df_videos.empty:
+        _aquecer_em_segundo_plano("contas_usuarios", obter_contas_usuarios, df_usuarios, df_videos)
+    return etapas
+
+# ========== REGISTRO DE PÁGINAS ==========
+# Conjuntos de dados que as páginas podem pedir, na ordem de carregamento
+CONJUNTOS_DE_DADOS = {
+    'usuarios': carregar_dados_usuarios_completo,
+    'videos': carregar_videos_completo,
+    'competicoes': carregar_usuarios_competicoes
+}
+
+def carregar_conjunto(nome):
+    """Conjunto de dados do snapshot compartilhado, se publicado; senão, do loader"""
+    inicio = time.perf_counter()
+    snapshot = obter_snapshot_compartilhado()
+    df = snapshot.obter(nome) if snapshot is not None else None
+    if df is None:
+        df = CONJUNTOS_DE_DADOS[nome]()
+        if nome == 'usuarios':
+            # Com o snapshot compartilhado quem grava o histórico é o publicador
+            capturar_historico(df)
+    obter_registro_cargas().registrar(nome, df, time.perf_counter() - inicio)
+    return df
+
+# Cada página declara os conjuntos de dados que usa (na ordem dos argumentos);
+# main() carrega só esses antes de chamá-la
+PAGINAS = {
+    "📊 Dashboard Executivo": {
+        'funcao': pagina_dashboard_executivo,
+        'dados': ('usuarios',),
+        'descricao': "Visão geral de todos os usuários"
+    },
+    "🏆 Rankings Completos": {
+        'funcao': pagina_rankings_completos,
+        'dados': ('usuarios',),
+        'descricao': "Rankings com controles avançados"
+    },
+    "👤 Análise Individual": {
+        'funcao': pagina_analise_usuario_avancada,
+        'dados': ('usuarios',),
+        'descricao': "Análise detalhada por usuário"
+    },
+    "🎬 Vídeos Completos": {
+        'funcao': pagina_videos_completa,
+        'dados': ('videos',),
+        'descricao': "Todos os vídeos com links"
+    },
+    "🔗 Gestão de Contas": {
+        'funcao': pagina_gestao_contas,
+        'dados': ('videos', 'usuarios'),
+        'descricao': "Identificar links e gerenciar contas"
+    },
+    "🌐 Entre Competições": {
+        'funcao': pagina_ranking_competicoes,
+        'dados': ('competicoes',),
+        'descricao': "Ranking combinado das competições registradas"
+    }
+}
+
 # ========== FUNÇÃO PRINCIPAL ==========
 def main():
     """Função principal do dashboard completo"""
+    configurar_pagina()
+    iniciar_servidor_saude()
+    reiniciar_registros_desempenho()
     
     # Verificar se está em produção e mostrar banner
     if IS_PRODUCTION:
@@ -3370,22 +5716,35 @@ projeto/
             st.error("🚨 **ERRO DE CONECTIVIDADE:** Não foi possível conectar ao banco!")
         st.stop()
     
-    # Carregar dados com indicador de progresso
+    # Sidebar de navegação (antes do carregamento: a página define o que carregar)
+    st.sidebar.markdown("## 🧭 Navegação Principal")
+    
+    paginas = list(PAGINAS)
+    
+    pagina_selecionada = st.sidebar.radio(
+        "Escolha a análise:",
+        paginas,
+        help="Selecione a página de análise desejada"
+    )
+    
+    # Mostrar descrição da página selecionada
+    pagina = PAGINAS[pagina_selecionada]
+    st.sidebar.info(f"📋 {pagina['descricao']}")
+    
+    # Carregar só os dados da página, com indicador de progresso
+    dados = {}
     try:
         with st.spinner("🔄 Carregando TODOS os dados do banco..."):
             progress_bar = st.progress(0)
             
-            # Carregar usuários
-            progress_bar.progress(25)
-            df_usuarios = carregar_dados_usuarios_completo()
-            
-            # Carregar vídeos
-            progress_bar.progress(75)
-            df_videos = carregar_videos_completo()
+            necessarios = [nome for nome in CONJUNTOS_DE_DADOS if nome in pagina['dados']]
+            for i, nome in enumerate(necessarios):
+                progress_bar.progress(int((i + 0.5) / len(necessarios) * 100))
+                dados[nome] = carregar_conjunto(nome)
             
             progress_bar.progress(100)
             
-            if not df_usuarios.empty or not df_videos.empty:
+            if any(not df.empty for df in dados.values()):
                 st.success("✅ Dados carregados com sucesso!")
             else:
                 st.warning("⚠️ Dados carregados, mas podem estar vazios")
@@ -3407,7 +5766,7 @@ projeto/
         st.stop()
     
     # Verificar se dados foram carregados
-    if df_usuarios.empty and df_videos.empty:
+    if all(df.empty for df in dados.values()):
         st.error("❌ Nenhum dado encontrado no banco!")
         st.info("💡 Verifique se as tabelas 'cached_stats' e 'valid_videos' existem e têm dados.")
         
@@ -3440,44 +5799,18 @@ projeto/
         
         st.stop()
     
-    # Sidebar de navegação
-    st.sidebar.markdown("## 🧭 Navegação Principal")
-    
-    paginas = [
-        "📊 Dashboard Executivo",
-        "🏆 Rankings Completos", 
-        "👤 Análise Individual",
-        "🎬 Vídeos Completos",
-        "🔗 Gestão de Contas"
-    ]
-    
-    # Adicionar ícones e descrições
-    descricoes = [
-        "Visão geral de todos os usuários",
-        "Rankings com controles avançados",
-        "Análise detalhada por usuário",
-        "Todos os vídeos com links",
-        "Identificar links e gerenciar contas"
-    ]
-    
-    pagina_selecionada = st.sidebar.radio(
-        "Escolha a análise:",
-        paginas,
-        help="Selecione a página de análise desejada"
-    )
-    
-    # Mostrar descrição da página selecionada
-    idx_pagina = paginas.index(pagina_selecionada)
-    st.sidebar.info(f"📋 {descricoes[idx_pagina]}")
+    # Status dos dados na sidebar (resumo SQL em cache, vale para qualquer página)
+    resumo = carregar_resumo_dados()
+    st.session_state['total_videos_banco'] = resumo['total_videos_banco']
+    st.session_state['videos_carregados'] = resumo['total_videos']
     
-    # Status dos dados na sidebar
     st.sidebar.divider()
     st.sidebar.markdown("### 📊 Status Completo dos Dados")
     
     # Estatísticas dos usuários
-    if not df_usuarios.empty:
-        total_usuarios = len(df_usuarios)
-        usuarios_ativos = len(df_usuarios[df_usuarios['total_views'] > 0])
+    if resumo['total_usuarios'] > 0:
+        total_usuarios = resumo['total_usuarios']
+        usuarios_ativos = resumo['usuarios_ativos']
         usuarios_inativos = total_usuarios - usuarios_ativos
         
         st.sidebar.metric("👥 Total Usuários", f"{total_usuarios:,}")
@@ -3489,24 +5822,20 @@ projeto/
             st.sidebar.metric("📈 Taxa de Ativação", f"{taxa_ativacao:.1f}%")
     
     # Estatísticas dos vídeos
-    if not df_videos.empty:
+    if resumo['total_videos'] > 0:
         st.sidebar.divider()
         st.sidebar.markdown("### 🎬 Estatísticas de Vídeos")
         
-        total_videos = len(df_videos)
+        total_videos = resumo['total_videos']
         st.sidebar.metric("🎥 Total de Vídeos", f"{total_videos:,}")
         
-        if 'tem_link' in df_videos.columns:
-            videos_com_link = len(df_videos[df_videos['tem_link'] == True])
-            st.sidebar.metric("🔗 Com Links", f"{videos_com_link:,}")
-            
-            if total_videos > 0:
-                porcentagem_links = (videos_com_link / total_videos) * 100
-                st.sidebar.metric("📊 % com Links", f"{porcentagem_links:.1f}%")
+        videos_com_link = resumo['videos_com_link']
+        st.sidebar.metric("🔗 Com Links", f"{videos_com_link:,}")
         
-        if 'views' in df_videos.columns:
-            total_views_videos = df_videos['views'].sum()
-            st.sidebar.metric("👁️ Views Totais", formatar_numero(total_views_videos))
+        porcentagem_links = (videos_com_link / total_videos) * 100
+        st.sidebar.metric("📊 % com Links", f"{porcentagem_links:.1f}%")
+        
+        st.sidebar.metric("👁️ Views Totais", formatar_numero(resumo['views_videos']))
     
     # Informações do sistema
     st.sidebar.divider()
@@ -3540,6 +5869,8 @@ projeto/
     
     if st.sidebar.button("🔄 Recarregar Dados", help="Limpa o cache e recarrega dados do banco"):
         st.cache_data.clear()
+        # Com TRENDX_SNAPSHOT, os loaders voltariam a ler a mesma cópia até o TTL
+        expirar_snapshots_banco()
         st.rerun()
     
     # Informações sobre as funcionalidades
@@ -3666,18 +5997,9 @@ projeto/
             if st.button("❌ Fechar Explicação"):
                 st.session_state['mostrar_explicacao'] = False
     
-    # Exibir página selecionada
+    # Exibir página selecionada com os dados que ela declarou
     try:
-        if pagina_selecionada == "📊 Dashboard Executivo":
-            pagina_dashboard_executivo(df_usuarios)
-        elif pagina_selecionada == "🏆 Rankings Completos":
-            pagina_rankings_completos(df_usuarios)
-        elif pagina_selecionada == "👤 Análise Individual":
-            pagina_analise_usuario_avancada(df_usuarios)
-        elif pagina_selecionada == "🎬 Vídeos Completos":
-            pagina_videos_completa(df_videos)
-        elif pagina_selecionada == "🔗 Gestão de Contas":
-            pagina_gestao_contas(df_videos, df_usuarios)
+        pagina['funcao'](*(dados[nome] for nome in pagina['dados']))
             
     except TypeError as e:
         if "unsupported operand type" in str(e):
@@ -3714,6 +6036,9 @@ projeto/
                 st.markdown("- Considerar rollback para versão estável")
                 st.markdown("- Notificar equipe de desenvolvimento")
     
+    # Tempos de execução desta rodada
+    exibir_painel_desempenho()
+    
     # Footer informativo
     st.sidebar.divider()
     st.sidebar.markdown(f"""
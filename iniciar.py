@@ -0,0 +1,59 @@
+"""Inicialização do container: aquece os caches e só então sobe o Streamlit
+
+    python iniciar.py [--porta 8501] [--endereco 0.0.0.0] [--banco trendx_bot.db] [--sem-aquecimento]
+
+O servidor de saúde (TRENDX_SAUDE_PORTA) sobe primeiro, com /pronto em 503.
+Em seguida aquecer_caches() carrega usuários e vídeos e monta índices de
+URLs/donos e ranks no próprio processo (o mapa de contas por usuário segue
+numa thread, depois do /pronto); o Streamlit
+roda app.py, que reaproveita o mesmo módulo dashboard já importado e,
+portanto, os caches prontos. A duração do aquecimento aparece no JSON de
+/saude e /pronto.
+"""
+import argparse
+import os
+import time
+
+import dashboard
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def aquecer():
+    print("🔥 Aquecendo caches antes de abrir o dashboard...")
+    inicio = time.perf_counter()
+    try:
+        etapas = dashboard.aquecer_caches()
+    except Exception as e:
+        # Sem aquecimento as sessões carregam sob demanda, como antes
+        print(f"⚠️ Aquecimento falhou após {time.perf_counter() - inicio:.1f}s: {e}")
+        return
+    print(f"✅ Aquecimento concluído em {time.perf_counter() - inicio:.1f}s")
+    for etapa, tempo_ms in etapas.items():
+        print(f"   {tempo_ms:10,.1f} ms  {etapa}")
+    print("   Mapa de contas por usuário em segundo plano (ver /saude)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aquece os caches e inicia o dashboard")
+    parser.add_argument('--porta', type=int, default=8501)
+    parser.add_argument('--endereco', default='0.0.0.0')
+    parser.add_argument('--banco', default=dashboard.DB_PATH, help="Caminho do trendx_bot.db")
+    parser.add_argument('--script', default='app.py', help="Script do Streamlit (deve importar dashboard)")
+    parser.add_argument('--sem-aquecimento', action='store_true', help="Subir direto, carregando na primeira sessão")
+    args = parser.parse_args()
+
+    from streamlit.web import bootstrap
+    opcoes = {'server.port': args.porta, 'server.address': args.endereco, 'server.headless': True}
+    bootstrap.load_config_options(flag_options=opcoes)
+
+    dashboard.DB_PATH = args.banco
+    dashboard.iniciar_servidor_saude()
+    if not args.sem_aquecimento:
+        aquecer()
+
+    bootstrap.run(os.path.join(DIRETORIO, args.script), False, [], opcoes)
+
+
+if __name__ == "__main__":
+    main()
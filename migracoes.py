@@ -0,0 +1,353 @@
+"""Migrações do banco do bot (trendx_bot.db) usadas pelo dashboard
+
+    python migracoes.py rollups [--banco trendx_bot.db] [--reconstruir] [--verificar]
+    python migracoes.py indices [--banco trendx_bot.db] [--reconstruir]
+
+rollups: cria as tabelas de agregados por usuário × plataforma e por
+         plataforma × categoria de engajamento, mantidas por triggers em
+         valid_videos, e preenche com os vídeos já existentes.
+indices: cria índices de cobertura para as consultas dos loaders do
+         dashboard, roda ANALYZE e mostra o EXPLAIN QUERY PLAN antes e depois.
+
+Cada migração é registrada na tabela `migracoes`; rodar de novo não altera nada.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+
+# Mesmas faixas de carregar_videos_completo (pd.cut com include_lowest; fora delas vira 'nan')
+FAIXAS_CATEGORIA = [(1, '🔴 Baixo'), (3, '🟡 Regular'), (6, '🟢 Bom'), (10, '🔵 Muito Bom'), (100, '🟣 Excepcional')]
+
+METRICAS_ROLLUP = ['views', 'likes', 'comments', 'shares']
+
+TABELAS_ROLLUP = {
+    'rollup_usuario_plataforma': {
+        'chave': ['user_id', 'platform'],
+        'colunas': ['videos', 'videos_com_link'] + METRICAS_ROLLUP,
+        'valores': ['1', 'com_link'] + METRICAS_ROLLUP
+    },
+    'rollup_plataforma_categoria': {
+        'chave': ['platform', 'categoria'],
+        'colunas': ['videos'] + METRICAS_ROLLUP + ['soma_engajamento'],
+        'valores': ['1'] + METRICAS_ROLLUP + ['engajamento']
+    }
+}
+
+# Índices para as consultas de carregar_dados_usuarios_completo e carregar_videos_completo.
+# 'chave' aceita expressões; 'cobertura' só inclui as colunas que existirem na tabela.
+INDICES_CARREGAMENTO = {
+    # ORDER BY total_views ordena pelo alias COALESCE(total_views, 0) do SELECT
+    'idx_cached_stats_ranking': {
+        'tabela': 'cached_stats',
+        'chave': ['COALESCE(total_views, 0)'],
+        'requer': ['total_views', 'discord_username'],
+        'cobertura': [
+            'user_id', 'discord_username', 'total_videos', 'total_views', 'total_likes',
+            'total_comments', 'total_shares', 'tiktok_views', 'tiktok_videos', 'youtube_views',
+            'youtube_videos', 'instagram_views', 'instagram_videos', 'updated_at'
+        ],
+        'onde': "discord_username IS NOT NULL AND discord_username != ''"
+    },
+    # Busca do usuário de cada vídeo no JOIN sem ler a linha inteira de cached_stats
+    'idx_cached_stats_usuario': {
+        'tabela': 'cached_stats',
+        'chave': ['user_id', 'discord_username'],
+        'requer': ['user_id', 'discord_username'],
+        'cobertura': []
+    }
+}
+
+
+# ========== CONTROLE DE MIGRAÇÕES ==========
+def _preparar_controle(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS migracoes (
+        nome TEXT PRIMARY KEY,
+        aplicada_em INTEGER NOT NULL
+    )""")
+
+
+def migracao_aplicada(conn, nome):
+    _preparar_controle(conn)
+    return conn.execute("SELECT 1 FROM migracoes WHERE nome = ?", (nome,)).fetchone() is not None
+
+
+def registrar_migracao(conn, nome):
+    conn.execute("INSERT OR REPLACE INTO migracoes (nome, aplicada_em) VALUES (?, ?)", (nome, int(time.time())))
+
+
+def tabelas_existentes(conn, tipo='table'):
+    return {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (tipo,))}
+
+
+def colunas_tabela(conn, tabela):
+    return [linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")]
+
+
+# ========== ROLLUPS DE VÍDEOS ==========
+def _sql_valores_video(linha):
+    """Colunas de um vídeo já normalizadas; linha = 'NEW.', 'OLD.' ou '' (tabela valid_videos)"""
+    views = f"COALESCE({linha}views, 0)"
+    # Fórmula de calcular_engajamento_por_plataforma: YouTube não conta compartilhamentos
+    engajamento = (
+        f"CASE WHEN {views} = 0 THEN 0 ELSE ROUND(("
+        f"COALESCE({linha}likes, 0) + COALESCE({linha}comments, 0)"
+        f" + CASE WHEN LOWER({linha}platform) = 'youtube' THEN 0 ELSE COALESCE({linha}shares, 0) END"
+        f") * 100.0 / {views}, 2) END"
+    )
+    return (
+        f"COALESCE({linha}user_id, '') AS user_id, COALESCE({linha}platform, '') AS platform, "
+        f"{views} AS views, COALESCE({linha}likes, 0) AS likes, "
+        f"COALESCE({linha}comments, 0) AS comments, COALESCE({linha}shares, 0) AS shares, "
+        f"({linha}url IS NOT NULL AND {linha}url != '' AND LENGTH({linha}url) > 10) AS com_link, "
+        f"{engajamento} AS engajamento"
+    )
+
+
+def _sql_categoria():
+    casos = ' '.join(f"WHEN engajamento <= {limite} THEN '{rotulo}'" for limite, rotulo in FAIXAS_CATEGORIA)
+    return f"CASE WHEN engajamento < 0 THEN 'nan' {casos} ELSE 'nan' END"
+
+
+def _sql_origem(linha):
+    """SELECT com as colunas normalizadas e a categoria de engajamento"""
+    tabela = '' if linha else ' FROM valid_videos'
+    return f"SELECT *, {_sql_categoria()} AS categoria FROM (SELECT {_sql_valores_video(linha)}{tabela})"
+
+
+def _sql_acumular(tabela, linha, sinal):
+    """Soma (sinal=1) ou subtrai (sinal=-1) um vídeo do rollup, criando a linha se faltar"""
+    definicao = TABELAS_ROLLUP[tabela]
+    chave = ', '.join(definicao['chave'])
+    colunas = ', '.join(definicao['colunas'])
+    valores = ', '.join(f"{'-' if sinal < 0 else ''}{valor}" for valor in definicao['valores'])
+    atualizacao = ', '.join(f"{coluna} = {coluna} + excluded.{coluna}" for coluna in definicao['colunas'])
+    comandos = (
+        f"INSERT INTO {tabela} ({chave}, {colunas}) SELECT {chave}, {valores} FROM ({_sql_origem(linha)}) WHERE true "
+        f"ON CONFLICT ({chave}) DO UPDATE SET {atualizacao};"
+    )
+    if sinal < 0:
+        # Linhas zeradas são removidas pela chave, sem varrer o rollup
+        comandos += f"\n        DELETE FROM {tabela} WHERE ({chave}) IN (SELECT {chave} FROM ({_sql_origem(linha)})) AND videos <= 0;"
+    return comandos
+
+
+def _criar_rollups(conn):
+    for tabela, definicao in TABELAS_ROLLUP.items():
+        tipos = {'soma_engajamento': 'REAL NOT NULL DEFAULT 0'}
+        colunas = ',\n        '.join(f"{coluna} {tipos.get(coluna, 'INTEGER NOT NULL DEFAULT 0')}" for coluna in definicao['colunas'])
+        chave = ', '.join(definicao['chave'])
+        conn.execute(f"""
+    CREATE TABLE {tabela} (
+        {', '.join(f'{c} TEXT NOT NULL' for c in definicao['chave'])},
+        {colunas},
+        PRIMARY KEY ({chave})
+    ) WITHOUT ROWID""")
+
+        conn.execute(f"INSERT INTO {tabela} ({chave}, {', '.join(definicao['colunas'])}) {_sql_agregar(tabela)}")
+
+    somar_novo = '\n        '.join(_sql_acumular(tabela, 'NEW.', 1) for tabela in TABELAS_ROLLUP)
+    subtrair_antigo = '\n        '.join(_sql_acumular(tabela, 'OLD.', -1) for tabela in TABELAS_ROLLUP)
+    # Um execute por trigger: executescript faria COMMIT no meio da transação
+    conn.execute(f"""
+    CREATE TRIGGER trg_rollups_insert AFTER INSERT ON valid_videos BEGIN
+        {somar_novo}
+    END""")
+    conn.execute(f"""
+    CREATE TRIGGER trg_rollups_delete AFTER DELETE ON valid_videos BEGIN
+        {subtrair_antigo}
+    END""")
+    conn.execute(f"""
+    CREATE TRIGGER trg_rollups_update AFTER UPDATE OF user_id, platform, url, views, likes, comments, shares ON valid_videos BEGIN
+        {subtrair_antigo}
+        {somar_novo}
+    END""")
+
+
+def _remover_rollups(conn):
+    for gatilho in ('trg_rollups_insert', 'trg_rollups_delete', 'trg_rollups_update'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {gatilho}")
+    for tabela in TABELAS_ROLLUP:
+        conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+
+
+def _sql_agregar(tabela):
+    """Agregação do rollup feita do zero a partir de valid_videos"""
+    definicao = TABELAS_ROLLUP[tabela]
+    chave = ', '.join(definicao['chave'])
+    agregados = ', '.join(
+        f"COUNT(*) AS {coluna}" if valor == '1' else f"SUM({valor}) AS {coluna}"
+        for coluna, valor in zip(definicao['colunas'], definicao['valores'])
+    )
+    return f"SELECT {chave}, {agregados} FROM ({_sql_origem('')}) GROUP BY {chave}"
+
+
+def verificar_rollups(conn):
+    """Compara cada rollup com a agregação feita do zero; devolve {tabela: linhas divergentes}"""
+    divergencias = {}
+    for tabela, definicao in TABELAS_ROLLUP.items():
+        # Soma de engajamento em REAL: compara arredondada para não acusar ruído de ponto flutuante
+        colunas = ', '.join(
+            f"ROUND({coluna}, 4)" if coluna == 'soma_engajamento' else coluna
+            for coluna in definicao['chave'] + definicao['colunas']
+        )
+        atual = f"SELECT {colunas} FROM {tabela}"
+        recalculado = f"SELECT {colunas} FROM ({_sql_agregar(tabela)})"
+        divergencias[tabela] = conn.execute(f"""
+        SELECT COUNT(*) FROM (
+            SELECT * FROM ({atual} EXCEPT {recalculado})
+            UNION ALL
+            SELECT * FROM ({recalculado} EXCEPT {atual})
+        )""").fetchone()[0]
+    return divergencias
+
+
+def migrar_rollups(args):
+    conn = sqlite3.connect(args.banco, timeout=30)
+    try:
+        if 'valid_videos' not in tabelas_existentes(conn):
+            print(f"❌ Tabela valid_videos não encontrada em {args.banco}")
+            return 1
+
+        if migracao_aplicada(conn, 'rollups') and not args.reconstruir:
+            print("✅ Rollups já existem (use --reconstruir para recriar)")
+        else:
+            inicio = time.perf_counter()
+            # Transação exclusiva para escrita: o bot não insere vídeos no meio do preenchimento
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                _remover_rollups(conn)
+                _criar_rollups(conn)
+                registrar_migracao(conn, 'rollups')
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            linhas = {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in TABELAS_ROLLUP}
+            print(f"✅ Rollups criados em {time.perf_counter() - inicio:.2f}s: "
+                  + ", ".join(f"{tabela} ({quantidade:,} linhas)" for tabela, quantidade in linhas.items()))
+
+        if args.verificar:
+            divergencias = verificar_rollups(conn)
+            for tabela, quantidade in divergencias.items():
+                print(f"   {'✅' if quantidade == 0 else '❌'} {tabela}: {quantidade} linhas divergentes")
+            if any(divergencias.values()):
+                return 1
+        return 0
+    finally:
+        conn.close()
+
+
+# ========== ÍNDICES DOS LOADERS ==========
+def _sql_indice(conn, nome, definicao):
+    """CREATE INDEX ajustado às colunas existentes; None se a tabela não comporta o índice"""
+    tabela = definicao['tabela']
+    colunas = colunas_tabela(conn, tabela)
+    if not colunas or not all(coluna in colunas for coluna in definicao['requer']):
+        return None
+    # Colunas já presentes na chave não se repetem na cobertura
+    cobertura = [c for c in definicao['cobertura'] if c in colunas and c not in definicao['chave']]
+    onde = f" WHERE {definicao['onde']}" if definicao.get('onde') else ''
+    return f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({', '.join(definicao['chave'] + cobertura)}){onde}"
+
+
+def _consultas_carregamento():
+    # Import tardio: só o comando indices precisa das consultas do dashboard
+    import dashboard
+    return {
+        'carregar_dados_usuarios_completo': dashboard.SQL_USUARIOS_COMPLETO,
+        'carregar_videos_completo': dashboard.SQL_VIDEOS_COMPLETO
+    }
+
+
+def planos_consultas(conn, consultas):
+    """EXPLAIN QUERY PLAN de cada consulta, como linhas de texto indentadas pela árvore"""
+    planos = {}
+    for nome, consulta in consultas.items():
+        try:
+            linhas = conn.execute(f"EXPLAIN QUERY PLAN {consulta}").fetchall()
+        except sqlite3.Error as e:
+            planos[nome] = [f"erro: {e}"]
+            continue
+        profundidade = {0: 0}
+        planos[nome] = []
+        for id_no, pai, _, detalhe in linhas:
+            profundidade[id_no] = profundidade.get(pai, 0) + 1
+            planos[nome].append(f"{'  ' * (profundidade[id_no] - 1)}{detalhe}")
+    return planos
+
+
+def _imprimir_planos(titulo, planos):
+    print(f"\n{titulo}")
+    for nome, linhas in planos.items():
+        print(f"  {nome}:")
+        for linha in linhas:
+            print(f"    {linha}")
+
+
+def migrar_indices(args):
+    conn = sqlite3.connect(args.banco, timeout=30)
+    try:
+        consultas = _consultas_carregamento()
+        _imprimir_planos("📋 Planos antes:", planos_consultas(conn, consultas))
+
+        existentes = tabelas_existentes(conn, 'index')
+        comandos = {}
+        for nome, definicao in INDICES_CARREGAMENTO.items():
+            if nome in existentes and not args.reconstruir:
+                continue
+            sql = _sql_indice(conn, nome, definicao)
+            if sql is None:
+                print(f"⚠️ {nome}: tabela {definicao['tabela']} ausente ou sem as colunas {definicao['requer']}")
+            else:
+                comandos[nome] = sql
+
+        if comandos:
+            inicio = time.perf_counter()
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for nome, sql in comandos.items():
+                    conn.execute(f"DROP INDEX IF EXISTS {nome}")
+                    conn.execute(sql)
+                _preparar_controle(conn)
+                registrar_migracao(conn, 'indices')
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            # Estatísticas novas para o planejador escolher os índices
+            conn.execute("ANALYZE")
+            print(f"\n✅ {len(comandos)} índice(s) criado(s) e ANALYZE em {time.perf_counter() - inicio:.2f}s: {', '.join(comandos)}")
+        else:
+            print("\n✅ Índices já existem (use --reconstruir para recriar)")
+
+        _imprimir_planos("📋 Planos depois:", planos_consultas(conn, consultas))
+        return 0
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrações do banco do TrendX Analytics")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_rollups = subparsers.add_parser('rollups', help="Agregados de vídeos mantidos por triggers")
+    parser_rollups.add_argument('--banco', default='trendx_bot.db')
+    parser_rollups.add_argument('--reconstruir', action='store_true', help="Recriar tabelas e triggers do zero")
+    parser_rollups.add_argument('--verificar', action='store_true', help="Conferir os rollups contra valid_videos")
+    parser_rollups.set_defaults(funcao=migrar_rollups)
+
+    parser_indices = subparsers.add_parser('indices', help="Índices de cobertura para os loaders do dashboard")
+    parser_indices.add_argument('--banco', default='trendx_bot.db')
+    parser_indices.add_argument('--reconstruir', action='store_true', help="Recriar os índices mesmo que já existam")
+    parser_indices.set_defaults(funcao=migrar_indices)
+
+    args = parser.parse_args()
+    sys.exit(args.funcao(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Publicador do snapshot compartilhado entre réplicas do dashboard
+
+    python publicador_snapshot.py --diretorio /dev/shm/trendx [--intervalo 600] [--uma-vez]
+
+Carrega usuários e vídeos com os loaders do dashboard (mesmas colunas
+derivadas), grava cada DataFrame num arquivo Arrow IPC e troca o manifesto
+de uma vez com os.replace. As réplicas, iniciadas com
+TRENDX_SNAPSHOT_COMPARTILHADO apontando para o mesmo diretório, mapeiam os
+arquivos em memória em vez de consultar o banco. Como elas não passam
+pelos loaders, a captura do histórico de métricas também é feita aqui.
+"""
+import argparse
+import json
+import os
+import time
+
+import dashboard
+
+# Conjuntos publicados (os mesmos nomes de dashboard.CONJUNTOS_DE_DADOS)
+CONJUNTOS_PUBLICADOS = ('usuarios', 'videos')
+
+
+def _gravar_arrow(caminho, df, versao):
+    import pyarrow as pa
+    from pyarrow import ipc
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[b'versao_snapshot'] = versao.encode('utf-8')
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    temporario = caminho + '.tmp'
+    with pa.OSFile(temporario, 'wb') as arquivo:
+        with ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+
+def publicar_snapshot(diretorio, conjuntos):
+    """Publica {conjunto: DataFrame}; só regrava os conjuntos cuja versão mudou"""
+    os.makedirs(diretorio, exist_ok=True)
+    try:
+        manifesto = dashboard.ler_manifesto_snapshot(diretorio)
+    except (OSError, ValueError):
+        manifesto = {}
+
+    alterados = []
+    for conjunto, df in conjuntos.items():
+        if df.empty:
+            continue
+        versao = dashboard.versao_snapshot(df)
+        if manifesto.get(conjunto, {}).get('versao') == versao:
+            continue
+        arquivo = f"{conjunto}-{versao}.arrow"
+        _gravar_arrow(os.path.join(diretorio, arquivo), df, versao)
+        manifesto[conjunto] = {'arquivo': arquivo, 'versao': versao, 'linhas': len(df), 'publicado_em': time.time()}
+        alterados.append(conjunto)
+
+    if alterados:
+        # Troca atômica: a réplica lê o manifesto antigo ou o novo, nunca um pela metade
+        temporario = os.path.join(diretorio, dashboard.MANIFESTO_SNAPSHOT + '.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f)
+        os.replace(temporario, os.path.join(diretorio, dashboard.MANIFESTO_SNAPSHOT))
+
+        # Versões antigas: réplicas que ainda as mapeiam continuam lendo (o unlink não desfaz o mmap)
+        em_uso = {info['arquivo'] for info in manifesto.values()}
+        for arquivo in os.listdir(diretorio):
+            if arquivo.endswith('.arrow') and arquivo not in em_uso:
+                try:
+                    os.remove(os.path.join(diretorio, arquivo))
+                except OSError:
+                    pass
+    return alterados
+
+
+def carregar_e_publicar(diretorio):
+    # Sempre do banco: limpar o cache dos loaders para enxergar dados novos
+    for conjunto in CONJUNTOS_PUBLICADOS:
+        dashboard.CONJUNTOS_DE_DADOS[conjunto].clear()
+    inicio = time.perf_counter()
+    conjuntos = {conjunto: dashboard.CONJUNTOS_DE_DADOS[conjunto]() for conjunto in CONJUNTOS_PUBLICADOS}
+    # As réplicas não passam pelos loaders: o histórico de métricas é gravado aqui
+    dashboard.capturar_historico(conjuntos['usuarios'])
+    alterados = publicar_snapshot(diretorio, conjuntos)
+    duracao = time.perf_counter() - inicio
+    if alterados:
+        print(f"📦 Publicado em {duracao:.2f}s: "
+              + ", ".join(f"{conjunto} ({len(conjuntos[conjunto]):,} linhas)" for conjunto in alterados))
+    return alterados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publica o snapshot do dashboard para as réplicas do host")
+    parser.add_argument('--diretorio', default=dashboard.SNAPSHOT_COMPARTILHADO_DIR or '/dev/shm/trendx',
+                        help="Diretório do snapshot (de preferência em tmpfs)")
+    parser.add_argument('--banco', default=dashboard.DB_PATH, help="Caminho do trendx_bot.db")
+    parser.add_argument('--intervalo', type=float, default=dashboard.CACHE_TTL, help="Segundos entre publicações")
+    parser.add_argument('--uma-vez', action='store_true', help="Publicar uma vez e sair")
+    args = parser.parse_args()
+
+    dashboard.DB_PATH = args.banco
+    try:
+        while True:
+            try:
+                carregar_e_publicar(args.diretorio)
+            except Exception as e:
+                if args.uma_vez:
+                    raise
+                print(f"⚠️ Falha ao publicar snapshot: {e}")
+            if args.uma_vez:
+                break
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório, fora de um pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dashboard  # noqa: E402
+
+PLATAFORMAS = ['tiktok', 'youtube', 'instagram']
+
+
+def url_video(plataforma, handle, numero):
+    if plataforma == 'tiktok':
+        return f"https://www.tiktok.com/@{handle}/video/{7000000000000000000 + numero}"
+    if plataforma == 'youtube':
+        return f"https://youtube.com/shorts/{numero:011d}"
+    return f"https://www.instagram.com/reel/C{numero:09d}/"
+
+
+@pytest.fixture
+def df_usuarios():
+    nomes = ['ana_gamer', 'bruno_chef', 'carla_dance', 'diego_tech', 'elisa_vlog']
+    df = pd.DataFrame({
+        'user_id': [str(10**17 + i) for i in range(len(nomes))],
+        'discord_username': nomes,
+        'total_videos': [12, 9, 6, 3, 0],
+        'total_views': [50000, 42000, 9000, 1200, 0],
+        'total_likes': [5000, 3000, 900, 100, 0],
+        'total_comments': [500, 300, 90, 10, 0],
+        'total_shares': [50, 30, 9, 1, 0],
+        'tiktok_views': [30000, 20000, 9000, 0, 0],
+        'tiktok_videos': [6, 4, 6, 0, 0],
+        'youtube_views': [20000, 12000, 0, 1200, 0],
+        'youtube_videos': [6, 3, 0, 3, 0],
+        'instagram_views': [0, 10000, 0, 0, 0],
+        'instagram_videos': [0, 2, 0, 0, 0],
+        'updated_at': ['2025-01-01'] * len(nomes),
+    })
+    return dashboard.marcar_versao_snapshot(df)
+
+
+@pytest.fixture
+def df_videos(df_usuarios):
+    linhas = []
+    for posicao, usuario in df_usuarios.iterrows():
+        handle = usuario['discord_username'].replace('_', '')
+        for j in range(int(usuario['total_videos'])):
+            numero = posicao * 100 + j
+            plataforma = PLATAFORMAS[j % len(PLATAFORMAS)]
+            linhas.append({
+                'id': numero + 1,
+                'user_id': usuario['user_id'],
+                'url': url_video(plataforma, handle, numero),
+                'title': f"video {j} de {usuario['discord_username']}",
+                'platform': plataforma,
+                'views': 1000 + numero,
+                'likes': 100,
+                'comments': 10,
+                'shares': 1,
+                'created_at': '2025-01-01',
+                'discord_username': usuario['discord_username'],
+            })
+    df = pd.DataFrame(linhas).sort_values('id', ascending=False, ignore_index=True)
+    return dashboard.marcar_versao_snapshot(df)
+
+
+@pytest.fixture
+def banco_bot(tmp_path, df_usuarios, df_videos):
+    """trendx_bot.db mínimo (cached_stats + valid_videos) com os dados das fixtures"""
+    caminho = tmp_path / "trendx_bot.db"
+    with sqlite3.connect(caminho) as conn:
+        df_usuarios.to_sql('cached_stats', conn, index=False)
+        df_videos.drop(columns=['discord_username']).to_sql('valid_videos', conn, index=False)
+    return caminho
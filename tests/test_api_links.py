@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import api_links
+
+
+class VerificadorFalso:
+    versao = 'teste'
+
+    async def carregar(self):
+        pass
+
+    def saude(self):
+        return {'versao': self.versao}
+
+
+async def _enviar(cabecalho):
+    servidor, _ = await api_links.iniciar_servidor('127.0.0.1', 0, verificador=VerificadorFalso())
+    porta = servidor.sockets[0].getsockname()[1]
+    try:
+        leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+        escritor.write(cabecalho.encode('latin-1'))
+        await escritor.drain()
+        resposta = await asyncio.wait_for(leitor.read(), 5)
+        escritor.close()
+        return resposta
+    finally:
+        servidor.close()
+        await servidor.wait_closed()
+
+
+@pytest.mark.parametrize('tamanho', ['abc', '-5'])
+def test_content_length_invalido_responde_400(tamanho):
+    resposta = asyncio.run(_enviar(f"POST /verificar HTTP/1.1\r\nHost: x\r\nContent-Length: {tamanho}\r\n\r\n"))
+    assert resposta.startswith(b'HTTP/1.1 400')
+    assert 'Content-Length inválido' in resposta.decode('utf-8')
+
+
+def test_saude_continua_respondendo():
+    resposta = asyncio.run(_enviar("GET /saude HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"))
+    assert resposta.startswith(b'HTTP/1.1 200')
@@ -0,0 +1,31 @@
+import threading
+import time
+
+import streamlit as st
+
+import dashboard
+
+
+def test_mapa_de_contas_nao_segura_a_prontidao(banco_bot, monkeypatch):
+    monkeypatch.chdir(banco_bot.parent)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    liberar = threading.Event()
+    
+    def contas_devagar(df_usuarios, df_videos):
+        liberar.wait(10)
+        return []
+    monkeypatch.setattr(dashboard, 'obter_contas_usuarios', contas_devagar)
+    
+    etapas = dashboard.aquecer_caches()
+    assert 'contas_usuarios' not in etapas
+    saude = dashboard.estado_saude()
+    assert saude['pronto']
+    assert saude['aquecimento']['segundo_plano'] == {'contas_usuarios': {'estado': 'em_andamento'}}
+    
+    liberar.set()
+    limite = time.time() + 10
+    while dashboard.obter_registro_cargas().aquecimento['segundo_plano']['contas_usuarios']['estado'] == 'em_andamento':
+        assert time.time() < limite
+        time.sleep(0.05)
+    assert dashboard.obter_registro_cargas().aquecimento['segundo_plano']['contas_usuarios']['estado'] == 'concluido'
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+import benchmarks
+
+
+class ConexaoFalsa:
+    """Websocket que responde a cada BackMsg com os ForwardMsgs preparados"""
+
+    def __init__(self, respostas):
+        self.respostas = list(respostas)
+        self.enviadas = []
+        self.fila = []
+
+    async def send(self, dados):
+        mensagem = BackMsg()
+        mensagem.ParseFromString(dados)
+        self.enviadas.append(mensagem)
+        self.fila = [msg.SerializeToString() for msg in self.respostas.pop(0)]
+
+    async def recv(self):
+        return self.fila.pop(0)
+
+
+def _botao(rotulo, id_widget, fragmento=''):
+    mensagem = ForwardMsg()
+    mensagem.delta.new_element.button.label = rotulo
+    mensagem.delta.new_element.button.id = id_widget
+    mensagem.delta.fragment_id = fragmento
+    return mensagem
+
+
+def _fim(status=ForwardMsg.FINISHED_SUCCESSFULLY):
+    mensagem = ForwardMsg()
+    mensagem.script_finished = status
+    return mensagem
+
+
+def test_widget_ausente_e_erro_do_roteiro_sem_rerun():
+    conexao = ConexaoFalsa([[_botao("Outro", "b1"), _fim()]])
+    sessao = benchmarks.SessaoNavegador(conexao)
+    asyncio.run(sessao.rerun())
+
+    with pytest.raises(benchmarks.WidgetAusente):
+        asyncio.run(sessao.interagir('button', "Próxima Página ➡️"))
+    # Nada foi enviado ao servidor além do rerun inicial
+    assert len(conexao.enviadas) == 1
+
+
+def test_clique_em_fragmento_pede_rerun_so_do_fragmento():
+    conexao = ConexaoFalsa([
+        [_botao("Fora", "b0"), _botao("Próxima Página ➡️", "b1", "frag"), _fim()],
+        [_botao("Próxima Página ➡️", "b1", "frag"), _fim(ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)],
+    ])
+    sessao = benchmarks.SessaoNavegador(conexao)
+    asyncio.run(sessao.rerun())
+    latencia, excecoes = asyncio.run(sessao.interagir('button', "Próxima Página ➡️"))
+
+    enviada = conexao.enviadas[-1].rerun_script
+    assert enviada.fragment_id == "frag"
+    assert [(w.id, w.trigger_value) for w in enviada.widget_states.widgets] == [("b1", True)]
+    assert latencia >= 0 and excecoes == []
+    # Os widgets fora do fragmento continuam na página
+    assert sorted(elemento.id for _, elemento, _ in sessao.elementos) == ["b0", "b1"]
+
+
+def test_st_rerun_descarta_o_desenho_interrompido():
+    excecao = ForwardMsg()
+    excecao.delta.new_element.exception.type = "ValueError"
+    excecao.delta.new_element.exception.message = "antes do st.rerun"
+    conexao = ConexaoFalsa([[excecao, _fim(ForwardMsg.FINISHED_EARLY_FOR_RERUN), _botao("Ok", "b1"), _fim()]])
+    sessao = benchmarks.SessaoNavegador(conexao)
+
+    _, excecoes = asyncio.run(sessao.rerun())
+    assert excecoes == []
+    assert [elemento.id for _, elemento, _ in sessao.elementos] == ["b1"]
@@ -0,0 +1,48 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import dashboard
+
+
+@pytest.mark.parametrize('texto, consulta', [
+    ("Receita", '"receita"*'),
+    ("  como   fazer ", '"como"* "fazer"*'),
+    # Operadores e aspas do FTS5 viram texto comum
+    ('dança OR "tech" -vlog NEAR(a b)', '"dança"* "or"* "tech"* "vlog"* "near"* "a"* "b"*'),
+    ("c++ / #42", '"c"* "42"*'),
+    ("", ''),
+    ("?!*", ''),
+])
+def test_montar_consulta_fts(texto, consulta):
+    assert dashboard.montar_consulta_fts(texto) == consulta
+
+
+def _fts5_disponivel():
+    try:
+        sqlite3.connect(':memory:').execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+@pytest.mark.skipif(not _fts5_disponivel(), reason="SQLite sem FTS5")
+def test_consultas_montadas_sao_aceitas_pelo_indice():
+    df = dashboard.marcar_versao_snapshot(pd.DataFrame({
+        'id': [1, 2, 3],
+        'title': ["Receita de bolo", "Dança NEAR praia", 'Tutorial "OR" avançado'],
+    }))
+    indice = dashboard.IndiceTitulos()
+    assert indice.sincronizar(df) == 3
+    
+    assert indice.buscar("rec")[0] == [1]
+    assert indice.buscar("danca near")[0] == [2]
+    assert indice.buscar('"or" avanc')[0] == [3]
+    assert indice.buscar("-*")[0] == []
+    
+    alterado = dashboard.marcar_versao_snapshot(df.assign(title=["Receita de pão", df['title'][1], df['title'][2]]))
+    # Só o título alterado sai e volta ao índice
+    assert indice.sincronizar(alterado) == 2
+    assert indice.buscar("bolo")[0] == []
+    assert indice.buscar("pão")[0] == [1]
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+import dashboard
+
+
+def _coorte_empatada():
+    scores = [100, 100, 100, 100, 100, 80, 60, 40, 20, 10]
+    df = pd.DataFrame({
+        'total_views': [1000 - i for i in range(len(scores))],
+        'score_performance': scores,
+    }, index=[f"u{i}" for i in range(len(scores))])
+    return dashboard.EstatisticasCoorte(df)
+
+
+def test_empate_no_topo_fica_com_o_melhor_percentil():
+    coorte = _coorte_empatada()
+    # Os 5 empatados são "#1 de 10" em rank_performance: TOP 10%, não TOP 50%
+    assert [coorte.percentil(f"u{i}", 'score_performance') for i in range(5)] == [90.0] * 5
+    assert coorte.percentil("u5", 'score_performance') == 40.0
+    assert coorte.percentil("u9", 'score_performance') == 0.0
+
+
+def test_percentil_sem_empate_segue_a_posicao():
+    coorte = _coorte_empatada()
+    # total_views sem empates: posição p de N vale (1 - p/N) * 100
+    assert [coorte.percentil(f"u{i}", 'total_views') for i in range(10)] == pytest.approx([
+        (1 - posicao / 10) * 100 for posicao in range(1, 11)
+    ])
+
+
+def test_inativo_nao_tem_percentil():
+    df = pd.DataFrame({'total_views': [10, 0], 'score_performance': [50, 0]}, index=["a", "b"])
+    assert dashboard.EstatisticasCoorte(df).percentil("b", 'score_performance') is None
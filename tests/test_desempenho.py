@@ -0,0 +1,24 @@
+import dashboard
+
+
+def test_medir_bloco_desativado_devolve_dicionario_novo(monkeypatch):
+    monkeypatch.setattr(dashboard, 'PERF_ATIVO', False)
+    with dashboard.medir_bloco("a") as primeiro:
+        primeiro['linhas'] = 10
+    with dashboard.medir_bloco("b") as segundo:
+        pass
+    assert primeiro is not segundo
+    assert segundo == {}
+
+
+def test_medir_bloco_registra_rss_do_processo(monkeypatch):
+    monkeypatch.setattr(dashboard, 'PERF_ATIVO', True)
+    dashboard.reiniciar_registros_desempenho()
+    with dashboard.medir_bloco("externo", linhas=5):
+        with dashboard.medir_bloco("interno") as registro:
+            registro['linhas'] = 3
+    registros = dashboard.obter_registros_desempenho()
+    assert [(r['etapa'], r['nivel'], r['linhas']) for r in registros] == [
+        ("externo", 0, 5), ("interno", 1, 3)
+    ]
+    assert all('rss_processo_mb' in r and 'memoria_mb' not in r for r in registros)
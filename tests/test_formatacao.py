@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dashboard
+
+
+@pytest.mark.parametrize('valor, rotulo', [
+    (0, "0"),
+    (999, "999"),
+    (1000, "1.0K"),
+    # Empates em .x5: metade-para-par nas duas versões
+    (1150, "1.2K"),
+    (1250, "1.2K"),
+    (2_450_000, "2.4M"),
+    (2_550_000, "2.6M"),
+    (999_950, "1000.0K"),
+    (1_500_000_000, "1.5B"),
+    (None, "0"),
+    ("1234", "1.2K"),
+])
+def test_formatar_numero(valor, rotulo):
+    assert dashboard.formatar_numero(valor) == rotulo
+    assert dashboard.formatar_numeros([valor]).iloc[0] == rotulo
+
+
+def test_formatar_numeros_igual_a_formatar_numero():
+    gerador = np.random.default_rng(37)
+    valores = np.concatenate([
+        np.arange(0, 3000),
+        np.arange(1000, 2_000_000, 50),          # todos os empates .x5 em K
+        np.arange(1, 100) * 1_050_000,           # empates em M
+        gerador.integers(0, 5_000_000_000, 5000),
+        gerador.uniform(0, 2e6, 2000),
+        [-5, -1500, 3e12, np.nan],
+    ])
+    esperado = [dashboard.formatar_numero(v) for v in valores]
+    assert dashboard.formatar_numeros(valores).tolist() == esperado
+
+
+def test_formatar_numeros_preserva_indice_e_categorias():
+    serie = pd.Series(pd.Categorical(["1500", "20"]), index=['a', 'b'])
+    resultado = dashboard.formatar_numeros(serie)
+    assert resultado.to_dict() == {'a': "1.5K", 'b': "20"}
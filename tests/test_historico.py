@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import dashboard
+
+
+@pytest.fixture
+def historico(tmp_path, monkeypatch):
+    caminho = tmp_path / "historico.db"
+    monkeypatch.setattr(dashboard, 'HISTORICO_DB_PATH', str(caminho))
+    dashboard._versoes_capturadas.clear()
+    yield caminho
+    dashboard._versoes_capturadas.clear()
+
+
+def _deltas(caminho):
+    with sqlite3.connect(caminho) as conn:
+        return pd.read_sql_query(
+            "SELECT user_id, capturado_em, base, total_views, total_videos FROM deltas_usuarios "
+            "ORDER BY capturado_em, user_id", conn
+        )
+
+
+def _nova_versao(df, **alteracoes):
+    df = df.copy()
+    for user_id, valores in alteracoes.items():
+        for coluna, valor in valores.items():
+            df.loc[df['user_id'] == user_id, coluna] = valor
+    return dashboard.marcar_versao_snapshot(df)
+
+
+def test_caminho_historico_ao_lado_do_banco(monkeypatch, tmp_path):
+    monkeypatch.setattr(dashboard, 'HISTORICO_DB_PATH', '')
+    monkeypatch.setattr(dashboard, 'DB_PATH', str(tmp_path / "dados" / "trendx_bot.db"))
+    assert dashboard.caminho_historico() == str(tmp_path / "dados" / "trendx_historico.db")
+    monkeypatch.setattr(dashboard, 'HISTORICO_DB_PATH', '/var/lib/trendx/hist.db')
+    assert dashboard.caminho_historico() == '/var/lib/trendx/hist.db'
+
+
+def test_primeira_captura_grava_base(historico, df_usuarios):
+    assert dashboard.registrar_captura_historico(df_usuarios, capturado_em=100) == len(df_usuarios)
+    deltas = _deltas(historico)
+    assert deltas['base'].tolist() == [1] * len(df_usuarios)
+    assert deltas['total_views'].tolist() == df_usuarios.sort_values('user_id')['total_views'].tolist()
+
+
+def test_captura_grava_so_quem_mudou(historico, df_usuarios):
+    dashboard.registrar_captura_historico(df_usuarios, capturado_em=100)
+    primeiro, segundo = df_usuarios['user_id'][0], df_usuarios['user_id'][1]
+    novo = _nova_versao(df_usuarios, **{primeiro: {'total_views': 50500, 'total_videos': 13}})
+    
+    assert dashboard.registrar_captura_historico(novo, capturado_em=200) == 1
+    # Mesma versão de novo: nada a gravar
+    assert dashboard.registrar_captura_historico(novo, capturado_em=300) == 0
+    
+    deltas = _deltas(historico)
+    ultima = deltas[deltas['capturado_em'] == 200]
+    assert ultima[['user_id', 'base', 'total_views', 'total_videos']].values.tolist() == [[primeiro, 0, 500, 1]]
+    
+    altas = dashboard.carregar_maiores_altas('total_views', desde=150)
+    assert altas[['user_id', 'crescimento']].values.tolist() == [[primeiro, 500]]
+    assert segundo not in set(altas['user_id'])
+    
+    historico_usuario = dashboard.carregar_historico_usuario(primeiro)
+    assert historico_usuario['acumulado_total_views'].tolist() == [50000, 50500]
+
+
+def test_usuario_novo_entra_como_base(historico, df_usuarios):
+    dashboard.registrar_captura_historico(df_usuarios.iloc[:3].copy(), capturado_em=100)
+    dashboard.registrar_captura_historico(df_usuarios, capturado_em=200)
+    ultima = _deltas(historico).query("capturado_em == 200")
+    assert set(ultima['user_id']) == set(df_usuarios['user_id'][3:])
+    assert ultima['base'].tolist() == [1, 1]
+
+
+def test_capturar_historico_uma_vez_por_versao(historico, df_usuarios, monkeypatch):
+    chamadas = []
+    registrar = dashboard.registrar_captura_historico
+    monkeypatch.setattr(dashboard, 'registrar_captura_historico', lambda df: chamadas.append(1) or registrar(df))
+    
+    assert dashboard.capturar_historico(df_usuarios) == len(df_usuarios)
+    assert dashboard.capturar_historico(df_usuarios) == 0
+    assert len(chamadas) == 1
+
+
+def test_capturar_historico_falha_vai_para_o_log(historico, df_usuarios, monkeypatch, caplog):
+    def falhar(df):
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(dashboard, 'registrar_captura_historico', falhar)
+    assert dashboard.capturar_historico(df_usuarios) == 0
+    assert "database is locked" in caplog.text
+    # A versão não fica marcada: a próxima execução tenta de novo
+    assert dashboard.versao_snapshot(df_usuarios) not in dashboard._versoes_capturadas()
+
+
+def test_carregar_conjunto_captura_mesmo_com_cache(historico, banco_bot, monkeypatch):
+    monkeypatch.setattr(dashboard, 'DB_PATH', str(banco_bot))
+    monkeypatch.setattr(dashboard, 'SNAPSHOT_COMPARTILHADO_DIR', '')
+    dashboard.carregar_dados_usuarios_completo.clear()
+    # Loader já em cache antes do histórico existir
+    dashboard.carregar_dados_usuarios_completo()
+    assert not os.path.exists(historico)
+    
+    df = dashboard.carregar_conjunto('usuarios')
+    assert len(_deltas(historico)) == len(df)
+    dashboard.carregar_dados_usuarios_completo.clear()
+
+
+def test_replicas_simultaneas_nao_contam_o_crescimento_duas_vezes(historico, df_usuarios, monkeypatch):
+    dashboard.registrar_captura_historico(df_usuarios, capturado_em=100)
+    primeiro = df_usuarios['user_id'][0]
+    v2 = _nova_versao(df_usuarios, **{primeiro: {'total_views': 60000}})
+    v3 = _nova_versao(df_usuarios, **{primeiro: {'total_views': 70000}})
+    
+    ler_sql = pd.read_sql_query
+    def ler_devagar(*args, **kwargs):
+        # Alarga a janela entre ler o estado_atual e gravar os deltas
+        resultado = ler_sql(*args, **kwargs)
+        time.sleep(0.3)
+        return resultado
+    monkeypatch.setattr(dashboard.pd, 'read_sql_query', ler_devagar)
+    
+    replicas = [threading.Thread(target=dashboard.registrar_captura_historico, args=(v, instante))
+                for v, instante in ((v2, 200), (v3, 300))]
+    for replica in replicas:
+        replica.start()
+    for replica in replicas:
+        replica.join()
+    monkeypatch.setattr(dashboard.pd, 'read_sql_query', ler_sql)
+    
+    # A soma dos deltas reconstrói o estado gravado, sem crescimento em dobro
+    with sqlite3.connect(historico) as conn:
+        soma = conn.execute("SELECT SUM(total_views) FROM deltas_usuarios WHERE user_id = ?", (primeiro,)).fetchone()[0]
+        estado = conn.execute("SELECT total_views FROM estado_atual WHERE user_id = ?", (primeiro,)).fetchone()[0]
+        capturas = conn.execute("SELECT COUNT(*) FROM capturas").fetchone()[0]
+    assert capturas == 3
+    assert soma == estado
@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+import dashboard
+
+
+@pytest.fixture
+def df_links():
+    return pd.DataFrame({
+        'url': [
+            "https://www.tiktok.com/@ana/video/7000000000000000001",
+            "https://youtube.com/shorts/abcDEF12345",
+            "https://www.instagram.com/reel/C000000001/",
+            "https://www.kwai.com/@bruno/video/555?utm=x",
+            None,
+            "https://www.tiktok.com/@ana/video/7000000000000000001",
+        ],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+@pytest.mark.parametrize('url, rotulo', [
+    ("https://www.tiktok.com/@ana/video/7000000000000000001", 10),
+    # Mesmo ID em outro formato de link
+    ("https://www.tiktok.com/@outra/video/7000000000000000001?lang=pt", 10),
+    ("https://youtu.be/abcDEF12345", 11),
+    ("https://www.youtube.com/watch?v=abcDEF12345&t=3", 11),
+    ("https://instagram.com/reel/C000000001", 12),
+    # Sem ID reconhecido: URL normalizada
+    ("http://kwai.com/@bruno/video/555/", 13),
+    ("https://m.kwai.com/@bruno/video/555#comentarios", 13),
+])
+def test_indice_urls_encontra_mesmo_video(df_links, url, rotulo):
+    assert dashboard.IndiceUrls(df_links).buscar(url) == rotulo
+
+
+@pytest.mark.parametrize('url', [
+    # Perfil da conta não é um vídeo cadastrado
+    "https://www.tiktok.com/@ana",
+    "https://www.kwai.com/@bruno/video",
+    # ID que só contém outro ID
+    "https://www.tiktok.com/@ana/video/700000000000000000",
+    "https://youtu.be/abcDEF1234",
+])
+def test_indice_urls_nao_aceita_trechos_de_links(df_links, url):
+    assert dashboard.IndiceUrls(df_links).buscar(url) is None
+
+
+def test_buscar_video_no_banco_devolve_linha(df_links):
+    video = dashboard.buscar_video_no_banco("https://youtu.be/abcDEF12345", df_links, dashboard.IndiceUrls(df_links))
+    assert video.name == 11
+    assert dashboard.buscar_video_no_banco("https://youtu.be/x", df_links.iloc[0:0]) is None
+
+
+def test_normalizar_url():
+    assert dashboard.normalizar_url("HTTPS://WWW.Site.com/A/b/?x=1") == "site.com/A/b"
+    assert dashboard.normalizar_url("site.com") == "site.com"
+
+
+@pytest.fixture
+def df_donos():
+    return pd.DataFrame({
+        'user_id': ['1001', '1002', '1003', '1004'],
+        'discord_username': ['banana_split', 'ana', 'Mariana', 'a.b'],
+        'tiktok_username': [None, 'ana.tt', '', 'axb'],
+    }, index=[20, 21, 22, 23])
+
+
+def test_indice_donos_primeira_linha_que_contem_o_termo(df_donos):
+    indice = dashboard.IndiceDonos(df_donos)
+    # Igual ao filtro original: primeira linha do DataFrame, não o nome mais parecido
+    assert indice.buscar('discord_username', 'ana') == 20
+    assert indice.buscar('discord_username', 'MARI') == 22
+    assert indice.buscar('discord_username', 'an') == 20
+    assert indice.buscar('discord_username', 'zz') is None
+
+
+def test_indice_donos_termo_literal_e_colunas(df_donos):
+    indice = dashboard.IndiceDonos(df_donos)
+    # '.' é texto, não expressão regular
+    assert indice.buscar('tiktok_username', 'a.t') == 21
+    assert indice.buscar('tiktok_username', 'x') == 23
+    assert indice.buscar('discord_username', 'a.b') == 23
+    assert indice.buscar('user_id', '100') == 20
+    assert indice.buscar('youtube_username', 'ana') is None
+    assert indice.buscar_por_discord('Mariana') == 22
+
+
+def test_identificar_dono_prioriza_coluna_da_plataforma(df_donos):
+    indice = dashboard.IndiceDonos(df_donos)
+    dono = dashboard.identificar_dono_da_conta('tiktok', 'ana', df_donos, indice_donos=indice)
+    assert dono.name == 21
+    dono = dashboard.identificar_dono_da_conta('youtube', 'ana', df_donos, indice_donos=indice)
+    assert dono.name == 20
+
+
+@pytest.mark.parametrize('termo', ['ana', 'an', 'video', 'tiktok.com/@ana', 'bruno/video/555', 'xyz'])
+def test_trigramas_score_igual_a_similaridade(termo):
+    textos = ["tiktok.com/@ana/video/1", "ana", "an", "kwai.com/@bruno/video/555", "youtube.com/shorts/anab"]
+    indice = dashboard.IndiceTrigramas(enumerate(textos))
+    esperado = sorted(
+        ((posicao, dashboard.similaridade_trigramas(termo, texto)) for posicao, texto in enumerate(textos) if termo in texto),
+        key=lambda item: (-item[1], item[0])
+    )
+    assert indice.buscar(termo) == pytest.approx(esperado)
+
+
+def test_contas_por_usuario_pelas_urls_dos_videos(df_usuarios, df_videos):
+    contas = {info['discord_username']: info for info in dashboard.obter_contas_por_usuario_melhorado(df_usuarios, df_videos)}
+    ana = contas['ana_gamer']
+    assert ana['contas_tiktok'] == ['anagamer']
+    assert ana['debug_info'] == {'videos_analisados': 12, 'urls_validas': 12}
+    assert contas['elisa_vlog']['debug_info'] == {'videos_analisados': 0, 'urls_validas': 0}
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+import dashboard
+
+
+def _urls(df_videos, repeticoes=3):
+    urls = df_videos['url'].tolist() * repeticoes
+    return urls + ["https://www.tiktok.com/@ninguem/video/1", "texto qualquer"]
+
+
+def test_lote_em_paralelo_igual_ao_sequencial(monkeypatch, caplog, df_usuarios, df_videos):
+    urls = _urls(df_videos)
+    assert len(urls) >= dashboard.LOTE_MINIMO_PARALELO
+    monkeypatch.setattr(dashboard, 'LOTE_MAX_PROCESSOS', 2)
+    pool_lote = dashboard.PoolLote(max_processos=2)
+    monkeypatch.setattr(dashboard, 'obter_pool_lote', lambda: pool_lote)
+    try:
+        with caplog.at_level(logging.WARNING, logger="trendx.dashboard"):
+            paralelo = dict(dashboard.analisar_links_em_lote(urls, df_videos, df_usuarios))
+    finally:
+        pool_lote.encerrar()
+    assert "Pool do lote indisponível" not in caplog.text
+    
+    sequencial = {
+        posicao: dashboard.resumir_analise_link(url, df_videos, df_usuarios)
+        for posicao, url in enumerate(urls)
+    }
+    assert paralelo == sequencial
+
+
+def test_lote_reaproveita_pool_do_mesmo_snapshot(df_usuarios, df_videos):
+    pool_lote = dashboard.PoolLote(max_processos=1)
+    try:
+        primeiro = pool_lote.obter(df_videos, df_usuarios, None, None)
+        assert pool_lote.obter(df_videos, df_usuarios, None, None) is primeiro
+        outro = dashboard.marcar_versao_snapshot(df_videos.iloc[1:].copy())
+        assert pool_lote.obter(outro, df_usuarios, None, None) is not primeiro
+    finally:
+        pool_lote.encerrar()
+
+
+class _PoolQuebrado:
+    def submit(self, *args, **kwargs):
+        raise dashboard.BrokenProcessPool("processo morreu")
+
+
+class _PoolLoteQuebrado:
+    def __init__(self):
+        self.descartados = []
+    
+    def obter(self, *args):
+        return _PoolQuebrado()
+    
+    def descartar(self, pool):
+        self.descartados.append(pool)
+
+
+def test_lote_pool_quebrado_registra_e_segue_no_processo(monkeypatch, caplog, df_usuarios, df_videos):
+    urls = _urls(df_videos)
+    pool_lote = _PoolLoteQuebrado()
+    monkeypatch.setattr(dashboard, 'LOTE_MAX_PROCESSOS', 2)
+    monkeypatch.setattr(dashboard, 'obter_pool_lote', lambda: pool_lote)
+    
+    with caplog.at_level(logging.WARNING, logger="trendx.dashboard"):
+        resultado = dict(dashboard.analisar_links_em_lote(urls, df_videos, df_usuarios))
+    
+    assert sorted(resultado) == list(range(len(urls)))
+    assert len(pool_lote.descartados) == 1
+    assert "Pool do lote indisponível" in caplog.text
+
+
+def test_lote_erro_na_analise_nao_e_engolido(monkeypatch, df_usuarios, df_videos):
+    def falhar(*args, **kwargs):
+        raise ValueError("falha na análise")
+    
+    monkeypatch.setattr(dashboard, 'resumir_analise_link', falhar)
+    with pytest.raises(ValueError, match="falha na análise"):
+        list(dashboard.analisar_links_em_lote(["https://youtube.com/shorts/x"], df_videos, df_usuarios))
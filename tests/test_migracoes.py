@@ -0,0 +1,84 @@
+import argparse
+import sqlite3
+
+import pytest
+
+import migracoes
+
+
+def _args(banco, **opcoes):
+    return argparse.Namespace(banco=str(banco), reconstruir=opcoes.get('reconstruir', False),
+                              verificar=opcoes.get('verificar', False))
+
+
+@pytest.fixture
+def banco_rollups(banco_bot):
+    assert migracoes.migrar_rollups(_args(banco_bot, verificar=True)) == 0
+    conn = sqlite3.connect(banco_bot)
+    yield conn
+    conn.close()
+
+
+def _linha_usuario(conn, user_id, plataforma):
+    return conn.execute(
+        "SELECT videos, videos_com_link, views, likes FROM rollup_usuario_plataforma "
+        "WHERE user_id = ? AND platform = ?", (user_id, plataforma)
+    ).fetchone()
+
+
+def test_rollups_preenchidos_conferem(banco_rollups):
+    assert migracoes.verificar_rollups(banco_rollups) == {tabela: 0 for tabela in migracoes.TABELAS_ROLLUP}
+    total = banco_rollups.execute("SELECT SUM(videos), SUM(views) FROM rollup_usuario_plataforma").fetchone()
+    assert total == banco_rollups.execute("SELECT COUNT(*), SUM(views) FROM valid_videos").fetchone()
+
+
+def test_triggers_de_insert_update_delete(banco_rollups):
+    conn = banco_rollups
+    usuario = str(10**17 + 3)
+    antes = _linha_usuario(conn, usuario, 'tiktok')
+    with conn:
+        conn.execute(
+            "INSERT INTO valid_videos (id, user_id, url, title, platform, views, likes, comments, shares) "
+            "VALUES (9001, ?, 'https://www.tiktok.com/@x/video/1', 't', 'tiktok', 500, 50, 5, 1)", (usuario,)
+        )
+    assert _linha_usuario(conn, usuario, 'tiktok') == (antes[0] + 1, antes[1] + 1, antes[2] + 500, antes[3] + 50)
+    
+    with conn:
+        # Troca de plataforma e de métricas: sai de um grupo e entra no outro
+        conn.execute("UPDATE valid_videos SET platform = 'kwai', views = 800, url = '' WHERE id = 9001")
+    assert _linha_usuario(conn, usuario, 'tiktok') == antes
+    assert _linha_usuario(conn, usuario, 'kwai') == (1, 0, 800, 50)
+    
+    with conn:
+        conn.execute("DELETE FROM valid_videos WHERE id = 9001")
+    # Grupo zerado some do rollup
+    assert _linha_usuario(conn, usuario, 'kwai') is None
+    assert migracoes.verificar_rollups(conn) == {tabela: 0 for tabela in migracoes.TABELAS_ROLLUP}
+
+
+def test_triggers_com_valores_nulos_e_categorias(banco_rollups):
+    conn = banco_rollups
+    with conn:
+        conn.execute("INSERT INTO valid_videos (id, user_id, platform) VALUES (9002, NULL, NULL)")
+        conn.execute("UPDATE valid_videos SET likes = likes * 20 WHERE id % 3 = 0")
+        conn.execute("DELETE FROM valid_videos WHERE id % 5 = 0")
+    assert migracoes.verificar_rollups(conn) == {tabela: 0 for tabela in migracoes.TABELAS_ROLLUP}
+
+
+def test_verificar_rollups_acusa_divergencia(banco_bot, banco_rollups):
+    with banco_rollups:
+        banco_rollups.execute("UPDATE rollup_plataforma_categoria SET views = views + 1")
+    divergencias = migracoes.verificar_rollups(banco_rollups)
+    assert divergencias['rollup_plataforma_categoria'] > 0
+    assert divergencias['rollup_usuario_plataforma'] == 0
+    assert migracoes.migrar_rollups(_args(banco_bot, verificar=True)) == 1
+    # --reconstruir refaz do zero
+    assert migracoes.migrar_rollups(_args(banco_bot, reconstruir=True, verificar=True)) == 0
+
+
+def test_migracao_registrada_nao_refaz(banco_bot, banco_rollups):
+    aplicada = banco_rollups.execute("SELECT aplicada_em FROM migracoes WHERE nome = 'rollups'").fetchone()
+    assert aplicada is not None
+    assert migracoes.migrar_rollups(_args(banco_bot)) == 0
+    gatilhos = banco_rollups.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0]
+    assert gatilhos == 3
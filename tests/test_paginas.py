@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+streamlit_testing = pytest.importorskip("streamlit.testing.v1")
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard.py")
+
+
+@pytest.fixture
+def app_videos(banco_bot, monkeypatch):
+    # DB_PATH é relativo ao diretório de trabalho
+    monkeypatch.chdir(banco_bot.parent)
+    at = streamlit_testing.AppTest.from_file(SCRIPT, default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value("🎬 Vídeos Completos").run()
+    [s for s in at.selectbox if s.label == "Vídeos por página:"][0].set_value(10).run()
+    return at
+
+
+def _pagina(at):
+    return [n for n in at.number_input if n.label == "Página:"][0]
+
+
+def test_lista_volta_para_primeira_pagina_quando_filtro_muda(app_videos):
+    at = app_videos
+    _pagina(at).set_value(3).run()
+    assert _pagina(at).value == 3
+    
+    [n for n in at.number_input if "Views mínimas" in n.label][0].set_value(1001).run()
+    assert not at.exception
+    assert _pagina(at).value == 1
+
+
+def test_lista_volta_para_primeira_pagina_quando_ordenacao_muda(app_videos):
+    at = app_videos
+    _pagina(at).set_value(2).run()
+    [s for s in at.selectbox if "Ordenar" in s.label][0].set_value("👁️ Mais Views").run()
+    assert not at.exception
+    assert _pagina(at).value == 1
+
+
+def test_lista_mantem_pagina_sem_mudar_filtros(app_videos):
+    at = app_videos
+    [b for b in at.button if "Próxima" in b.label][0].click().run()
+    [b for b in at.button if "Próxima" in b.label][0].click().run()
+    assert not at.exception
+    assert _pagina(at).value == 3
+
+
+def _etapas_medidas(at):
+    return set(at.sidebar.dataframe[-1].value['etapa'].str.strip())
+
+
+def test_forcar_reanalise_reconstroi_mapa_de_contas(banco_bot, monkeypatch):
+    monkeypatch.chdir(banco_bot.parent)
+    at = streamlit_testing.AppTest.from_file(SCRIPT, default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value("🔗 Gestão de Contas").run()
+    at.run()
+    assert "contas_usuarios.construir" not in _etapas_medidas(at)
+    
+    [b for b in at.button if "Forçar Re-análise" in b.label][0].click().run()
+    assert not at.exception
+    assert "contas_usuarios.construir" in _etapas_medidas(at)
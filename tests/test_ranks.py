@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+import dashboard
+
+
+def _ranks(linhas):
+    return pd.DataFrame(linhas, columns=['user_id', 'rank_views', 'rank_performance'])
+
+
+def test_calcular_diff_ranks():
+    anterior = _ranks([('a', 1, 2), ('b', 2, 1), ('c', 3, 0), ('d', 4, 3)])
+    atual = _ranks([('a', 2, 2), ('b', 1, 1), ('c', 3, 3), ('e', 4, 4)])
+    diff = dashboard.calcular_diff_ranks(anterior, atual)
+    
+    assert diff.loc['a', 'delta_rank_views'] == -1
+    assert diff.loc['b', 'delta_rank_views'] == 1
+    assert diff.loc['c', 'delta_rank_views'] == 0
+    # Sem rank antes (0) e com rank agora: novo, sem delta
+    assert diff.loc['c', 'novo_rank_performance'] and diff.loc['c', 'delta_rank_performance'] == 0
+    assert diff.loc['e', 'novo_rank_views'] and not diff.loc['e', 'saiu_rank_views']
+    assert diff.loc['d', 'saiu_rank_views'] and not diff.loc['d', 'novo_rank_views']
+    assert sorted(diff.index) == ['a', 'b', 'c', 'd', 'e']
+
+
+@pytest.fixture
+def historico(tmp_path, monkeypatch):
+    monkeypatch.setattr(dashboard, 'HISTORICO_DB_PATH', str(tmp_path / "historico.db"))
+    dashboard._obter_historico_ranks.clear()
+    yield
+    dashboard._obter_historico_ranks.clear()
+
+
+def _versao(ranks_views):
+    df = pd.DataFrame({
+        'user_id': [str(i) for i in range(len(ranks_views))],
+        'rank_views': ranks_views,
+        'rank_performance': ranks_views,
+    })
+    return dashboard.marcar_versao_snapshot(df)
+
+
+def test_diff_sobrevive_a_reinicio_e_igual_entre_replicas(historico):
+    v1, v2 = _versao([1, 2, 3]), _versao([2, 1, 3])
+    assert dashboard.obter_diff_ranks(v1) is None
+    
+    # Processo reiniciado (memória vazia): a versão anterior vem do banco
+    dashboard._obter_historico_ranks.clear()
+    diff = dashboard.obter_diff_ranks(v2)
+    assert diff is not None
+    assert diff['delta_rank_views'].to_dict() == {'0': -1, '1': 1, '2': 0}
+    
+    # Outra réplica que só viu v2 calcula o mesmo diff
+    replica = dashboard.HistoricoRanks()
+    pd.testing.assert_frame_equal(replica.diff(dashboard.versao_snapshot(v2), v2), diff)
+    # E v1 continua sem anterior
+    assert replica.diff(dashboard.versao_snapshot(v1), v1) is None
+
+
+def test_recorte_nao_conta_como_versao_nova(historico):
+    v1, v2 = _versao([1, 2, 3, 4]), _versao([2, 1, 3, 4])
+    dashboard.obter_diff_ranks(v1)
+    
+    recorte = v2[v2['rank_views'] <= 2]
+    assert recorte.attrs['versao_snapshot'] == v2.attrs['versao_snapshot']
+    assert dashboard.obter_diff_ranks(recorte) is None
+    
+    # O recorte não foi gravado: v2 ainda compara com v1
+    diff = dashboard.obter_diff_ranks(v2)
+    assert diff['delta_rank_views'].to_dict() == {'0': -1, '1': 1, '2': 0, '3': 0}
+
+
+def test_so_as_ultimas_versoes_ficam_no_banco(historico, monkeypatch):
+    monkeypatch.setattr(dashboard, 'RANKS_VERSOES_MAX', 2)
+    versoes = [_versao([1, 2, i]) for i in range(3, 7)]
+    for df in versoes:
+        dashboard.obter_diff_ranks(df)
+    conn = dashboard.conectar_historico()
+    try:
+        guardadas = [linha[0] for linha in conn.execute("SELECT versao FROM versoes_ranks ORDER BY ordem")]
+        usuarios = conn.execute("SELECT COUNT(DISTINCT versao) FROM ranks_usuarios").fetchone()[0]
+    finally:
+        conn.close()
+    assert guardadas == [dashboard.versao_snapshot(df) for df in versoes[-2:]]
+    assert usuarios == 2
@@ -0,0 +1,19 @@
+import logging
+import socket
+
+import dashboard
+
+
+def test_porta_ocupada_vai_para_o_log(caplog, capsys):
+    ocupada = socket.socket()
+    ocupada.bind(('127.0.0.1', 0))
+    ocupada.listen()
+    porta = ocupada.getsockname()[1]
+    try:
+        with caplog.at_level(logging.WARNING, logger="trendx.dashboard"):
+            assert dashboard.iniciar_servidor_saude('127.0.0.1', porta) is None
+    finally:
+        ocupada.close()
+        dashboard._servidor_saude.clear()
+    assert f"Servidor de saúde indisponível em 127.0.0.1:{porta}" in caplog.text
+    assert capsys.readouterr().out == ""
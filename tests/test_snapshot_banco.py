@@ -0,0 +1,128 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import dashboard
+
+
+@pytest.fixture
+def snapshot(banco_bot, tmp_path):
+    diretorio = tmp_path / "copias"
+    diretorio.mkdir()
+    snapshot = dashboard.SnapshotBanco(str(banco_bot), destino=str(diretorio), ttl=3600)
+    yield snapshot
+    snapshot.descartar()
+
+
+def _contar_videos(conn):
+    try:
+        return conn.execute("SELECT COUNT(*) FROM valid_videos").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_copia_le_dados_e_renova_depois_do_ttl(snapshot, banco_bot):
+    total = _contar_videos(snapshot.conectar())
+    primeira = snapshot._caminho
+    with sqlite3.connect(banco_bot) as conn:
+        conn.execute("DELETE FROM valid_videos WHERE id = 1")
+    # Dentro do TTL: mesma cópia
+    assert _contar_videos(snapshot.conectar()) == total
+    
+    snapshot.criado_em -= snapshot.ttl
+    assert _contar_videos(snapshot.conectar()) == total - 1
+    segunda = snapshot._caminho
+    assert segunda != primeira
+    # A cópia anterior fica para leitores atrasados até a renovação seguinte
+    assert snapshot._aposentada[1] == primeira
+    assert os.path.exists(primeira)
+    
+    snapshot.criado_em -= snapshot.ttl
+    snapshot.conectar().close()
+    assert not os.path.exists(primeira)
+    
+    snapshot.descartar()
+    assert not os.path.exists(segunda)
+
+
+def test_expirar_renova_na_proxima_conexao(snapshot, banco_bot, monkeypatch):
+    total = _contar_videos(snapshot.conectar())
+    primeira = snapshot._caminho
+    with sqlite3.connect(banco_bot) as conn:
+        conn.execute("DELETE FROM valid_videos WHERE id = 1")
+    
+    # O botão "Recarregar Dados" expira todas as cópias do processo
+    monkeypatch.setitem(dashboard._SNAPSHOTS_BANCO, str(banco_bot), snapshot)
+    dashboard.expirar_snapshots_banco()
+    assert _contar_videos(snapshot.conectar()) == total - 1
+    assert snapshot._caminho != primeira
+
+
+def test_leitores_nao_esperam_a_renovacao(snapshot, monkeypatch):
+    snapshot.conectar().close()
+    snapshot.criado_em -= snapshot.ttl
+    
+    copiando, liberar = threading.Event(), threading.Event()
+    copiar = snapshot._copiar
+    
+    def copiar_devagar():
+        copiando.set()
+        liberar.wait(10)
+        copiar()
+    
+    monkeypatch.setattr(snapshot, '_copiar', copiar_devagar)
+    renovacao = threading.Thread(target=lambda: snapshot.conectar().close())
+    renovacao.start()
+    assert copiando.wait(5)
+    
+    inicio = time.perf_counter()
+    assert _contar_videos(snapshot.conectar()) > 0
+    assert time.perf_counter() - inicio < 1
+    
+    liberar.set()
+    renovacao.join(10)
+    assert time.time() - snapshot.criado_em < 5
+
+
+def _progresso_reiniciando(snapshot):
+    def fabrica():
+        def progresso(status, restantes, total):
+            raise snapshot._MuitosReinicios()
+        return progresso
+    return fabrica
+
+
+def test_escrita_continua_adia_renovacao_sem_copia_de_um_passo(snapshot, monkeypatch, caplog):
+    snapshot.conectar().close()
+    atual = snapshot._caminho
+    snapshot.criado_em -= snapshot.ttl
+    monkeypatch.setattr(dashboard, 'SNAPSHOT_PAGINAS_POR_PASSO', 1)
+    monkeypatch.setattr(snapshot, '_progresso_copia', _progresso_reiniciando(snapshot))
+    
+    with caplog.at_level(logging.WARNING, logger="trendx.dashboard"):
+        assert _contar_videos(snapshot.conectar()) > 0
+    assert snapshot._caminho == atual
+    assert "renovação adiada" in caplog.text
+    # Adiada: as próximas conexões nem tentam copiar
+    monkeypatch.setattr(snapshot, '_copiar', lambda: pytest.fail("renovou durante o adiamento"))
+    snapshot.conectar().close()
+
+
+def test_sem_copia_o_dashboard_le_o_banco_direto(banco_bot, tmp_path, monkeypatch, caplog):
+    diretorio = tmp_path / "copias"
+    diretorio.mkdir()
+    snapshot = dashboard.SnapshotBanco(str(banco_bot), destino=str(diretorio))
+    monkeypatch.setattr(dashboard, 'SNAPSHOT_PAGINAS_POR_PASSO', 1)
+    monkeypatch.setattr(snapshot, '_progresso_copia', _progresso_reiniciando(snapshot))
+    monkeypatch.setattr(dashboard, 'SNAPSHOT_MODO', str(diretorio))
+    monkeypatch.setattr(dashboard, 'obter_snapshot_banco', lambda caminho: snapshot)
+    
+    with caplog.at_level(logging.WARNING, logger="trendx.dashboard"):
+        conn = dashboard.conectar_banco(str(banco_bot))
+    assert _contar_videos(conn) > 0
+    assert "lendo" in caplog.text and "direto" in caplog.text
+    assert list(diretorio.iterdir()) == []
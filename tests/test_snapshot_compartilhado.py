@@ -0,0 +1,82 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import dashboard  # noqa: E402
+import publicador_snapshot  # noqa: E402
+
+
+def _manifesto(diretorio):
+    with open(os.path.join(diretorio, dashboard.MANIFESTO_SNAPSHOT), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_publicar_snapshot_so_regrava_o_que_mudou(tmp_path, df_usuarios, df_videos):
+    diretorio = str(tmp_path / "snapshot")
+    conjuntos = {'usuarios': df_usuarios, 'videos': df_videos}
+    
+    assert publicador_snapshot.publicar_snapshot(diretorio, conjuntos) == ['usuarios', 'videos']
+    manifesto = _manifesto(diretorio)
+    assert manifesto['usuarios']['versao'] == dashboard.versao_snapshot(df_usuarios)
+    assert manifesto['videos']['linhas'] == len(df_videos)
+    
+    # Mesmas versões: nada é regravado
+    assert publicador_snapshot.publicar_snapshot(diretorio, conjuntos) == []
+    
+    alterado = dashboard.marcar_versao_snapshot(df_usuarios.assign(total_views=df_usuarios['total_views'] + 1))
+    assert publicador_snapshot.publicar_snapshot(diretorio, {'usuarios': alterado, 'videos': df_videos}) == ['usuarios']
+    novo = _manifesto(diretorio)
+    assert novo['videos'] == manifesto['videos']
+    # Arquivo da versão antiga sai do diretório
+    arquivos = sorted(f for f in os.listdir(diretorio) if f.endswith('.arrow'))
+    assert arquivos == sorted([novo['usuarios']['arquivo'], novo['videos']['arquivo']])
+
+
+def test_publicar_snapshot_ignora_conjunto_vazio(tmp_path, df_usuarios):
+    diretorio = str(tmp_path / "snapshot")
+    assert publicador_snapshot.publicar_snapshot(diretorio, {'usuarios': df_usuarios, 'videos': pd.DataFrame()}) == ['usuarios']
+    assert set(_manifesto(diretorio)) == {'usuarios'}
+
+
+def test_replica_le_o_publicado(tmp_path, df_usuarios):
+    diretorio = str(tmp_path / "snapshot")
+    publicador_snapshot.publicar_snapshot(diretorio, {'usuarios': df_usuarios})
+    leitor = dashboard.SnapshotCompartilhado(diretorio)
+    assert leitor.estado() == {}
+    
+    df = leitor.obter('usuarios')
+    pd.testing.assert_frame_equal(df, df_usuarios, check_dtype=False)
+    assert dashboard.versao_snapshot(df) == dashboard.versao_snapshot(df_usuarios)
+    assert leitor.estado() == {'usuarios': dashboard.versao_snapshot(df_usuarios)}
+    assert leitor.idade_s() >= 0
+    assert leitor.obter('videos') is None
+    
+    alterado = dashboard.marcar_versao_snapshot(df_usuarios.iloc[:2].copy())
+    publicador_snapshot.publicar_snapshot(diretorio, {'usuarios': alterado})
+    # Mtime do manifesto com resolução grossa em alguns sistemas de arquivos
+    leitor._mtime_manifesto = None
+    assert len(leitor.obter('usuarios')) == 2
+    assert leitor.estado() == {'usuarios': dashboard.versao_snapshot(alterado)}
+
+
+def test_carregar_e_publicar_grava_historico(tmp_path, banco_bot, monkeypatch):
+    monkeypatch.setattr(dashboard, 'DB_PATH', str(banco_bot))
+    monkeypatch.setattr(dashboard, 'HISTORICO_DB_PATH', str(tmp_path / "historico.db"))
+    monkeypatch.setattr(dashboard, 'SNAPSHOT_COMPARTILHADO_DIR', '')
+    dashboard._versoes_capturadas.clear()
+    diretorio = str(tmp_path / "snapshot")
+    try:
+        assert publicador_snapshot.carregar_e_publicar(diretorio) == ['usuarios', 'videos']
+    finally:
+        for conjunto in publicador_snapshot.CONJUNTOS_PUBLICADOS:
+            dashboard.CONJUNTOS_DE_DADOS[conjunto].clear()
+        dashboard._versoes_capturadas.clear()
+    conn = dashboard.conectar_historico()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM capturas").fetchone()[0] == 1
+    finally:
+        conn.close()